@@ -1,11 +1,801 @@
-import paramiko
-import duckdb
 from dotenv import load_dotenv
 import os
+import re
 import socket
 import select
 import threading
 import time
+import selectors
+import errno
+import random
+import weakref
+import atexit
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+# paramiko, duckdb and asyncio are imported inside the functions that use them:
+# together they are most of this module's import time, and each is only needed
+# once a caller opens an SSH connection, the configuration database or an
+# asyncio relay.
+
+# Relay engines available for moving bytes between SSH channels and local sockets.
+#   thread    - one OS thread per forwarded connection (original behaviour)
+#   asyncio   - every connection driven by a single shared event loop
+#   multiplex - every connection owned by one shared selector (epoll) thread
+RELAY_MODES = ('thread', 'asyncio', 'multiplex')
+
+# Per-connection relay buffer size (bytes); overridable per config or via RELAY_CHUNK_SIZE
+DEFAULT_CHUNK_SIZE = 65536
+MIN_CHUNK_SIZE = 4096
+MAX_CHUNK_SIZE = 1048576
+
+# Admission control defaults for inbound connections (overridable via .env)
+DEFAULT_MAX_CONNECTIONS = 1024
+DEFAULT_MAX_CONNECTIONS_PER_TUNNEL = 256
+DEFAULT_CONNECTION_QUEUE_DEPTH = 128
+DEFAULT_CONNECTION_QUEUE_TIMEOUT = 10
+# What to do with a connection when no slot is free:
+#   wait   - queue it (up to the queue depth) for at most the queue timeout
+#   reject - close it immediately
+OVERFLOW_POLICIES = ('wait', 'reject')
+
+# How a pooled SSH transport (SSH_TRANSPORTS_PER_HOST) is picked for each tunnel or forwarded connection:
+#   round_robin  - in turn (original behaviour)
+#   hash         - by bind port (client port for local forwards), so a tunnel keeps its transport slot
+#   least_loaded - the transport carrying the fewest tunnels and open channels
+SHARD_POLICIES = ('round_robin', 'hash', 'least_loaded')
+
+# Tunnel backends:
+#   paramiko - forwards carried by the pooled paramiko transports and relay engines (original behaviour)
+#   openssh  - forwards added to one `ssh` ControlMaster subprocess per host, which relays and
+#              encrypts the traffic itself, outside this process and its GIL
+SSH_BACKENDS = ('paramiko', 'openssh')
+# Seconds to wait for a new ControlMaster to authenticate, or for one control command
+OPENSSH_READY_TIMEOUT = 10
+
+# Per-tunnel SSH compression (port_configs.compression, or SSH_COMPRESSION):
+#   off  - the tunnel runs on an uncompressed transport (original behaviour)
+#   on   - the tunnel runs on a zlib-compressed transport
+#   auto - starts uncompressed; once COMPRESSION_SAMPLE_BYTES of its outbound traffic
+#          have been seen, moves to a compressed transport if that is faster on this link
+COMPRESSION_MODES = ('off', 'on', 'auto')
+DEFAULT_COMPRESSION = 'off'
+COMPRESSION_SAMPLE_BYTES = 262144
+# Bytes of SSH_MSG_IGNORE padding used to estimate the uplink bandwidth for an auto decision
+COMPRESSION_PROBE_BYTES = 262144
+# Compression is never chosen if it saves less than this fraction of the bytes
+COMPRESSION_MIN_SAVING = 0.1
+
+# Parallel tunnel bring-up: worker count, attempts per tunnel and retry backoff (seconds)
+DEFAULT_STARTUP_CONCURRENCY = 16
+DEFAULT_STARTUP_RETRIES = 3
+STARTUP_BACKOFF_BASE = 0.25
+STARTUP_BACKOFF_MAX = 8
+
+# Tunnel supervisor: seconds between transport checks and reconnect backoff bounds
+DEFAULT_SUPERVISOR_INTERVAL = 1
+RECONNECT_BACKOFF_BASE = 0.5
+RECONNECT_BACKOFF_MAX = 30
+
+# Dead-peer detection: seconds between timed keepalive requests, unanswered
+# keepalives before the transport is closed, and RTT samples kept per transport
+DEFAULT_KEEPALIVE_INTERVAL = 5
+DEFAULT_KEEPALIVE_MAX_MISSED = 3
+RTT_HISTORY = 60
+
+# End-to-end tunnel probes: seconds to wait for connect/first byte, results kept per bind port
+DEFAULT_PROBE_TIMEOUT = 5
+# Without a request to send, silence after this long means a client-speaks-first service (e.g. HTTP)
+DEFAULT_PROBE_FIRST_BYTE_TIMEOUT = 0.5
+PROBE_HISTORY = 100
+
+# Health results are reused for this many seconds (0 disables caching)
+DEFAULT_HEALTH_CACHE_TTL = 30
+
+# Server-side port probes: 'proc' reads /proc/net/tcp{,6} and socket inodes,
+# 'netstat' uses netstat and ps (used automatically when /proc is unavailable)
+HEALTH_PROBE_MODES = ('proc', 'netstat')
+
+# Remote script for the 'proc' probe. Prints the session's sshd PID, one
+# "L port inode" line per listening socket on a wanted port, one
+# "P port pid comm" line per process holding it and one "S pid port" line
+# for every other port such a process listens on, in a single pass.
+PROC_PORT_PROBE = r'''echo SELF $PPID
+[ -r /proc/net/tcp ] || { echo NOPROC; exit 0; }
+ls -l /proc/[0-9]*/fd 2>/dev/null | awk -v ports="%s" '
+function hex(s,   i, v) {
+    v = 0; s = toupper(s)
+    for (i = 1; i <= length(s); i++) v = v * 16 + index("0123456789ABCDEF", substr(s, i, 1)) - 1
+    return v
+}
+BEGIN {
+    n = split(ports, list, ","); for (i = 1; i <= n; i++) want[list[i]] = 1
+    split("/proc/net/tcp /proc/net/tcp6", files, " ")
+    for (f = 1; f <= 2; f++) {
+        while ((getline line < files[f]) > 0) {
+            split(line, col, " ")
+            if (col[4] != "0A") continue
+            k = split(col[2], addr, ":"); port = hex(addr[k]); listen[col[10]] = port
+            if (port in want) { owner[col[10]] = port; print "L", port, col[10] }
+        }
+        close(files[f])
+    }
+}
+/^\/proc\/[0-9]+\/fd:$/ { split($0, d, "/"); pid = d[3]; next }
+/-> socket:\[/ {
+    ino = $NF; gsub(/[^0-9]/, "", ino)
+    if (ino in listen) held[pid] = held[pid] " " listen[ino]
+    if (ino in owner && !((ino, pid) in seen)) {
+        seen[ino, pid] = 1; holder[pid] = 1; comm = "?"; file = "/proc/" pid "/comm"
+        getline comm < file; close(file)
+        print "P", owner[ino], pid, comm
+    }
+}
+END {
+    for (pid in holder) {
+        n = split(held[pid], other, " ")
+        for (i = 1; i <= n; i++) if (!(other[i] in want) && !((pid, other[i]) in shown)) {
+            shown[pid, other[i]] = 1; print "S", pid, other[i]
+        }
+    }
+}'
+'''
+
+# Zombie reaper, run after the probe above: kills the chosen PIDs and reports
+# each killed one as a "K pid" line
+PROC_PID_KILL = r'''for pid in %s; do kill -9 "$pid" 2>/dev/null && echo K "$pid"; done
+'''
+
+# Zombie reaper fallback without /proc: lsof (or netstat -p) per port, all in one command
+NETSTAT_PORT_REAP = r'''for port in %s; do
+    pids=$(lsof -ti :$port 2>/dev/null || netstat -tulnp 2>/dev/null | awk -v p=":$port" '$4 ~ p"$" { split($7, a, "/"); print a[1] }')
+    for pid in $pids; do kill -9 "$pid" 2>/dev/null && echo K "$pid" "$port"; done
+done
+'''
+
+# Port release polling after a kill: first delay, cap and overall timeout (seconds)
+REAP_POLL_INITIAL = 0.05
+REAP_POLL_MAX = 0.5
+DEFAULT_REAP_TIMEOUT = 10
+
+# Port configuration database; the shared connection is closed after this many
+# idle seconds so other processes (pytunnel, pymanage) can open the file
+PORT_CONFIG_DB = 'port_forwarding.db'
+DEFAULT_DB_IDLE_TIMEOUT = 5
+
+# Columns returned for every port configuration, in SELECT order
+PORT_CONFIG_FIELDS = (
+    'id', 'name', 'local_port', 'remote_host', 'remote_port', 'server_bind_port',
+    'description', 'active', 'created_at', 'chunk_size', 'updated_at', 'compression'
+)
+
+# Columns update_port_config() may change
+PORT_CONFIG_UPDATABLE = (
+    'name', 'local_port', 'remote_host', 'remote_port', 'server_bind_port', 'description', 'active', 'chunk_size',
+    'compression'
+)
+
+# Columns an import file must provide, and the SQL type and range of typed columns
+PORT_CONFIG_REQUIRED = ('name', 'local_port', 'remote_host', 'remote_port')
+PORT_CONFIG_TYPES = {
+    'local_port': 'INTEGER', 'remote_port': 'INTEGER', 'server_bind_port': 'INTEGER', 'chunk_size': 'INTEGER',
+    'active': 'BOOLEAN'
+}
+PORT_CONFIG_RANGES = {
+    'local_port': (1, 65535), 'remote_port': (1, 65535), 'server_bind_port': (1, 65535),
+    'chunk_size': (MIN_CHUNK_SIZE, MAX_CHUNK_SIZE)
+}
+# Text columns limited to a fixed set of (lower-case) values
+PORT_CONFIG_CHOICES = {'compression': COMPRESSION_MODES}
+
+# Bulk import/export file formats: extension -> format, DuckDB reader and COPY options
+PORT_CONFIG_FORMATS = {'.json': 'json', '.jsonl': 'json', '.ndjson': 'json', '.csv': 'csv', '.parquet': 'parquet'}
+PORT_CONFIG_READERS = {
+    'json': "read_json_auto(?)",
+    'csv': "read_csv(?, header = true, all_varchar = true)",
+    'parquet': "read_parquet(?)"
+}
+PORT_CONFIG_WRITERS = {'json': "FORMAT json, ARRAY true", 'csv': "FORMAT csv, HEADER true", 'parquet': "FORMAT parquet"}
+
+# SELECT list matching PORT_CONFIG_FIELDS
+PORT_CONFIG_COLUMNS = ', '.join(PORT_CONFIG_FIELDS)
+
+# Sequence numbering configurations. The id column keeps its value for the
+# life of the row, unlike DuckDB's rowid, which an UPDATE of an indexed
+# column (name, server_bind_port) changes
+PORT_CONFIG_ID_SEQUENCE = 'port_configs_id_seq'
+
+# Unique index that keeps two configurations from claiming the same server bind port
+PORT_CONFIG_BIND_INDEX = 'port_configs_bind_port'
+
+# Schema upgrades applied to existing port_forwarding.db files, in order
+PORT_CONFIG_MIGRATIONS = (
+    f"ALTER TABLE port_configs ADD COLUMN IF NOT EXISTS chunk_size INTEGER DEFAULT {DEFAULT_CHUNK_SIZE}",
+    f"CREATE UNIQUE INDEX IF NOT EXISTS {PORT_CONFIG_BIND_INDEX} ON port_configs (server_bind_port)",
+    f"ALTER TABLE port_configs ADD COLUMN IF NOT EXISTS compression VARCHAR DEFAULT '{DEFAULT_COMPRESSION}'",
+    f"CREATE SEQUENCE IF NOT EXISTS {PORT_CONFIG_ID_SEQUENCE}",
+    f"ALTER TABLE port_configs ADD COLUMN IF NOT EXISTS id BIGINT DEFAULT nextval('{PORT_CONFIG_ID_SEQUENCE}')",
+)
+
+
+class _RelayBuffer:
+    """
+    Preallocated buffer for one relay direction.
+    Sockets fill it in place with recv_into; writers drain it through a
+    memoryview, so steady-state relaying allocates no new buffers.
+    """
+
+    def __init__(self, size):
+        self.data = bytearray(size)
+        self.view = memoryview(self.data)
+        self.start = 0
+        self.end = 0
+
+    def __len__(self):
+        return self.end - self.start
+
+    def fill_from_socket(self, sock):
+        """recv_into the free tail of the buffer. Returns bytes read (0 on EOF)."""
+        n = sock.recv_into(self.view[self.end:])
+        self.end += n
+        return n
+
+    def fill_from_channel(self, chan):
+        """
+        Read from a paramiko channel into the free tail of the buffer.
+        Channels only expose recv(), so this is one copy into the preallocated space.
+        """
+        data = chan.recv(len(self.data) - self.end)
+        n = len(data)
+        self.view[self.end:self.end + n] = data
+        self.end += n
+        return n
+
+    def pending(self):
+        """memoryview of the bytes not yet written."""
+        return self.view[self.start:self.end]
+
+    def consume(self, n):
+        """Mark n bytes as written; rewinds once everything is drained."""
+        self.start += n
+        if self.start >= self.end:
+            self.start = 0
+            self.end = 0
+
+    def clear(self):
+        self.start = 0
+        self.end = 0
+
+
+class _CompressionSampler:
+    """
+    Copy of the first bytes a tunnel sends towards the SSH server (compression=auto).
+
+    Relays of every engine feed what they read from the local service;
+    on_full is called once, from the feeding thread, with the complete sample.
+    """
+
+    def __init__(self, sample_size, on_full):
+        self.sample_size = sample_size
+        self.on_full = on_full
+        self.chunks = []
+        self.size = 0
+        self.done = False
+        self.lock = threading.Lock()
+
+    def feed(self, data):
+        """Keep data until the sample is complete. Returns False once no more data is wanted."""
+        with self.lock:
+            if self.done:
+                return False
+            chunk = bytes(data[:self.sample_size - self.size])
+            self.chunks.append(chunk)
+            self.size += len(chunk)
+            if self.size < self.sample_size:
+                return True
+            self.done = True
+        self.on_full(b''.join(self.chunks))
+        return False
+
+
+class _RelayPair:
+    """
+    Backpressure-aware relay state for one channel <-> socket pair.
+
+    Each direction owns one fixed-size _RelayBuffer, so at most 2 * chunk_size
+    bytes are buffered per connection. A side is only read again once
+    everything previously read from it has been written to the other side,
+    and partial writes keep their remainder queued instead of dropping it.
+    Both ends are switched to non-blocking mode; the caller decides when to
+    call the read/flush methods (select loop or shared multiplexer).
+    """
+
+    def __init__(self, chan, sock, chunk_size=DEFAULT_CHUNK_SIZE, sampler=None):
+        self.chan = chan
+        self.sock = sock
+        self.to_sock = _RelayBuffer(chunk_size)
+        self.to_chan = _RelayBuffer(chunk_size)
+        self.chan_eof = False
+        self.sock_eof = False
+        self.sampler = sampler
+
+        chan.settimeout(0.0)
+        sock.setblocking(False)
+
+    @property
+    def pending_to_sock(self):
+        """Bytes read from the channel that the socket has not accepted yet."""
+        return len(self.to_sock)
+
+    @property
+    def pending_to_chan(self):
+        """Bytes read from the socket that the channel has not accepted yet."""
+        return len(self.to_chan)
+
+    def want_sock_read(self):
+        return not self.to_chan and not self.sock_eof and not self.chan_eof
+
+    def want_chan_read(self):
+        return not self.to_sock and not self.chan_eof and not self.sock_eof
+
+    def want_sock_write(self):
+        return bool(self.to_sock)
+
+    def chan_blocked(self):
+        """True while bytes wait on the channel, which has no writable event to wait for."""
+        return bool(self.to_chan)
+
+    def finished(self):
+        """True once either side hit EOF and everything read has been delivered."""
+        return (self.chan_eof or self.sock_eof) and not self.to_sock and not self.to_chan
+
+    def read_sock(self):
+        try:
+            n = self.to_chan.fill_from_socket(self.sock)
+        except BlockingIOError:
+            return
+        if n == 0:
+            self.sock_eof = True
+        else:
+            if self.sampler is not None and not self.sampler.feed(self.to_chan.view[self.to_chan.end - n:self.to_chan.end]):
+                self.sampler = None
+            self.flush_chan()
+
+    def read_chan(self):
+        try:
+            n = self.to_sock.fill_from_channel(self.chan)
+        except socket.timeout:
+            return
+        if n == 0:
+            self.chan_eof = True
+        else:
+            self.flush_sock()
+
+    def flush_sock(self):
+        while self.to_sock:
+            try:
+                sent = self.sock.send(self.to_sock.pending())
+            except BlockingIOError:
+                return
+            self.to_sock.consume(sent)
+
+    def flush_chan(self):
+        # A channel send is capped at one SSH packet, so keep going until the window fills
+        while self.to_chan:
+            try:
+                sent = self.chan.send(self.to_chan.pending())
+            except socket.timeout:
+                return
+            if sent == 0:
+                # Channel closed underneath us; nothing more can be delivered
+                self.to_chan.clear()
+                self.chan_eof = True
+                return
+            self.to_chan.consume(sent)
+
+
+class _MuxRelay(_RelayPair):
+    """
+    A _RelayPair owned by a _RelayMultiplexer, including the optional
+    non-blocking connect to the local service.
+    """
+
+    CONNECT_TIMEOUT = 5
+
+    def __init__(self, mux, chan, sock, connect_to=None, label="", chunk_size=DEFAULT_CHUNK_SIZE, on_close=None,
+                 sampler=None):
+        super().__init__(chan, sock, chunk_size, sampler)
+        self.mux = mux
+        self.on_close = on_close
+        self.connect_to = connect_to
+        self.label = label
+        self.connecting = connect_to is not None
+        self.deadline = None
+        self.closed = False
+        self.chan_fd = chan.fileno()
+        self.masks = {}
+
+    def start(self):
+        """Begin the non-blocking connect (if any) and register interest."""
+        if self.connecting:
+            print(f"Attempting to connect to local service {self.label}...")
+            self.deadline = time.monotonic() + self.CONNECT_TIMEOUT
+            err = self.sock.connect_ex(self.connect_to)
+            if err not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+                print(f"✗ Error connecting to local service {self.label}: {os.strerror(err)}")
+                self.close()
+                return
+        self.update()
+
+    def expire(self):
+        """Abort a connect attempt that ran past its deadline."""
+        print(f"✗ Timeout connecting to local service {self.label}")
+        print(f"  → Is your service running on {self.label}?")
+        self.close()
+
+    def on_sock_event(self, events):
+        if self.connecting:
+            err = self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            if err:
+                if err == errno.ECONNREFUSED:
+                    print(f"✗ Connection refused to local service {self.label}")
+                    print(f"  → Is your service running and accepting connections?")
+                else:
+                    print(f"✗ Error connecting to local service {self.label}: {os.strerror(err)}")
+                self.close()
+                return
+            self.connecting = False
+            self.deadline = None
+            print(f"✓ Connected to local service {self.label}")
+
+        if events & selectors.EVENT_WRITE and self.want_sock_write():
+            self.flush_sock()
+        if events & selectors.EVENT_READ and self.want_sock_read():
+            self.read_sock()
+        self.update()
+
+    def on_chan_event(self, events):
+        if self.want_chan_read():
+            self.read_chan()
+        self.update()
+
+    def update(self):
+        """Recompute selector interest from the current buffers, or close when done."""
+        if self.closed:
+            return
+        if self.finished():
+            self.close()
+            return
+
+        sock_mask = 0
+        chan_mask = 0
+        if self.connecting or self.want_sock_write():
+            sock_mask |= selectors.EVENT_WRITE
+        if not self.connecting and self.want_sock_read():
+            sock_mask |= selectors.EVENT_READ
+        if self.want_chan_read():
+            chan_mask |= selectors.EVENT_READ
+
+        self.mux.set_interest(self, self.sock, sock_mask, 'sock')
+        self.mux.set_interest(self, self.chan_fd, chan_mask, 'chan')
+        self.mux.set_blocked(self, self.chan_blocked())
+        self.mux.set_timed(self, self.deadline is not None)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.mux.forget(self)
+        try:
+            self.sock.close()
+        except:
+            pass
+        try:
+            self.chan.close()
+        except:
+            pass
+        if self.on_close is not None:
+            self.on_close()
+
+
+class _RelayMultiplexer:
+    """
+    Shared readiness multiplexer used by the 'multiplex' relay mode.
+
+    One selector thread (epoll on Linux) owns every channel/socket pair of a
+    Haruka instance and only wakes when one of them is ready, so idle
+    connections cost no CPU and select()'s FD_SETSIZE ceiling does not apply.
+    Channels are watched through their paramiko fileno() pipe; since a channel
+    has no writable event, pairs waiting on a full send window are re-polled.
+    """
+
+    BLOCKED_POLL_INTERVAL = 0.01
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._incoming = []
+        self._relays = set()
+        self._blocked = set()
+        self._timed = set()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        _raise_nofile_limit()
+
+        self._thread = threading.Thread(target=self._run, name="haruka-relay-mux", daemon=True)
+        self._thread.start()
+
+    def add(self, chan, sock, connect_to=None, label="", chunk_size=DEFAULT_CHUNK_SIZE, on_close=None, sampler=None):
+        """Hand a channel/socket pair to the multiplexer (thread-safe)."""
+        relay = _MuxRelay(self, chan, sock, connect_to, label, chunk_size, on_close, sampler)
+        with self._lock:
+            self._incoming.append(relay)
+        self._wake()
+        return relay
+
+    def active_count(self):
+        """Number of pairs currently owned by the multiplexer."""
+        return len(self._relays)
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b'\0')
+        except (BlockingIOError, OSError):
+            pass
+
+    def set_interest(self, relay, fileobj, mask, side):
+        current = relay.masks.get(side, 0)
+        if mask == current:
+            return
+        if current == 0:
+            self._selector.register(fileobj, mask, (relay, side))
+        elif mask == 0:
+            self._selector.unregister(fileobj)
+        else:
+            self._selector.modify(fileobj, mask, (relay, side))
+        relay.masks[side] = mask
+
+    def set_blocked(self, relay, blocked):
+        if blocked:
+            self._blocked.add(relay)
+        else:
+            self._blocked.discard(relay)
+
+    def set_timed(self, relay, timed):
+        if timed:
+            self._timed.add(relay)
+        else:
+            self._timed.discard(relay)
+
+    def forget(self, relay):
+        for side, fileobj in (('sock', relay.sock), ('chan', relay.chan_fd)):
+            if relay.masks.get(side):
+                try:
+                    self._selector.unregister(fileobj)
+                except (KeyError, ValueError):
+                    pass
+        relay.masks.clear()
+        self._relays.discard(relay)
+        self._blocked.discard(relay)
+        self._timed.discard(relay)
+
+    def _next_timeout(self):
+        if self._blocked:
+            return self.BLOCKED_POLL_INTERVAL
+        if self._timed:
+            return max(0, min(r.deadline for r in self._timed) - time.monotonic())
+        return None
+
+    def _run(self):
+        while True:
+            for key, events in self._selector.select(self._next_timeout()):
+                if key.data is None:
+                    try:
+                        while self._wake_r.recv(4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    continue
+                relay, side = key.data
+                if relay.closed:
+                    continue
+                try:
+                    if side == 'sock':
+                        relay.on_sock_event(events)
+                    else:
+                        relay.on_chan_event(events)
+                except Exception as e:
+                    print(f"Error during data transfer: {e}")
+                    relay.close()
+
+            with self._lock:
+                incoming, self._incoming = self._incoming, []
+            for relay in incoming:
+                self._relays.add(relay)
+                relay.start()
+
+            for relay in list(self._blocked):
+                if relay.closed:
+                    continue
+                try:
+                    relay.flush_chan()
+                    relay.update()
+                except Exception as e:
+                    print(f"Error during data transfer: {e}")
+                    relay.close()
+
+            now = time.monotonic()
+            for relay in list(self._timed):
+                if relay.deadline is not None and relay.deadline <= now:
+                    relay.expire()
+
+
+class _ConnectionGate:
+    """
+    Admission control for forwarded connections across every tunnel of a
+    Haruka instance: a process-wide cap on active relays, an optional cap per
+    tunnel, and a bounded wait queue for connections that arrive while full.
+    """
+
+    def __init__(self, max_active, max_queued, policy, queue_timeout):
+        self.max_active = max_active
+        self.max_queued = max_queued
+        self.policy = policy
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self._limits = {}
+        self._tunnels = {}
+        self._active = 0
+        self._queued = 0
+        self._rejected = 0
+
+    def set_tunnel_limit(self, tunnel, max_active):
+        with self._cond:
+            self._limits[tunnel] = max_active
+            self._counts(tunnel)
+
+    def _counts(self, tunnel):
+        counts = self._tunnels.get(tunnel)
+        if counts is None:
+            counts = self._tunnels[tunnel] = {'active': 0, 'queued': 0, 'rejected': 0}
+        return counts
+
+    def _has_slot(self, tunnel):
+        limit = self._limits.get(tunnel)
+        if self._active >= self.max_active:
+            return False
+        return not limit or self._tunnels[tunnel]['active'] < limit
+
+    def _take(self, tunnel):
+        self._active += 1
+        self._tunnels[tunnel]['active'] += 1
+
+    def _reject(self, tunnel):
+        self._rejected += 1
+        self._tunnels[tunnel]['rejected'] += 1
+
+    def reserve(self, tunnel):
+        """
+        Try to admit a connection without blocking.
+
+        Returns:
+            str: 'active' if a slot was taken, 'queued' if it must wait(), or None if rejected
+        """
+        with self._cond:
+            counts = self._counts(tunnel)
+            if self._has_slot(tunnel):
+                self._take(tunnel)
+                return 'active'
+            if self.policy == 'wait' and self._queued < self.max_queued:
+                self._queued += 1
+                counts['queued'] += 1
+                return 'queued'
+            self._reject(tunnel)
+            return None
+
+    def wait(self, tunnel):
+        """
+        Block a queued connection until a slot frees up or the queue timeout passes.
+
+        Returns:
+            bool: True if a slot was taken, False if the connection timed out
+        """
+        deadline = time.monotonic() + self.queue_timeout
+        with self._cond:
+            counts = self._tunnels[tunnel]
+            try:
+                while not self._has_slot(tunnel):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._reject(tunnel)
+                        return False
+                    self._cond.wait(remaining)
+                self._take(tunnel)
+                return True
+            finally:
+                self._queued -= 1
+                counts['queued'] -= 1
+
+    def release(self, tunnel):
+        with self._cond:
+            self._active -= 1
+            self._tunnels[tunnel]['active'] -= 1
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'active': self._active,
+                'queued': self._queued,
+                'rejected': self._rejected,
+                'max_active': self.max_active,
+                'max_queued': self.max_queued,
+                'policy': self.policy,
+                'tunnels': {
+                    tunnel: dict(counts, max_active=self._limits.get(tunnel))
+                    for tunnel, counts in self._tunnels.items()
+                }
+            }
+
+
+def _raise_nofile_limit():
+    """Raise the soft open-file limit to the hard limit so large relays are not capped."""
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if hard == resource.RLIM_INFINITY or soft < hard:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+# Parsed private keys, keyed by (path, mtime) so an edited key file is re-read
+_private_key_cache = {}
+_private_key_lock = threading.Lock()
+
+
+def _load_private_key(path, passphrase=None):
+    """
+    Load an SSH private key once per process and return the cached PKey.
+
+    The key type (Ed25519, ECDSA or RSA) is detected from the file, so
+    faster-signing key types work without configuration.
+
+    Raises:
+        paramiko.SSHException, OSError if the file cannot be read or parsed
+    """
+    import paramiko
+
+    path = os.path.realpath(os.path.expanduser(path))
+    cache_key = (path, os.path.getmtime(path))
+    with _private_key_lock:
+        key = _private_key_cache.get(cache_key)
+        if key is None:
+            if hasattr(paramiko.PKey, 'from_path'):
+                key = paramiko.PKey.from_path(path, passphrase=passphrase)
+            else:
+                # paramiko < 3.2 has no type detection; try the key classes in turn
+                for key_class in (paramiko.Ed25519Key, paramiko.ECDSAKey, paramiko.RSAKey):
+                    try:
+                        key = key_class.from_private_key_file(path, password=passphrase)
+                        break
+                    except paramiko.SSHException:
+                        continue
+                else:
+                    raise paramiko.SSHException(f"Unsupported or unreadable private key: {path}")
+            for stale in [k for k in _private_key_cache if k[0] == path]:
+                del _private_key_cache[stale]
+            _private_key_cache[cache_key] = key
+        return key
+
+
+def _env_algorithms(name):
+    """Read a comma-separated SSH algorithm preference list (most preferred first) from .env."""
+    return tuple(algorithm.strip() for algorithm in os.getenv(name, "").split(',') if algorithm.strip())
+
 
 class Haruka:
     """
@@ -17,41 +807,83 @@ class Haruka:
         load_dotenv()
         self.env_loaded = True
 
+        # Shared relay engines (started lazily on first use)
+        self._relay_loop = None
+        self._relay_mux = None
+        self._relay_lock = threading.Lock()
+
+        # Admission control and bounded executor for forwarded connections
+        self._connection_gate = None
+        self._relay_executor = None
+
+        # Shared SSH transports, keyed by (host, port, user, compress)
+        self._ssh_pool = {}
+        self._ssh_pool_next = {}
+        self._ssh_pool_lock = threading.RLock()
+        # Connections being opened outside the pool lock, by key, and the condition
+        # notified when they join the pool (or fail)
+        self._ssh_pool_opening = {}
+        self._ssh_pool_ready = threading.Condition(self._ssh_pool_lock)
+        self._ssh_pool_settings = {}
+        self._reverse_routes = {}
+        self._transport_channels = {}
+        self._global_request_locks = {}
+        self._link_stats = {}
+        self._probe_history = {}
+        # compression=auto decisions by bind port, kept for the life of the instance
+        self._compression_decisions = {}
+
+        # OpenSSH ControlMaster processes (SSH_BACKEND=openssh), keyed by (host, port, user, compress)
+        self._openssh_masters = {}
+        self._openssh_lock = threading.RLock()
+        self._openssh_dir = None
+
+        # Health results by bind port, refreshed by the optional background sweeper
+        self._health_cache = {}
+        self._health_refresh_lock = threading.Lock()
+        self._health_sweeper = None
+        self._health_sweeper_stop = threading.Event()
+
+        # Reverse forwards whose transport died, waiting for the supervisor to restore them
+        self._lost_routes = {}
+        self._supervisor_thread = None
+        self._supervisor_stop = threading.Event()
+        self._supervisor_stats = {'reconnects': 0, 'restored_tunnels': 0, 'last_restore_seconds': None}
+
+        # Set once the port_configs schema has been migrated for this instance
+        self._schema_checked = False
+
+        # Shared DuckDB connection (handed out as cursors) and the cached config list
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._db_users = 0
+        self._db_last_used = 0
+        self._db_close_timer = None
+        self._config_cache = None
+        self._config_cache_stamp = None
+        self._config_by_bind_port = {}
+
     def test_ssh_connection(self):
         """
         Test SSH connection using the parameters from .env file.
         Returns True if connection is successful, False otherwise.
         """
-        ssh_host = os.getenv("SSH_HOST")
-        ssh_port = int(os.getenv("SSH_PORT", 22))
-        ssh_user = os.getenv("SSH_USER")
-        private_key_path = os.getenv("PRIVATE_KEY_PATH")
+        import paramiko
 
-        if not all([ssh_host, ssh_user, private_key_path]):
+        settings = self._ssh_settings()
+        if settings is None:
             print("Error: Missing required environment variables (SSH_HOST, SSH_USER, PRIVATE_KEY_PATH)")
             return False
 
         try:
-            # Create SSH client
-            client = paramiko.SSHClient()
-            client.load_system_host_keys()
-            client.set_missing_host_key_policy(paramiko.WarningPolicy())
-
-            # Load private key
-            private_key = paramiko.RSAKey(filename=private_key_path)
-
-            # Attempt connection
-            print(f"Attempting to connect to {ssh_user}@{ssh_host}:{ssh_port}...")
-            client.connect(
-                hostname=str(ssh_host),
-                port=ssh_port,
-                username=str(ssh_user),
-                pkey=private_key,
-                timeout=10
-            )
+            # Always a fresh connection, so the test is independent of the shared pool
+            print(f"Attempting to connect to {settings['user']}@{settings['host']}:{settings['port']}...")
+            client = self._open_ssh_client(settings)
 
             # If we reach here, connection was successful
             print("SSH connection successful!")
+            transport = client.get_transport()
+            print(f"  Cipher: {transport.local_cipher}, MAC: {transport.local_mac}")
             client.close()
             return True
 
@@ -70,6 +902,8 @@ class Haruka:
         Test basic DuckDB functionality.
         Returns True if all tests pass, False otherwise.
         """
+        import duckdb
+
         try:
             # Connect to an in-memory DuckDB database
             con = duckdb.connect(':memory:')
@@ -110,154 +944,696 @@ class Haruka:
             print(f"✗ DuckDB test failed: {e}")
             return False
 
-    def reverse_forward_tunnel(self, local_port, bind_port, background=False):
+    def _ssh_settings(self):
         """
-        Reverse port forward: expose local service to public SSH server.
-
-        Args:
-            local_port (int): Local port where your service is running
-            bind_port (int): Port to bind on the SSH server (public facing)
-            background (bool): If True, run in background thread
+        Read SSH connection settings from .env.
 
         Returns:
-            bool: True if reverse forwarding started successfully, False otherwise
+            dict: host, port, user, key_path, key_passphrase, use_agent, forward_host,
+                the keepalive settings and the ciphers/macs/kex preferences (empty for the
+                library defaults), or None if a required value is missing
         """
-        ssh_host = os.getenv("SSH_HOST")
-        ssh_port = int(os.getenv("SSH_PORT", 22))
-        ssh_user = os.getenv("SSH_USER")
-        private_key_path = os.getenv("PRIVATE_KEY_PATH")
-        forward_host = os.getenv("FORWARD_HOST", "localhost")
-
-        if not all([ssh_host, ssh_user, private_key_path]):
-            print("Error: Missing required environment variables (SSH_HOST, SSH_USER, PRIVATE_KEY_PATH)")
-            return False
-
-        try:
-            # Create SSH client
-            client = paramiko.SSHClient()
-            client.load_system_host_keys()
-            client.set_missing_host_key_policy(paramiko.WarningPolicy())
+        settings = {
+            'host': os.getenv("SSH_HOST"),
+            'port': int(os.getenv("SSH_PORT", 22)),
+            'user': os.getenv("SSH_USER"),
+            'key_path': os.getenv("PRIVATE_KEY_PATH"),
+            'key_passphrase': os.getenv("PRIVATE_KEY_PASSPHRASE") or None,
+            'use_agent': os.getenv("SSH_USE_AGENT", "False").lower() in ('1', 'true', 'yes'),
+            'forward_host': os.getenv("FORWARD_HOST", "localhost"),
+            'keepalive_interval': float(os.getenv("SSH_KEEPALIVE_INTERVAL", DEFAULT_KEEPALIVE_INTERVAL)),
+            'keepalive_max_missed': int(os.getenv("SSH_KEEPALIVE_MAX_MISSED", DEFAULT_KEEPALIVE_MAX_MISSED)),
+            'ciphers': _env_algorithms("SSH_CIPHERS"),
+            'macs': _env_algorithms("SSH_MACS"),
+            'kex': _env_algorithms("SSH_KEX"),
+        }
+        # With ssh-agent enabled the key file is optional
+        if not all([settings['host'], settings['user'], settings['key_path'] or settings['use_agent']]):
+            return None
+        return settings
 
-            # Load private key
-            private_key = paramiko.RSAKey(filename=private_key_path)
+    def _open_ssh_client(self, settings, compress=False):
+        """
+        Open and authenticate a new SSH connection, zlib-compressed if compress is set
+        (and the server allows it).
 
-            # Connect to SSH server
-            print(f"Connecting to SSH server {ssh_user}@{ssh_host}:{ssh_port}...")
-            client.connect(
-                hostname=str(ssh_host),
-                port=ssh_port,
-                username=str(ssh_user),
-                pkey=private_key,
-                timeout=10
-            )
+        Raises:
+            paramiko.AuthenticationException, paramiko.SSHException, OSError on failure
+        """
+        import paramiko
 
-            print(f"Setting up reverse port forwarding:")
-            print(f"  Local service: localhost:{local_port}")
-            print(f"  Public access: {ssh_host}:{bind_port}")
+        client = paramiko.SSHClient()
+        client.load_system_host_keys()
+        client.set_missing_host_key_policy(paramiko.WarningPolicy())
 
-            # Start the reverse forwarding
-            if background:
-                thread = threading.Thread(
-                    target=self._reverse_forward_worker,
-                    args=(client.get_transport(), bind_port, forward_host, local_port),
-                    daemon=True
-                )
-                thread.start()
-                print(f"Reverse port forwarding started in background")
-                print(f"✓ Public users can now access your service at {ssh_host}:{bind_port}")
-                return True
-            else:
-                # Run in foreground
-                self._reverse_forward_worker(client.get_transport(), bind_port, forward_host, local_port)
-                return True
+        # Parsed once per process; ssh-agent keys are offered after it when SSH_USE_AGENT is set
+        private_key = None
+        if settings['key_path']:
+            private_key = _load_private_key(settings['key_path'], settings['key_passphrase'])
 
-        except paramiko.AuthenticationException:
-            print("SSH authentication failed. Please check your private key and username.")
-            return False
-        except paramiko.SSHException as e:
-            print(f"SSH connection failed: {e}")
-            return False
-        except Exception as e:
-            print(f"Failed to setup reverse port forwarding: {e}")
-            return False
+        client.connect(
+            hostname=str(settings['host']),
+            port=settings['port'],
+            username=str(settings['user']),
+            pkey=private_key,
+            allow_agent=settings['use_agent'],
+            look_for_keys=False,
+            timeout=10,
+            compress=compress,
+            transport_factory=self._transport_factory(settings)
+        )
+        return client
 
-    def reverse_forward_multiple(self, port_mappings, background=False):
+    def _transport_factory(self, settings):
         """
-        Reverse port forward multiple services simultaneously.
+        Build a paramiko Transport factory that applies the host's SSH_CIPHERS,
+        SSH_MACS and SSH_KEX preferences before negotiation starts.
 
-        Args:
-            port_mappings (list): List of tuples or dicts specifying port mappings
-            background (bool): If True, run in background threads
+        Each list replaces paramiko's default order, as the matching OpenSSH
+        options do. Names paramiko does not implement (e.g. chacha20-poly1305)
+        are skipped with a warning.
 
         Returns:
-            bool: True if all reverse forwardings started successfully, False otherwise
+            callable: Transport factory, or None to keep paramiko's defaults
         """
-        ssh_host = os.getenv("SSH_HOST")
-        ssh_port = int(os.getenv("SSH_PORT", 22))
-        ssh_user = os.getenv("SSH_USER")
-        private_key_path = os.getenv("PRIVATE_KEY_PATH")
-        forward_host = os.getenv("FORWARD_HOST", "localhost")
+        import paramiko
 
-        if not all([ssh_host, ssh_user, private_key_path]):
-            print("Error: Missing required environment variables (SSH_HOST, SSH_USER, PRIVATE_KEY_PATH)")
-            return False
+        preferences = {}
+        for option, env_name, names, supported in (
+            ('ciphers', "SSH_CIPHERS", settings['ciphers'], paramiko.Transport._cipher_info),
+            ('digests', "SSH_MACS", settings['macs'], paramiko.Transport._mac_info),
+            ('kex', "SSH_KEX", settings['kex'], paramiko.Transport._kex_info),
+        ):
+            usable = tuple(name for name in names if name in supported)
+            skipped = [name for name in names if name not in supported]
+            if skipped:
+                print(f"⚠ {env_name}: paramiko does not support {', '.join(skipped)}, skipped")
+            if usable:
+                preferences[option] = usable
+            elif names:
+                print(f"⚠ {env_name}: no supported algorithm left, using paramiko's defaults")
+        if not preferences:
+            return None
 
-        if not port_mappings or len(port_mappings) == 0:
-            print("Error: No port mappings provided")
-            return False
+        def make_transport(*args, **kwargs):
+            transport = paramiko.Transport(*args, **kwargs)
+            options = transport.get_security_options()
+            for option, names in preferences.items():
+                setattr(options, option, names)
+            return transport
 
-        try:
-            # Create SSH client
-            client = paramiko.SSHClient()
-            client.load_system_host_keys()
-            client.set_missing_host_key_policy(paramiko.WarningPolicy())
+        return make_transport
 
-            # Load private key
-            private_key = paramiko.RSAKey(filename=private_key_path)
+    def _borrow_ssh_client(self, settings=None, shard_key=None, compress=False):
+        """
+        Borrow an authenticated SSH client from the shared transport pool.
 
-            # Connect to SSH server
-            print(f"Connecting to SSH server {ssh_user}@{ssh_host}:{ssh_port}...")
-            client.connect(
-                hostname=str(ssh_host),
-                port=ssh_port,
-                username=str(ssh_user),
-                pkey=private_key,
-                timeout=10
-            )
+        Up to SSH_TRANSPORTS_PER_HOST connections (default 1) are kept per
+        SSH host and compression setting; dead ones are dropped and replaced. Each transport has its
+        own packet thread, so spreading tunnels over several transports
+        spreads their encryption work. SSH_SHARD_POLICY picks the transport:
+        round_robin (default), hash (by shard_key) or least_loaded.
+        Borrowed clients must not be closed by the caller.
 
-            transport = client.get_transport()
-            print(f"Setting up {len(port_mappings)} reverse port forwarding tunnels:")
+        Args:
+            settings (dict, optional): Connection settings (default: from .env)
+            shard_key (int, optional): Stable key for the hash policy, e.g. the bind port
+            compress (bool): Borrow from the zlib-compressed pool instead of the uncompressed one
 
-            # Parse port mappings and start forwarding for each
-            for idx, mapping in enumerate(port_mappings, 1):
-                # Parse mapping format
-                if isinstance(mapping, (tuple, list)):
-                    local_port, bind_port = mapping
-                elif isinstance(mapping, dict):
-                    local_port = mapping.get('local') or mapping.get('local_port')
-                    bind_port = mapping.get('bind') or mapping.get('bind_port')
-                else:
-                    print(f"  ✗ Invalid mapping format at index {idx}: {mapping}")
-                    continue
+        Raises:
+            paramiko.AuthenticationException, paramiko.SSHException, OSError if a new connection fails
+        """
+        settings = settings or self._ssh_settings()
+        key = (settings['host'], settings['port'], settings['user'], compress)
+        size = max(1, int(os.getenv("SSH_TRANSPORTS_PER_HOST", 1)))
+        policy = os.getenv("SSH_SHARD_POLICY", "round_robin").strip().lower()
+        if policy not in SHARD_POLICIES:
+            policy = 'round_robin'
 
-                print(f"  {idx}. localhost:{local_port} -> {ssh_host}:{bind_port}")
+        with self._ssh_pool_lock:
+            self._ssh_pool_settings[key] = settings
+            while True:
+                clients = self._ssh_pool.setdefault(key, [])
+                for client in [c for c in clients if not c.get_transport() or not c.get_transport().is_active()]:
+                    self._discard_ssh_client(key, client, keep_routes=True)
 
-                # Start the reverse forwarding for this port
-                if background:
-                    thread = threading.Thread(
-                        target=self._reverse_forward_worker,
-                        args=(transport, bind_port, forward_host, local_port),
-                        daemon=True
-                    )
-                    thread.start()
-                else:
-                    self._reverse_forward_worker(transport, bind_port, forward_host, local_port)
+                # Connections other threads are opening already count towards the pool size
+                opening = self._ssh_pool_opening.get(key, 0)
+                missing = size - len(clients) - opening
+                if missing > 0:
+                    # Hash slots are only stable once the pool is full; the other policies fill it lazily
+                    count = missing if policy == 'hash' else 1
+                    self._ssh_pool_opening[key] = opening + count
+                    break
+                if clients and not (policy == 'hash' and opening):
+                    return self._pick_pooled_client(key, clients, policy, shard_key)
+                self._ssh_pool_ready.wait()
 
-            if background:
-                print(f"\n✓ All {len(port_mappings)} reverse port forwarding tunnels started in background")
-                return True
-            else:
+        # Connect without the pool lock: transport threads take it for every
+        # forwarded channel, and a handshake can take seconds
+        opened, errors = [], []
+        try:
+            print(f"Connecting to SSH server {settings['user']}@{settings['host']}:{settings['port']}"
+                  f"{' (compressed)' if compress else ''}{f' ({count} connections)' if count > 1 else ''}...")
+            self._open_ssh_clients(settings, compress, count, opened, errors)
+        finally:
+            extra = self._add_pooled_clients(key, opened, count, size, settings)
+            for client in extra:
+                client.close()
+        if errors:
+            raise errors[0]
+
+        with self._ssh_pool_lock:
+            clients = self._ssh_pool[key]
+            if policy != 'hash' and opened[0] in clients:
+                return opened[0]
+            return self._pick_pooled_client(key, clients, policy, shard_key)
+
+    def _open_ssh_clients(self, settings, compress, count, opened, errors):
+        """
+        Open count SSH connections with overlapping handshakes.
+
+        Filling a hash-sharded pool needs every connection before any slot can
+        be picked, so they are opened from helper threads instead of one
+        after another. Clients are appended to opened, exceptions to errors.
+        """
+        def connect():
+            try:
+                opened.append(self._open_ssh_client(settings, compress))
+            except Exception as e:
+                errors.append(e)
+
+        helpers = [
+            threading.Thread(target=connect, name=f"haruka-connect-{settings['host']}", daemon=True)
+            for _ in range(count - 1)
+        ]
+        for helper in helpers:
+            helper.start()
+        connect()
+        for helper in helpers:
+            helper.join()
+
+    def _add_pooled_clients(self, key, opened, reserved, size, settings):
+        """
+        Put connections opened outside the pool lock into the pool and release their reservation.
+
+        The pool is checked again first: if it filled up meanwhile (e.g. after
+        close_ssh_connections() and a fresh borrow), the surplus is returned
+        for the caller to close.
+
+        Returns:
+            list: Clients that did not fit
+        """
+        extra = []
+        with self._ssh_pool_lock:
+            self._ssh_pool_opening[key] = self._ssh_pool_opening.get(key, 0) - reserved
+            clients = self._ssh_pool.setdefault(key, [])
+            for client in opened:
+                if len(clients) + self._ssh_pool_opening[key] < size:
+                    clients.append(client)
+                    self._start_keepalive_monitor(key, client.get_transport(), settings)
+                else:
+                    extra.append(client)
+            self._ssh_pool_ready.notify_all()
+        return extra
+
+    def _pick_pooled_client(self, key, clients, policy, shard_key):
+        """Choose a pooled client by SSH_SHARD_POLICY (caller holds the pool lock)."""
+        if policy == 'hash' and shard_key is not None:
+            return clients[hash(shard_key) % len(clients)]
+        if policy == 'least_loaded':
+            return min(clients, key=lambda c: self._transport_load(c.get_transport()))
+
+        index = self._ssh_pool_next.get(key, 0) % len(clients)
+        self._ssh_pool_next[key] = index + 1
+        return clients[index]
+
+    def _pool_key(self, transport):
+        """Pool key (host, port, user, compress) a transport was borrowed under, or None if it is not pooled."""
+        with self._ssh_pool_lock:
+            for key, clients in self._ssh_pool.items():
+                if any(client.get_transport() is transport for client in clients):
+                    return key
+        return None
+
+    def _transport_load(self, transport):
+        """Tunnels plus open relayed channels on a pooled transport (caller holds the pool lock)."""
+        channels = self._transport_channels.get(transport, ())
+        return len(self._reverse_routes.get(transport, {})) + sum(1 for chan in channels if not chan.closed)
+
+    def _track_channel(self, chan):
+        """Count a relayed channel against its transport for the least_loaded shard policy."""
+        with self._ssh_pool_lock:
+            self._transport_channels.setdefault(chan.get_transport(), weakref.WeakSet()).add(chan)
+
+    def _discard_ssh_client(self, key, client, keep_routes=False):
+        """
+        Drop a client from the pool along with its routes (caller holds the pool lock).
+        With keep_routes the reverse forwards it carried are queued for the supervisor to restore.
+        """
+        transport = client.get_transport()
+        if client in self._ssh_pool.get(key, []):
+            self._ssh_pool[key].remove(client)
+        routes = self._reverse_routes.pop(transport, None)
+        self._transport_channels.pop(transport, None)
+        self._global_request_locks.pop(transport, None)
+        if routes:
+            self._invalidate_health(*routes)
+        if keep_routes and routes:
+            print(f"⚠ SSH connection to {key[0]}:{key[1]} lost, {len(routes)} tunnel(s) waiting to be restored")
+            now = time.monotonic()
+            lost = self._lost_routes.setdefault(key, {
+                'routes': {}, 'lost_at': now, 'retry_at': now, 'delay': RECONNECT_BACKOFF_BASE, 'refused': {}
+            })
+            lost['routes'].update(routes)
+        try:
+            client.close()
+        except Exception:
+            pass
+
+    def _start_keepalive_monitor(self, key, transport, settings):
+        """Start the keepalive/RTT monitor thread for a new pooled transport (0 interval disables it)."""
+        interval = settings['keepalive_interval']
+        if interval <= 0:
+            return
+        self._link_stats[transport] = {
+            'host': key[0],
+            'port': key[1],
+            'missed': 0,
+            'last_rtt': None,
+            'samples': deque(maxlen=RTT_HISTORY),
+        }
+        threading.Thread(
+            target=self._keepalive_monitor, args=(transport, interval, max(1, settings['keepalive_max_missed'])),
+            name=f"haruka-keepalive-{key[0]}", daemon=True
+        ).start()
+
+    def _keepalive_monitor(self, transport, interval, max_missed):
+        """
+        Send a timed keepalive request every interval seconds and record its RTT.
+        After max_missed unanswered keepalives in a row the transport is closed,
+        so the supervisor reconnects instead of waiting for TCP to give up.
+        """
+        stats = self._link_stats[transport]
+        while transport.is_active():
+            rtt = self._sample_rtt(transport, timeout=interval)
+            if rtt is not None:
+                stats['missed'] = 0
+                stats['last_rtt'] = rtt
+                stats['samples'].append(rtt)
+                time.sleep(interval)
+                continue
+            if not transport.is_active():
+                break
+
+            # The probe already waited a full interval
+            stats['missed'] += 1
+            print(f"⚠ Keepalive to {stats['host']}:{stats['port']} unanswered ({stats['missed']}/{max_missed})")
+            if stats['missed'] >= max_missed:
+                print(f"✗ SSH connection to {stats['host']}:{stats['port']} is unresponsive, closing it")
+                transport.close()
+                break
+        self._link_stats.pop(transport, None)
+
+    def _sample_rtt(self, transport, timeout, padding=0):
+        """
+        Time one keepalive@openssh.com global request (any reply counts).
+        With padding, that many bytes of SSH_MSG_IGNORE are sent ahead of it,
+        so the reply also waits for them to cross the uplink.
+
+        Returns:
+            float: Round-trip time in seconds, or None if no reply arrived within timeout
+        """
+        with self._ssh_pool_lock:
+            request_lock = self._global_request_locks.setdefault(transport, threading.Lock())
+        result = {}
+        done = threading.Event()
+
+        def probe():
+            # paramiko waits for the reply without a timeout, so probe from a helper thread
+            with request_lock:
+                start = time.perf_counter()
+                for offset in range(0, padding, 16384):
+                    transport.send_ignore(min(16384, padding - offset))
+                transport.global_request("keepalive@openssh.com", wait=True)
+                result['rtt'] = time.perf_counter() - start
+            done.set()
+
+        threading.Thread(target=probe, name="haruka-rtt-probe", daemon=True).start()
+        if not done.wait(timeout) or not transport.is_active():
+            return None
+        return result['rtt']
+
+    def get_link_stats(self):
+        """
+        Get keepalive and latency figures for every pooled SSH connection.
+
+        Returns:
+            list: One dict per connection with host, port, missed (consecutive
+                unanswered keepalives), tunnels and open channels it carries, the
+                negotiated cipher and mac, and rtt_ms last/avg/min/max over the recent samples
+        """
+        links = []
+        for transport, stats in list(self._link_stats.items()):
+            samples = list(stats['samples'])
+            links.append({
+                'host': stats['host'],
+                'port': stats['port'],
+                'active': transport.is_active(),
+                'missed': stats['missed'],
+                'tunnels': len(self._reverse_routes.get(transport, {})),
+                'channels': sum(1 for chan in self._transport_channels.get(transport, ()) if not chan.closed),
+                'cipher': transport.local_cipher,
+                'mac': transport.local_mac,
+                'rtt_ms': round(stats['last_rtt'] * 1000, 2) if stats['last_rtt'] is not None else None,
+                'rtt_avg_ms': round(sum(samples) / len(samples) * 1000, 2) if samples else None,
+                'rtt_min_ms': round(min(samples) * 1000, 2) if samples else None,
+                'rtt_max_ms': round(max(samples) * 1000, 2) if samples else None,
+            })
+        return links
+
+    def close_ssh_connections(self):
+        """
+        Close every pooled SSH connection and OpenSSH master (and with them all tunnels they carry).
+        """
+        with self._ssh_pool_lock:
+            for key, clients in list(self._ssh_pool.items()):
+                for client in list(clients):
+                    self._discard_ssh_client(key, client)
+            self._ssh_pool.clear()
+        self._stop_openssh_masters()
+
+    def start_tunnel_supervisor(self, interval=None):
+        """
+        Start the background supervisor that restores tunnels after the SSH connection drops.
+
+        Every interval seconds dead pooled transports are dropped, the
+        connection is re-established and every reverse forward they carried
+        is requested again (exited OpenSSH masters are restarted and their
+        forwards re-added the same way), backing off exponentially (with
+        jitter) while the server stays unreachable. A bind port still held by the stale
+        server-side session is cleaned up with kill_zombie_ports_ssh_server()
+        unless SUPERVISOR_KILL_ZOMBIES is False; a session that still serves
+        other live ports is never killed.
+
+        Args:
+            interval (float, optional): Seconds between checks.
+                Defaults to SUPERVISOR_INTERVAL from .env or DEFAULT_SUPERVISOR_INTERVAL.
+
+        Returns:
+            bool: True if the supervisor is running
+        """
+        if interval is None:
+            interval = float(os.getenv("SUPERVISOR_INTERVAL", DEFAULT_SUPERVISOR_INTERVAL))
+
+        with self._ssh_pool_lock:
+            if self._supervisor_thread is not None and self._supervisor_thread.is_alive():
                 return True
+            self._supervisor_stop.clear()
+            self._supervisor_thread = threading.Thread(
+                target=self._supervise, args=(interval,), name="haruka-supervisor", daemon=True
+            )
+            self._supervisor_thread.start()
+
+        print(f"✓ Tunnel supervisor started (checking every {interval}s)")
+        return True
+
+    def stop_tunnel_supervisor(self):
+        """
+        Stop the tunnel supervisor. Running tunnels are left untouched.
+        """
+        self._supervisor_stop.set()
+        thread = self._supervisor_thread
+        if thread is not None:
+            thread.join(timeout=5)
+        self._supervisor_thread = None
+
+    def get_supervisor_stats(self):
+        """
+        Get tunnel supervisor counters.
+
+        Returns:
+            dict: running, reconnects, restored_tunnels, pending_tunnels and
+                last_restore_seconds (outage-to-restore time of the last recovery)
+        """
+        with self._ssh_pool_lock:
+            stats = dict(self._supervisor_stats)
+            stats['pending_tunnels'] = sum(len(lost['routes']) for lost in self._lost_routes.values())
+        with self._openssh_lock:
+            stats['pending_tunnels'] += sum(len(master['lost']) for master in self._openssh_masters.values())
+        stats['running'] = self._supervisor_thread is not None and self._supervisor_thread.is_alive()
+        return stats
+
+    def _supervise(self, interval):
+        """Supervisor loop: reap dead transports, then restore whatever is due."""
+        while not self._supervisor_stop.wait(interval):
+            try:
+                self._reap_dead_transports()
+                self._restore_lost_routes()
+                self._restore_openssh_forwards()
+            except Exception as e:
+                print(f"✗ Tunnel supervisor error: {e}")
+
+    def _reap_dead_transports(self):
+        """Drop pooled transports that are no longer active, keeping their routes."""
+        with self._ssh_pool_lock:
+            for key, clients in list(self._ssh_pool.items()):
+                for client in list(clients):
+                    transport = client.get_transport()
+                    if transport is None or not transport.is_active():
+                        self._discard_ssh_client(key, client, keep_routes=True)
+
+    def _restore_lost_routes(self):
+        """Reconnect and re-request lost reverse forwards whose backoff has expired."""
+        now = time.monotonic()
+        kill_zombies = os.getenv("SUPERVISOR_KILL_ZOMBIES", "True").lower() in ('1', 'true', 'yes')
+        with self._ssh_pool_lock:
+            due = [(key, lost) for key, lost in self._lost_routes.items() if lost['retry_at'] <= now]
+
+        for key, lost in due:
+            settings = self._ssh_pool_settings.get(key)
+            try:
+                transport = self._borrow_ssh_client(settings, compress=key[3]).get_transport()
+                self._supervisor_stats['reconnects'] += 1
+            except Exception as e:
+                self._schedule_restore(lost, f"reconnect to {key[0]}:{key[1]} failed: {e}")
+                continue
+
+            reap = []
+            for bind_port, route in list(lost['routes'].items()):
+                try:
+                    transport = self._borrow_ssh_client(settings, shard_key=bind_port, compress=key[3]).get_transport()
+                except Exception as e:
+                    print(f"✗ Could not reconnect for port {bind_port}: {e}")
+                    continue
+                if self._start_reverse_forward(
+                    transport, bind_port, route['local_host'], route['local_port'], route['relay_mode'],
+                    route['chunk_size'], route['max_connections'], route['compression']
+                ):
+                    with self._ssh_pool_lock:
+                        lost['routes'].pop(bind_port, None)
+                        self._supervisor_stats['restored_tunnels'] += 1
+                    continue
+
+                # The server usually still holds the port for the stale session; clean it up once
+                lost['refused'][bind_port] = lost['refused'].get(bind_port, 0) + 1
+                if lost['refused'][bind_port] == 2 and kill_zombies:
+                    reap.append(bind_port)
+            if reap:
+                self._supervisor_reap(reap)
+
+            with self._ssh_pool_lock:
+                if lost['routes']:
+                    self._schedule_restore(lost, f"{len(lost['routes'])} tunnel(s) still waiting")
+                    continue
+                elapsed = time.monotonic() - lost['lost_at']
+                self._supervisor_stats['last_restore_seconds'] = elapsed
+                self._lost_routes.pop(key, None)
+            print(f"✓ Tunnels to {key[0]}:{key[1]} restored in {elapsed:.1f}s")
+
+    def _schedule_restore(self, lost, reason):
+        """Push the next restore attempt back with exponential backoff and jitter."""
+        delay = lost['delay']
+        lost['retry_at'] = time.monotonic() + delay / 2 + random.uniform(0, delay / 2)
+        lost['delay'] = min(RECONNECT_BACKOFF_MAX, delay * 2)
+        print(f"⚠ {reason}, retrying in ~{delay:.1f}s")
+
+    def reverse_forward_tunnel(self, local_port, bind_port, background=False, relay_mode=None, chunk_size=None,
+                               max_connections=None, backend=None, compression=None):
+        """
+        Reverse port forward: expose local service to public SSH server.
+        The SSH connection is borrowed from the shared transport pool, or with
+        the openssh backend the forward is added to the host's ssh ControlMaster.
+
+        Args:
+            local_port (int): Local port where your service is running
+            bind_port (int): Port to bind on the SSH server (public facing)
+            background (bool): If True, return once the port is bound; otherwise block while the tunnel is up
+            relay_mode (str, optional): Relay engine, one of RELAY_MODES.
+                Defaults to RELAY_MODE from .env or 'thread'.
+            chunk_size (int, optional): Per-connection relay buffer size in bytes.
+                Defaults to RELAY_CHUNK_SIZE from .env or DEFAULT_CHUNK_SIZE.
+            max_connections (int, optional): Concurrent connections allowed on this tunnel.
+                Defaults to MAX_CONNECTIONS_PER_TUNNEL from .env; 0 means only the process-wide cap.
+            backend (str, optional): Tunnel backend, one of SSH_BACKENDS.
+                Defaults to SSH_BACKEND from .env or 'paramiko'. relay_mode, chunk_size and
+                max_connections do not apply to 'openssh', which relays the connections itself.
+            compression (str, optional): SSH compression, one of COMPRESSION_MODES.
+                Defaults to SSH_COMPRESSION from .env or 'off'.
+
+        Returns:
+            bool: True if reverse forwarding started successfully, False otherwise
+        """
+        import paramiko
+
+        settings = self._ssh_settings()
+        if settings is None:
+            print("Error: Missing required environment variables (SSH_HOST, SSH_USER, PRIVATE_KEY_PATH)")
+            return False
+
+        backend = self._resolve_backend(backend)
+        relay_mode = self._resolve_relay_mode(relay_mode)
+        chunk_size = self._resolve_chunk_size(chunk_size)
+        compression = self._resolve_compression(compression, backend)
+        if backend is None or relay_mode is None or chunk_size is None or compression is None:
+            return False
+        compress = self._compress_tunnel(bind_port, compression)
+
+        try:
+            if backend == 'paramiko':
+                transport = self._borrow_ssh_client(settings, shard_key=bind_port, compress=compress).get_transport()
+
+            print(f"Setting up reverse port forwarding:")
+            print(f"  Local service: localhost:{local_port}")
+            print(f"  Public access: {settings['host']}:{bind_port}")
+
+            if backend == 'openssh':
+                started = self._start_openssh_forward(
+                    settings, 'R', bind_port, settings['forward_host'], local_port, compress
+                )
+            else:
+                started = self._start_reverse_forward(
+                    transport, bind_port, settings['forward_host'], local_port, relay_mode, chunk_size,
+                    max_connections, compression
+                )
+            if not started:
+                return False
+
+            if background:
+                print(f"Reverse port forwarding started in background")
+                print(f"✓ Public users can now access your service at {settings['host']}:{bind_port}")
+            elif backend == 'openssh':
+                self._wait_for_openssh(settings, compress)
+            else:
+                # Run in foreground
+                self._wait_for_transport(transport)
+            return True
+
+        except paramiko.AuthenticationException:
+            print("SSH authentication failed. Please check your private key and username.")
+            return False
+        except paramiko.SSHException as e:
+            print(f"SSH connection failed: {e}")
+            return False
+        except Exception as e:
+            print(f"Failed to setup reverse port forwarding: {e}")
+            return False
+
+    def reverse_forward_multiple(self, port_mappings, background=False, relay_mode=None, chunk_size=None,
+                                 max_connections=None, backend=None, compression=None):
+        """
+        Reverse port forward multiple services simultaneously over the shared SSH transport pool.
+
+        Each mapping borrows a pooled transport for its bind port: up to
+        SSH_TRANSPORTS_PER_HOST connections per host, picked by SSH_SHARD_POLICY
+        (round_robin, hash or least_loaded), with compressed and uncompressed
+        tunnels on separate pools. With the openssh backend the forwards are
+        added to the host's ControlMaster (one per compression setting) instead.
+
+        Args:
+            port_mappings (list): List of tuples or dicts specifying port mappings.
+                Dicts may carry their own 'chunk_size' and 'compression'.
+            background (bool): If True, return once all ports are bound; otherwise block while the tunnels are up
+            relay_mode (str, optional): Relay engine, one of RELAY_MODES
+            chunk_size (int, optional): Default relay buffer size for every mapping
+            max_connections (int, optional): Concurrent connections allowed per mapping
+            backend (str, optional): Tunnel backend, one of SSH_BACKENDS
+            compression (str, optional): Default SSH compression for every mapping, one of COMPRESSION_MODES
+
+        Returns:
+            bool: True if all reverse forwardings started successfully, False otherwise
+        """
+        import paramiko
+
+        settings = self._ssh_settings()
+        if settings is None:
+            print("Error: Missing required environment variables (SSH_HOST, SSH_USER, PRIVATE_KEY_PATH)")
+            return False
+
+        if not port_mappings or len(port_mappings) == 0:
+            print("Error: No port mappings provided")
+            return False
+
+        backend = self._resolve_backend(backend)
+        relay_mode = self._resolve_relay_mode(relay_mode)
+        chunk_size = self._resolve_chunk_size(chunk_size)
+        compression = self._resolve_compression(compression, backend)
+        if backend is None or relay_mode is None or chunk_size is None or compression is None:
+            return False
+
+        try:
+            transports = []
+            masters = set()
+            print(f"Setting up {len(port_mappings)} reverse port forwarding tunnels:")
+
+            all_started = True
+            # Parse port mappings and start forwarding for each
+            for idx, mapping in enumerate(port_mappings, 1):
+                # Parse mapping format
+                mapping_chunk_size = chunk_size
+                mapping_compression = compression
+                if isinstance(mapping, (tuple, list)):
+                    local_port, bind_port = mapping
+                elif isinstance(mapping, dict):
+                    local_port = mapping.get('local') or mapping.get('local_port')
+                    bind_port = mapping.get('bind') or mapping.get('bind_port')
+                    if mapping.get('chunk_size'):
+                        mapping_chunk_size = self._resolve_chunk_size(mapping['chunk_size']) or chunk_size
+                    if mapping.get('compression'):
+                        mapping_compression = self._resolve_compression(mapping['compression'], backend) or compression
+                else:
+                    print(f"  ✗ Invalid mapping format at index {idx}: {mapping}")
+                    all_started = False
+                    continue
+
+                print(f"  {idx}. localhost:{local_port} -> {settings['host']}:{bind_port}")
+                compress = self._compress_tunnel(bind_port, mapping_compression)
+
+                if backend == 'openssh':
+                    masters.add(compress)
+                    if not self._start_openssh_forward(
+                        settings, 'R', bind_port, settings['forward_host'], local_port, compress
+                    ):
+                        all_started = False
+                    continue
+
+                # Start the reverse forwarding for this port on its shard of the (compressed or plain) transport pool
+                transport = self._borrow_ssh_client(settings, shard_key=bind_port, compress=compress).get_transport()
+                transports.append(transport)
+                if not self._start_reverse_forward(
+                    transport, bind_port, settings['forward_host'], local_port, relay_mode, mapping_chunk_size,
+                    max_connections, mapping_compression
+                ):
+                    all_started = False
+
+            if background:
+                if all_started:
+                    print(f"\n✓ All {len(port_mappings)} reverse port forwarding tunnels started in background")
+            elif backend == 'openssh':
+                self._wait_for_openssh(settings, *masters)
+            elif transports:
+                self._wait_for_transport(*set(transports))
+            return all_started
 
         except paramiko.AuthenticationException:
             print("SSH authentication failed. Please check your private key and username.")
@@ -269,39 +1645,311 @@ class Haruka:
             print(f"Failed to setup multiple reverse port forwarding: {e}")
             return False
 
-    def _reverse_forward_worker(self, transport, bind_port, local_host, local_port):
+    def start_reverse_tunnels(self, configs, relay_mode=None, concurrency=None, max_retries=DEFAULT_STARTUP_RETRIES,
+                              max_connections=None, backend=None):
+        """
+        Bring up reverse tunnels for many port configurations concurrently.
+
+        Each tunnel is requested from a bounded worker pool and retried on
+        failure with exponential backoff plus jitter, so one refused port
+        does not hold up the rest.
+
+        Args:
+            configs (list): Port configuration dicts (as returned by list_port_configs)
+            relay_mode (str, optional): Relay engine, one of RELAY_MODES
+            concurrency (int, optional): Tunnels requested at once.
+                Defaults to TUNNEL_STARTUP_CONCURRENCY from .env or DEFAULT_STARTUP_CONCURRENCY.
+            max_retries (int): Attempts per tunnel before giving up
+            max_connections (int, optional): Concurrent connections allowed per tunnel
+            backend (str, optional): Tunnel backend, one of SSH_BACKENDS
+
+        Returns:
+            list: One dict per config with name, local_port, bind_port, success,
+                attempts, ready_time (seconds since the call started) and error
+        """
+        settings = self._ssh_settings()
+        if settings is None:
+            print("Error: Missing required environment variables (SSH_HOST, SSH_USER, PRIVATE_KEY_PATH)")
+            return []
+
+        backend = self._resolve_backend(backend)
+        relay_mode = self._resolve_relay_mode(relay_mode)
+        if backend is None or relay_mode is None:
+            return []
+
+        if concurrency is None:
+            concurrency = int(os.getenv("TUNNEL_STARTUP_CONCURRENCY", DEFAULT_STARTUP_CONCURRENCY))
+        concurrency = max(1, min(concurrency, len(configs) or 1))
+        started = time.perf_counter()
+
+        def start_one(config):
+            result = {
+                'name': config.get('name'),
+                'local_port': config['local_port'],
+                'bind_port': config['server_bind_port'],
+                'success': False,
+                'attempts': 0,
+                'ready_time': None,
+                'error': None,
+            }
+            chunk_size = self._resolve_chunk_size(config.get('chunk_size'))
+            if chunk_size is None:
+                result['error'] = f"invalid chunk_size {config.get('chunk_size')}"
+                return result
+            compression = self._resolve_compression(config.get('compression'), backend)
+            if compression is None:
+                result['error'] = f"invalid compression {config.get('compression')}"
+                return result
+
+            for attempt in range(1, max_retries + 1):
+                result['attempts'] = attempt
+                try:
+                    if backend == 'openssh':
+                        # Forwards are added to one ControlMaster, started by whichever request comes first
+                        started_forward = self._start_openssh_forward(
+                            settings, 'R', result['bind_port'], settings['forward_host'], result['local_port'],
+                            self._compress_tunnel(result['bind_port'], compression)
+                        )
+                    else:
+                        # The first borrows perform the handshakes; later ones reuse the pooled transports
+                        transport = self._borrow_ssh_client(
+                            settings, shard_key=result['bind_port'],
+                            compress=self._compress_tunnel(result['bind_port'], compression)
+                        ).get_transport()
+                        started_forward = self._start_reverse_forward(
+                            transport, result['bind_port'], settings['forward_host'], result['local_port'],
+                            relay_mode, chunk_size, max_connections, compression
+                        )
+                    if started_forward:
+                        result['success'] = True
+                        result['error'] = None
+                        result['ready_time'] = time.perf_counter() - started
+                        return result
+                    result['error'] = f"server refused port {result['bind_port']}"
+                except Exception as e:
+                    result['error'] = str(e)
+
+                if attempt < max_retries:
+                    delay = min(STARTUP_BACKOFF_MAX, STARTUP_BACKOFF_BASE * 2 ** (attempt - 1))
+                    time.sleep(delay / 2 + random.uniform(0, delay / 2))
+            return result
+
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="haruka-startup") as pool:
+            futures = [pool.submit(start_one, config) for config in configs]
+            return [future.result() for future in futures]
+
+    def _start_reverse_forward(self, transport, bind_port, local_host, local_port, relay_mode='thread',
+                               chunk_size=DEFAULT_CHUNK_SIZE, max_connections=None, compression=DEFAULT_COMPRESSION):
         """
-        Worker function for reverse port forwarding.
-        Requests port forwarding from SSH server and handles incoming connections.
+        Register a reverse forward route and ask the SSH server to bind bind_port.
+        Incoming channels are delivered by _route_forwarded_channel, so any
+        number of bind ports can share one transport. An 'auto' compression
+        route that has not been decided yet samples its outbound traffic.
+
+        Returns:
+            bool: True if the server accepted the port forward request
         """
+        tunnel = f"reverse:{bind_port}"
+        self._get_connection_gate().set_tunnel_limit(tunnel, self._resolve_tunnel_limit(max_connections))
+
+        sampler = None
+        if compression == 'auto' and bind_port not in self._compression_decisions:
+            sampler = _CompressionSampler(
+                COMPRESSION_SAMPLE_BYTES,
+                lambda sample: threading.Thread(
+                    target=self._decide_compression, args=(bind_port, sample),
+                    name=f"haruka-compression-{bind_port}", daemon=True
+                ).start()
+            )
+
+        route = {
+            'tunnel': tunnel,
+            'bind_port': bind_port,
+            'local_host': local_host,
+            'local_port': local_port,
+            'relay_mode': relay_mode,
+            'chunk_size': chunk_size,
+            'max_connections': max_connections,
+            'compression': compression,
+            'sampler': sampler,
+        }
+        with self._ssh_pool_lock:
+            self._reverse_routes.setdefault(transport, {})[bind_port] = route
+            request_lock = self._global_request_locks.setdefault(transport, threading.Lock())
+
         try:
-            # Request the SSH server to bind to bind_port and forward to us
-            transport.request_port_forward("", bind_port)
-            transport.set_keepalive(600)
+            # Global requests are not safe to interleave on one transport
+            with request_lock:
+                transport.request_port_forward("", bind_port, handler=self._route_forwarded_channel)
+            self._invalidate_health(bind_port)
             print(f"Listening for connections on port {bind_port} (SSH server side)")
+            return True
+        except Exception as e:
+            with self._ssh_pool_lock:
+                self._reverse_routes.get(transport, {}).pop(bind_port, None)
+            print(f"✗ Server refused port forward for {bind_port}: {e}")
+            return False
 
-            while True:
-                # Accept connection from SSH server
-                chan = transport.accept(1000)
-                if chan is None:
-                    continue
+    def _route_forwarded_channel(self, chan, origin, server):
+        """
+        Port forward handler installed on every pooled transport.
+        Called from the transport thread; looks up the route for the server
+        port and hands the channel to the admission gate without blocking.
+        """
+        route = self._reverse_routes.get(chan.get_transport(), {}).get(server[1])
+        if route is None:
+            print(f"✗ Incoming connection for unregistered port {server[1]}, closing")
+            chan.close()
+            return
 
-                print(f"Incoming connection through SSH tunnel, forwarding to {local_host}:{local_port}")
+        local_host = route['local_host']
+        local_port = route['local_port']
+        print(f"Incoming connection through SSH tunnel, forwarding to {local_host}:{local_port}")
+        self._track_channel(chan)
 
-                # Start a thread to handle this connection
-                thread = threading.Thread(
-                    target=self._handle_reverse_connection,
-                    args=(chan, local_host, local_port),
-                    daemon=True
-                )
-                thread.start()
+        handlers = {
+            'thread': self._handle_reverse_connection,
+            'asyncio': self._async_reverse_connection,
+            'multiplex': self._mux_reverse_connection,
+        }
+        self._dispatch_connection(
+            route['tunnel'], route['relay_mode'], handlers[route['relay_mode']],
+            (chan, local_host, local_port, route['chunk_size'], route['sampler']), chan.close
+        )
+
+    def _decide_compression(self, bind_port, sample):
+        """
+        Decide whether an 'auto' compression tunnel is faster on a compressed transport.
+
+        The sample is compressed the way paramiko compresses packets (zlib,
+        flushed per packet) for the byte saving and compression speed. The
+        uplink is estimated by timing a keepalive sent behind
+        COMPRESSION_PROBE_BYTES of SSH_MSG_IGNORE against a bare one.
+        Compression wins when it saves at least COMPRESSION_MIN_SAVING and
+        sending the bytes it removes takes longer than compressing them;
+        the tunnel is then moved to the compressed transport pool.
+        """
+        import zlib
+
+        with self._ssh_pool_lock:
+            transport = next((t for t, routes in self._reverse_routes.items() if bind_port in routes), None)
+        if transport is None:
+            return
+
+        compressor = zlib.compressobj()
+        start = time.perf_counter()
+        compressed = 0
+        for offset in range(0, len(sample), 32768):
+            compressed += len(compressor.compress(sample[offset:offset + 32768]))
+            compressed += len(compressor.flush(zlib.Z_FULL_FLUSH))
+        compress_rate = len(sample) / max(time.perf_counter() - start, 1e-6)
+        saving = max(0.0, 1 - compressed / len(sample))
+
+        uplink = None
+        bare = self._sample_rtt(transport, timeout=10)
+        padded = self._sample_rtt(transport, timeout=30, padding=COMPRESSION_PROBE_BYTES)
+        if bare is not None and padded is not None and padded > bare:
+            uplink = COMPRESSION_PROBE_BYTES / (padded - bare)
+
+        # Per byte sent: compressing costs 1/compress_rate and saves saving/uplink of link time
+        compress = saving >= COMPRESSION_MIN_SAVING and uplink is not None and uplink < compress_rate * saving
+        self._compression_decisions[bind_port] = {
+            'compress': compress,
+            'saving': round(saving, 3),
+            'compress_mbps': round(compress_rate * 8 / 1e6, 1),
+            'uplink_mbps': round(uplink * 8 / 1e6, 1) if uplink is not None else None,
+            'decided_at': time.time(),
+        }
+        uplink_text = f"{uplink * 8 / 1e6:.1f} Mbit/s" if uplink is not None else "not measurable"
+        print(f"Compression for port {bind_port}: saves {saving:.0%}, uplink {uplink_text} "
+              f"-> {'on' if compress else 'off'}")
+        if compress:
+            self._move_reverse_route(bind_port, compress=True)
+
+    def _move_reverse_route(self, bind_port, compress):
+        """
+        Move a reverse forward to the compressed (or uncompressed) transport pool.
+
+        The port is released on the old transport and requested on the new
+        one, so it refuses connections for about one round trip; connections
+        already open finish on the old transport. If the new transport refuses
+        the port, it is requested on the old one again.
+
+        Returns:
+            bool: True if the route now runs on a transport with the requested compression
+        """
+        with self._ssh_pool_lock:
+            old = next((t for t, routes in self._reverse_routes.items() if bind_port in routes), None)
+            route = self._reverse_routes[old][bind_port] if old is not None else None
+        key = self._pool_key(old) if old is not None else None
+        if key is None:
+            return False
+        if key[3] == compress:
+            return True
+
+        try:
+            new = self._borrow_ssh_client(
+                self._ssh_pool_settings.get(key), shard_key=bind_port, compress=compress
+            ).get_transport()
+        except Exception as e:
+            print(f"✗ Could not open a {'compressed' if compress else 'plain'} SSH connection for port {bind_port}: {e}")
+            return False
+
+        with self._ssh_pool_lock:
+            request_lock = self._global_request_locks.setdefault(old, threading.Lock())
+        try:
+            # transport.cancel_port_forward() would also drop the handler every other route on it uses
+            with request_lock:
+                old.global_request("cancel-tcpip-forward", ("", bind_port), wait=True)
+        except Exception as e:
+            print(f"⚠ Could not release port {bind_port} on the old SSH connection: {e}")
+        with self._ssh_pool_lock:
+            self._reverse_routes.get(old, {}).pop(bind_port, None)
 
+        args = (bind_port, route['local_host'], route['local_port'], route['relay_mode'], route['chunk_size'],
+                route['max_connections'], route['compression'])
+        if self._start_reverse_forward(new, *args):
+            print(f"✓ Port {bind_port} moved to a {'compressed' if compress else 'plain'} SSH connection")
+            return True
+        self._start_reverse_forward(old, *args)
+        return False
+
+    def get_compression_stats(self):
+        """
+        Get the SSH compression state of every reverse tunnel on a pooled transport.
+
+        Returns:
+            list: One dict per tunnel with bind_port, mode (off/on/auto), compressed
+                (whether its transport is compressed) and, for decided 'auto' tunnels,
+                the decision's saving, compress_mbps, uplink_mbps and decided_at
+        """
+        with self._ssh_pool_lock:
+            routes = [(transport, route) for transport, by_port in self._reverse_routes.items()
+                      for route in by_port.values()]
+        stats = []
+        for transport, route in sorted(routes, key=lambda item: item[1]['bind_port']):
+            key = self._pool_key(transport)
+            entry = {
+                'bind_port': route['bind_port'],
+                'mode': route['compression'],
+                'compressed': bool(key and key[3]),
+            }
+            decision = self._compression_decisions.get(route['bind_port'])
+            if route['compression'] == 'auto' and decision:
+                entry.update({k: v for k, v in decision.items() if k != 'compress'})
+            stats.append(entry)
+        return stats
+
+    def _wait_for_transport(self, *transports):
+        """Block the calling thread while any of the transports stays up (foreground tunnels)."""
+        try:
+            while any(transport.is_active() for transport in transports):
+                time.sleep(1)
+            print("SSH transport closed, tunnel stopped")
         except KeyboardInterrupt:
             print("Reverse port forwarding stopped by user")
-        except Exception as e:
-            print(f"Error in reverse forwarding worker: {e}")
 
-    def _handle_reverse_connection(self, chan, local_host, local_port):
+    def _handle_reverse_connection(self, chan, local_host, local_port, chunk_size=DEFAULT_CHUNK_SIZE, sampler=None):
         """
         Handle a single reverse forwarded connection.
         """
@@ -315,30 +1963,16 @@ class Haruka:
             print(f"✓ Connected to local service {local_host}:{local_port}")
 
             # Forward data between SSH channel and local service
-            while True:
-                try:
-                    r, w, x = select.select([sock, chan], [], [], 1)
-
-                    if sock in r:
-                        data = sock.recv(4096)
-                        if len(data) == 0:
-                            print("Local service closed connection")
-                            break
-                        chan.send(data)
-
-                    if chan in r:
-                        data = chan.recv(4096)
-                        if len(data) == 0:
-                            print("Remote client closed connection")
-                            break
-                        sock.send(data)
-                        
-                except socket.error as e:
-                    print(f"Socket error during data transfer: {e}")
-                    break
-                except Exception as e:
-                    print(f"Error during data transfer: {e}")
-                    break
+            try:
+                pair = self._relay_blocking(chan, sock, chunk_size, sampler)
+                if pair.sock_eof:
+                    print("Local service closed connection")
+                elif pair.chan_eof:
+                    print("Remote client closed connection")
+            except socket.error as e:
+                print(f"Socket error during data transfer: {e}")
+            except Exception as e:
+                print(f"Error during data transfer: {e}")
 
         except socket.timeout:
             print(f"✗ Timeout connecting to local service {local_host}:{local_port}")
@@ -358,7 +1992,43 @@ class Haruka:
             except:
                 pass
 
-    def forward_local_port(self, local_port, remote_host, remote_port, background=False):
+    def _relay_blocking(self, chan, sock, chunk_size=DEFAULT_CHUNK_SIZE, sampler=None):
+        """
+        Relay a channel/socket pair in the calling thread until either side
+        closes and all buffered data has been delivered.
+
+        Waits with select() for exactly the events the pair can act on, so a
+        slow receiver stops reads from the fast side instead of piling up data.
+        A sampler, if given, is fed what is read from the socket.
+
+        Returns:
+            _RelayPair: Final relay state (which side reached EOF first)
+        """
+        pair = _RelayPair(chan, sock, chunk_size, sampler)
+        while not pair.finished():
+            readers = []
+            if pair.want_sock_read():
+                readers.append(sock)
+            if pair.want_chan_read():
+                readers.append(chan)
+            writers = [sock] if pair.want_sock_write() else []
+            # A channel has no writable event; poll while its send window is full
+            timeout = _RelayMultiplexer.BLOCKED_POLL_INTERVAL if pair.chan_blocked() else None
+
+            r, w, x = select.select(readers, writers, [], timeout)
+
+            if sock in w:
+                pair.flush_sock()
+            if sock in r:
+                pair.read_sock()
+            if chan in r:
+                pair.read_chan()
+            if pair.chan_blocked():
+                pair.flush_chan()
+        return pair
+
+    def forward_local_port(self, local_port, remote_host, remote_port, background=False, relay_mode=None,
+                           chunk_size=None, max_connections=None, backend=None):
         """
         Forward a local port to a remote host through SSH tunnel.
 
@@ -367,37 +2037,46 @@ class Haruka:
             remote_host (str): Remote host to forward to
             remote_port (int): Remote port to forward to
             background (bool): If True, run in background thread
+            relay_mode (str, optional): Relay engine, one of RELAY_MODES.
+                Defaults to RELAY_MODE from .env or 'thread'.
+            chunk_size (int, optional): Per-connection relay buffer size in bytes.
+                Defaults to RELAY_CHUNK_SIZE from .env or DEFAULT_CHUNK_SIZE.
+            max_connections (int, optional): Concurrent connections allowed on this tunnel.
+                Defaults to MAX_CONNECTIONS_PER_TUNNEL from .env; 0 means only the process-wide cap.
+            backend (str, optional): Tunnel backend, one of SSH_BACKENDS.
+                Defaults to SSH_BACKEND from .env or 'paramiko'. With 'openssh' the host's
+                ssh ControlMaster listens on the local port and relays the connections itself.
 
         Returns:
             bool: True if forwarding started successfully, False otherwise
+
+        The SSH connection is borrowed from the shared transport pool.
         """
-        ssh_host = os.getenv("SSH_HOST")
-        ssh_port = int(os.getenv("SSH_PORT", 22))
-        ssh_user = os.getenv("SSH_USER")
-        private_key_path = os.getenv("PRIVATE_KEY_PATH")
+        import paramiko
 
-        if not all([ssh_host, ssh_user, private_key_path]):
+        settings = self._ssh_settings()
+        if settings is None:
             print("Error: Missing required environment variables (SSH_HOST, SSH_USER, PRIVATE_KEY_PATH)")
             return False
 
+        backend = self._resolve_backend(backend)
+        relay_mode = self._resolve_relay_mode(relay_mode)
+        chunk_size = self._resolve_chunk_size(chunk_size)
+        if backend is None or relay_mode is None or chunk_size is None:
+            return False
+
         try:
-            # Create SSH client
-            client = paramiko.SSHClient()
-            client.load_system_host_keys()
-            client.set_missing_host_key_policy(paramiko.WarningPolicy())
+            if backend == 'openssh':
+                print(f"Setting up local port forwarding: localhost:{local_port} -> {remote_host}:{remote_port}")
+                if not self._start_openssh_forward(settings, 'L', local_port, remote_host, remote_port):
+                    return False
+                if background:
+                    print(f"Local port forwarding started in background (localhost:{local_port} -> {remote_host}:{remote_port})")
+                else:
+                    self._wait_for_openssh(settings)
+                return True
 
-            # Load private key
-            private_key = paramiko.RSAKey(filename=private_key_path)
-
-            # Connect to SSH server
-            print(f"Connecting to SSH server {ssh_user}@{ssh_host}:{ssh_port}...")
-            client.connect(
-                hostname=str(ssh_host),
-                port=ssh_port,
-                username=str(ssh_user),
-                pkey=private_key,
-                timeout=10
-            )
+            transport = self._borrow_ssh_client(settings).get_transport()
 
             print(f"Setting up local port forwarding: localhost:{local_port} -> {remote_host}:{remote_port}")
 
@@ -405,7 +2084,8 @@ class Haruka:
             if background:
                 thread = threading.Thread(
                     target=self._forward_worker,
-                    args=(client.get_transport(), local_port, remote_host, remote_port),
+                    args=(transport, local_port, remote_host, remote_port, relay_mode, chunk_size,
+                          max_connections),
                     daemon=True
                 )
                 thread.start()
@@ -413,279 +2093,1656 @@ class Haruka:
                 return True
             else:
                 # Run in foreground
-                self._forward_worker(client.get_transport(), local_port, remote_host, remote_port)
+                self._forward_worker(
+                    transport, local_port, remote_host, remote_port, relay_mode, chunk_size, max_connections
+                )
                 return True
 
-        except paramiko.AuthenticationException:
-            print("SSH authentication failed. Please check your private key and username.")
-            return False
-        except paramiko.SSHException as e:
-            print(f"SSH connection failed: {e}")
-            return False
+        except paramiko.AuthenticationException:
+            print("SSH authentication failed. Please check your private key and username.")
+            return False
+        except paramiko.SSHException as e:
+            print(f"SSH connection failed: {e}")
+            return False
+        except Exception as e:
+            print(f"Failed to setup local port forwarding: {e}")
+            return False
+
+    def _forward_worker(self, transport, local_port, remote_host, remote_port, relay_mode='thread',
+                        chunk_size=DEFAULT_CHUNK_SIZE, max_connections=None):
+        """
+        Worker function for local port forwarding.
+        """
+        tunnel = f"local:{local_port}"
+        handlers = {
+            'thread': self._handle_local_connection,
+            'asyncio': self._async_local_connection,
+            'multiplex': self._mux_local_connection,
+        }
+        self._get_connection_gate().set_tunnel_limit(tunnel, self._resolve_tunnel_limit(max_connections))
+
+        # Create a socket to listen on the local port
+        local_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        local_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+        try:
+            local_socket.bind(('localhost', local_port))
+            local_socket.listen(5)
+            print(f"Listening on localhost:{local_port}")
+
+            while True:
+                # Accept local connection
+                local_conn, addr = local_socket.accept()
+                print(f"Accepted connection from {addr}")
+
+                # Spread connections over the pooled transports; a dropped one is replaced
+                try:
+                    transport = self._borrow_ssh_client(shard_key=addr[1]).get_transport()
+                except Exception as e:
+                    print(f"✗ SSH connection unavailable, dropping connection: {e}")
+                    local_conn.close()
+                    continue
+
+                self._dispatch_connection(
+                    tunnel, relay_mode, handlers[relay_mode],
+                    (transport, local_conn, remote_host, remote_port, chunk_size), local_conn.close
+                )
+
+        except KeyboardInterrupt:
+            print("Local port forwarding stopped by user")
+        except Exception as e:
+            print(f"Error in local forwarding worker: {e}")
+        finally:
+            local_socket.close()
+
+    def _handle_local_connection(self, transport, local_conn, remote_host, remote_port,
+                                 chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Handle a single local connection by forwarding it through SSH.
+        """
+        try:
+            # Open a direct-tcpip channel to the remote host
+            remote_conn = transport.open_channel(
+                'direct-tcpip',
+                (remote_host, remote_port),
+                local_conn.getpeername()
+            )
+
+            if remote_conn is None:
+                print(f"Failed to open remote connection to {remote_host}:{remote_port}")
+                local_conn.close()
+                return
+
+            self._track_channel(remote_conn)
+            print(f"Tunnel established: {local_conn.getpeername()} -> {remote_host}:{remote_port}")
+
+            # Forward data between local and remote connections
+            self._relay_blocking(remote_conn, local_conn, chunk_size)
+
+        except Exception as e:
+            print(f"Error handling local connection: {e}")
+        finally:
+            local_conn.close()
+            if 'remote_conn' in locals():
+                remote_conn.close()
+
+    def _openssh_master_for(self, settings, compress=False):
+        """
+        Get the ControlMaster record for a host, creating it if needed (caller holds the OpenSSH lock).
+        Compressed forwards get their own master.
+        """
+        import tempfile
+
+        key = (settings['host'], settings['port'], settings['user'], compress)
+        master = self._openssh_masters.get(key)
+        if master is None:
+            if self._openssh_dir is None:
+                # Private, short directory: control socket paths are limited to ~100 bytes
+                self._openssh_dir = tempfile.mkdtemp(prefix="haruka-ssh-")
+                atexit.register(self._stop_openssh_masters)
+            index = len(self._openssh_masters)
+            master = {
+                'key': key,
+                'settings': settings,
+                'control_path': os.path.join(self._openssh_dir, f"{index}.sock"),
+                'log_path': os.path.join(self._openssh_dir, f"{index}.log"),
+                'process': None,
+                'forwards': {},
+                'lost': {},
+                'lost_at': None,
+                'retry_at': 0,
+                'delay': RECONNECT_BACKOFF_BASE,
+                'refused': {},
+            }
+            self._openssh_masters[key] = master
+        elif master['process'] is None:
+            # Not running: the next start picks up the current settings
+            master['settings'] = settings
+        return master
+
+    def _openssh_command(self, master, *args):
+        """Build an ssh command line for a master's host from the .env settings; all commands share its control socket."""
+        settings = master['settings']
+        command = [
+            os.getenv("SSH_BINARY", "ssh"),
+            '-p', str(settings['port']),
+            '-l', str(settings['user']),
+            '-o', f"ControlPath={master['control_path']}",
+            # Like the paramiko backend: known hosts are checked, new ones accepted
+            '-o', 'StrictHostKeyChecking=accept-new',
+            '-o', 'PreferredAuthentications=publickey',
+            '-o', 'ConnectTimeout=10',
+            '-o', 'LogLevel=ERROR',
+            # Nothing may prompt, except the key passphrase, which comes from the askpass helper
+            '-o', f"BatchMode={'no' if settings['key_passphrase'] else 'yes'}",
+        ]
+        if os.getenv("SSH_KNOWN_HOSTS"):
+            command += ['-o', f"UserKnownHostsFile={os.getenv('SSH_KNOWN_HOSTS')}"]
+        if settings['key_path']:
+            command += ['-i', settings['key_path']]
+            if not settings['use_agent']:
+                command += ['-o', 'IdentitiesOnly=yes']
+        # Same algorithm preferences as the paramiko connections, in OpenSSH's own option names
+        for option, names in (('Ciphers', settings['ciphers']), ('MACs', settings['macs']),
+                              ('KexAlgorithms', settings['kex'])):
+            if names:
+                command += ['-o', f"{option}={','.join(names)}"]
+        if master['key'][3]:
+            command += ['-o', 'Compression=yes']
+        if settings['keepalive_interval'] > 0:
+            command += [
+                '-o', f"ServerAliveInterval={max(1, round(settings['keepalive_interval']))}",
+                '-o', f"ServerAliveCountMax={settings['keepalive_max_missed']}",
+            ]
+        return command + list(args) + [str(settings['host'])]
+
+    def _openssh_control(self, master, *args):
+        """
+        Run one control command (check, forward, cancel) against a running master.
+
+        Returns:
+            tuple: (success, first line of ssh's error output)
+        """
+        import subprocess
+
+        try:
+            result = subprocess.run(
+                self._openssh_command(master, '-O', *args), stdin=subprocess.DEVNULL,
+                capture_output=True, text=True, timeout=OPENSSH_READY_TIMEOUT
+            )
+        except Exception as e:
+            return False, str(e)
+        lines = [line.strip() for line in result.stderr.splitlines() if line.strip()]
+        return result.returncode == 0, lines[0] if lines else f"ssh exited with code {result.returncode}"
+
+    def _openssh_askpass_env(self, passphrase):
+        """Environment that makes ssh read the key passphrase from a private helper script."""
+        helper = os.path.join(self._openssh_dir, "askpass.sh")
+        if not os.path.exists(helper):
+            with open(helper, 'w') as f:
+                f.write('#!/bin/sh\nprintf \'%s\\n\' "$HARUKA_KEY_PASSPHRASE"\n')
+            os.chmod(helper, 0o700)
+        return {'SSH_ASKPASS': helper, 'SSH_ASKPASS_REQUIRE': 'force', 'HARUKA_KEY_PASSPHRASE': passphrase}
+
+    def _start_openssh_master(self, master):
+        """
+        Start a host's ControlMaster process and wait until it has authenticated (caller holds the OpenSSH lock).
+
+        Raises:
+            RuntimeError if ssh exits or is not ready within OPENSSH_READY_TIMEOUT
+        """
+        import subprocess
+
+        settings = master['settings']
+        env = dict(os.environ)
+        if settings['key_passphrase']:
+            env.update(self._openssh_askpass_env(settings['key_passphrase']))
+
+        # A killed master leaves its socket behind, and ssh refuses to replace it
+        if os.path.exists(master['control_path']):
+            os.remove(master['control_path'])
+
+        print(f"Starting OpenSSH master for {settings['user']}@{settings['host']}:{settings['port']}"
+              f"{' (compressed)' if master['key'][3] else ''}...")
+        with open(master['log_path'], 'wb') as log:
+            process = subprocess.Popen(
+                self._openssh_command(master, '-M', '-N', '-o', 'ControlMaster=yes', '-o', 'ControlPersist=no'),
+                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=log, env=env
+            )
+
+        deadline = time.monotonic() + OPENSSH_READY_TIMEOUT
+        while process.poll() is None and time.monotonic() < deadline:
+            if self._openssh_control(master, 'check')[0]:
+                master['process'] = process
+                return
+            time.sleep(0.1)
+
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        with open(master['log_path'], errors='replace') as log:
+            lines = [line.strip() for line in log if line.strip()]
+        raise RuntimeError(lines[-1] if lines else f"ssh exited with code {process.returncode}")
+
+    def _start_openssh_forward(self, settings, kind, port, target_host, target_port, compress=False):
+        """
+        Add a forward to the host's OpenSSH ControlMaster, starting the master if needed.
+
+        Args:
+            settings (dict): Connection settings
+            kind (str): 'R' for a reverse forward (port bound on the SSH server) or 'L' for a local forward
+            port (int): Server bind port ('R') or local listen port ('L')
+            target_host (str): Host the forwarded connections are sent to
+            target_port (int): Port the forwarded connections are sent to
+            compress (bool): Use the host's compressed master (ssh -o Compression=yes)
+
+        Returns:
+            bool: True if the master accepted the forward
+        """
+        with self._openssh_lock:
+            master = self._openssh_master_for(settings, compress)
+            if master['process'] is not None and master['process'].poll() is not None:
+                self._mark_openssh_master_lost(master)
+            if master['process'] is None:
+                try:
+                    self._start_openssh_master(master)
+                except Exception as e:
+                    print(f"✗ OpenSSH connection to {settings['host']}:{settings['port']} failed: {e}")
+                    return False
+        return self._add_openssh_forward(master, kind, port, target_host, target_port)
+
+    def _add_openssh_forward(self, master, kind, port, target_host, target_port):
+        """Ask a running master for one forward and record it. Returns True if it was accepted."""
+        spec = f"{port}:{target_host}:{target_port}"
+        # Like the paramiko backend, reverse forwards ask for every server interface (subject to GatewayPorts)
+        ok, error = self._openssh_control(master, 'forward', f"-{kind}", f"*:{spec}" if kind == 'R' else spec)
+        if not ok:
+            side = "Server refused port forward for" if kind == 'R' else "Could not listen on local port"
+            print(f"✗ {side} {port}: {error}")
+            return False
+
+        with self._openssh_lock:
+            master['forwards'][(kind, port)] = (target_host, target_port)
+            master['lost'].pop((kind, port), None)
+        if kind == 'R':
+            self._invalidate_health(port)
+            print(f"Listening for connections on port {port} (SSH server side, OpenSSH)")
+        else:
+            print(f"Listening on localhost:{port} (OpenSSH)")
+        return True
+
+    def _mark_openssh_master_lost(self, master):
+        """Queue the forwards of an exited ControlMaster for the supervisor (caller holds the OpenSSH lock)."""
+        code = master['process'].returncode
+        master['process'] = None
+        forwards, master['forwards'] = master['forwards'], {}
+        if not forwards:
+            return
+
+        if master['lost_at'] is None:
+            now = time.monotonic()
+            master.update({'lost_at': now, 'retry_at': now, 'delay': RECONNECT_BACKOFF_BASE, 'refused': {}})
+        master['lost'].update(forwards)
+        self._invalidate_health(*(port for kind, port in forwards if kind == 'R'))
+        print(f"⚠ OpenSSH connection to {master['key'][0]}:{master['key'][1]} exited (code {code}), "
+              f"{len(forwards)} forward(s) waiting to be restored")
+
+    def _restore_openssh_forwards(self):
+        """Restart exited ControlMasters and re-add their forwards once the backoff has expired."""
+        now = time.monotonic()
+        kill_zombies = os.getenv("SUPERVISOR_KILL_ZOMBIES", "True").lower() in ('1', 'true', 'yes')
+        with self._openssh_lock:
+            for master in self._openssh_masters.values():
+                if master['process'] is not None and master['process'].poll() is not None:
+                    self._mark_openssh_master_lost(master)
+            due = [master for master in self._openssh_masters.values() if master['lost'] and master['retry_at'] <= now]
+
+        for master in due:
+            host, port = master['key'][:2]
+            with self._openssh_lock:
+                if master['process'] is None:
+                    try:
+                        self._start_openssh_master(master)
+                        self._supervisor_stats['reconnects'] += 1
+                    except Exception as e:
+                        self._schedule_restore(master, f"OpenSSH reconnect to {host}:{port} failed: {e}")
+                        continue
+
+            reap = []
+            for (kind, forward_port), (target_host, target_port) in list(master['lost'].items()):
+                if self._add_openssh_forward(master, kind, forward_port, target_host, target_port):
+                    with self._openssh_lock:
+                        self._supervisor_stats['restored_tunnels'] += 1
+                    continue
+                if kind == 'R':
+                    # The server usually still holds the port for the old session; clean it up once
+                    master['refused'][forward_port] = master['refused'].get(forward_port, 0) + 1
+                    if master['refused'][forward_port] == 2 and kill_zombies:
+                        reap.append(forward_port)
+            if reap:
+                self._supervisor_reap(reap)
+
+            with self._openssh_lock:
+                if master['lost']:
+                    self._schedule_restore(master, f"{len(master['lost'])} OpenSSH forward(s) still waiting")
+                    continue
+                elapsed = time.monotonic() - master['lost_at']
+                self._supervisor_stats['last_restore_seconds'] = elapsed
+                master.update({'lost_at': None, 'delay': RECONNECT_BACKOFF_BASE, 'refused': {}})
+            print(f"✓ OpenSSH forwards to {host}:{port} restored in {elapsed:.1f}s")
+
+    def _wait_for_openssh(self, settings, *compress):
+        """
+        Block the calling thread while any of the host's ControlMasters (plain by default,
+        or the given compress flags) keeps running (foreground OpenSSH tunnels).
+        """
+        masters = [self._openssh_masters.get((settings['host'], settings['port'], settings['user'], flag))
+                   for flag in compress or (False,)]
+        try:
+            while any(master is not None and master['process'] is not None and master['process'].poll() is None
+                      for master in masters):
+                time.sleep(1)
+            print("OpenSSH connection closed, tunnel stopped")
+        except KeyboardInterrupt:
+            print("Port forwarding stopped by user")
+
+    def _stop_openssh_masters(self):
+        """Stop every ControlMaster, and with it every OpenSSH forward, and remove the control directory."""
+        import shutil
+
+        with self._openssh_lock:
+            for master in self._openssh_masters.values():
+                process = master['process']
+                if process is not None and process.poll() is None:
+                    process.terminate()
+                    try:
+                        process.wait(timeout=5)
+                    except Exception:
+                        process.kill()
+                        process.wait()
+                self._invalidate_health(*(port for kind, port in master['forwards'] if kind == 'R'))
+            self._openssh_masters.clear()
+            if self._openssh_dir is not None:
+                shutil.rmtree(self._openssh_dir, ignore_errors=True)
+                self._openssh_dir = None
+                atexit.unregister(self._stop_openssh_masters)
+
+    def _resolve_relay_mode(self, relay_mode=None):
+        """
+        Resolve the relay engine to use for a tunnel.
+
+        Args:
+            relay_mode (str, optional): Requested mode; falls back to RELAY_MODE from .env
+
+        Returns:
+            str: Validated relay mode, or None if the mode is unknown
+        """
+        relay_mode = (relay_mode or os.getenv("RELAY_MODE", "thread")).strip().lower()
+        if relay_mode not in RELAY_MODES:
+            print(f"Error: Unknown relay mode '{relay_mode}' (expected one of: {', '.join(RELAY_MODES)})")
+            return None
+        return relay_mode
+
+    def _resolve_backend(self, backend=None):
+        """
+        Resolve the tunnel backend to use.
+
+        Args:
+            backend (str, optional): Requested backend; falls back to SSH_BACKEND from .env
+
+        Returns:
+            str: Validated backend, or None if the backend is unknown
+        """
+        backend = (backend or os.getenv("SSH_BACKEND", "paramiko")).strip().lower()
+        if backend not in SSH_BACKENDS:
+            print(f"Error: Unknown SSH backend '{backend}' (expected one of: {', '.join(SSH_BACKENDS)})")
+            return None
+        return backend
+
+    def _resolve_compression(self, compression=None, backend='paramiko'):
+        """
+        Resolve the SSH compression mode of a tunnel.
+
+        Args:
+            compression (str, optional): Requested mode; falls back to SSH_COMPRESSION from .env
+            backend (str): Tunnel backend; 'openssh' cannot sample traffic, so 'auto' becomes 'off'
+
+        Returns:
+            str: Validated mode, or None if the mode is unknown
+        """
+        compression = (compression or os.getenv("SSH_COMPRESSION", DEFAULT_COMPRESSION)).strip().lower()
+        if compression not in COMPRESSION_MODES:
+            print(f"Error: Unknown compression mode '{compression}' (expected one of: {', '.join(COMPRESSION_MODES)})")
+            return None
+        if compression == 'auto' and backend == 'openssh':
+            print("⚠ compression=auto is not supported by the openssh backend, using off")
+            return 'off'
+        return compression
+
+    def _compress_tunnel(self, bind_port, compression):
+        """Whether a tunnel starts on a compressed transport: 'on', or 'auto' already decided in favour."""
+        if compression == 'auto':
+            return self._compression_decisions.get(bind_port, {}).get('compress', False)
+        return compression == 'on'
+
+    def _resolve_chunk_size(self, chunk_size=None):
+        """
+        Resolve the per-connection relay buffer size.
+
+        Args:
+            chunk_size (int, optional): Requested size; falls back to RELAY_CHUNK_SIZE from .env
+
+        Returns:
+            int: Validated chunk size in bytes, or None if out of range
+        """
+        try:
+            chunk_size = int(chunk_size or os.getenv("RELAY_CHUNK_SIZE", DEFAULT_CHUNK_SIZE))
+        except ValueError:
+            print(f"Error: Invalid relay chunk size '{chunk_size or os.getenv('RELAY_CHUNK_SIZE')}'")
+            return None
+        if not MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE:
+            print(f"Error: Relay chunk size must be between {MIN_CHUNK_SIZE} and {MAX_CHUNK_SIZE} bytes")
+            return None
+        return chunk_size
+
+    def _resolve_tunnel_limit(self, max_connections=None):
+        """Per-tunnel connection cap: argument, then MAX_CONNECTIONS_PER_TUNNEL, then the default."""
+        if max_connections is None:
+            max_connections = os.getenv("MAX_CONNECTIONS_PER_TUNNEL", DEFAULT_MAX_CONNECTIONS_PER_TUNNEL)
+        return max(0, int(max_connections))
+
+    def _get_connection_gate(self):
+        """
+        Return the admission gate shared by every tunnel, creating it from .env on first use.
+        """
+        with self._relay_lock:
+            if self._connection_gate is None:
+                policy = os.getenv("CONNECTION_OVERFLOW_POLICY", "wait").strip().lower()
+                if policy not in OVERFLOW_POLICIES:
+                    print(f"⚠ Unknown CONNECTION_OVERFLOW_POLICY '{policy}', using 'wait'")
+                    policy = 'wait'
+                self._connection_gate = _ConnectionGate(
+                    max_active=int(os.getenv("MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)),
+                    max_queued=int(os.getenv("CONNECTION_QUEUE_DEPTH", DEFAULT_CONNECTION_QUEUE_DEPTH)),
+                    policy=policy,
+                    queue_timeout=float(os.getenv("CONNECTION_QUEUE_TIMEOUT", DEFAULT_CONNECTION_QUEUE_TIMEOUT))
+                )
+            return self._connection_gate
+
+    def _get_relay_executor(self):
+        """
+        Return the bounded executor that runs thread-mode relays and queued admissions.
+        Sized so every admitted or queued connection has a worker and nothing waits inside it.
+        """
+        gate = self._get_connection_gate()
+        with self._relay_lock:
+            if self._relay_executor is None:
+                self._relay_executor = ThreadPoolExecutor(
+                    max_workers=gate.max_active + gate.max_queued,
+                    thread_name_prefix="haruka-relay"
+                )
+            return self._relay_executor
+
+    def get_connection_stats(self):
+        """
+        Get admission counters for forwarded connections.
+
+        Returns:
+            dict: {
+                'active': int - connections currently relaying,
+                'queued': int - connections waiting for a free slot,
+                'rejected': int - connections refused since start (limit, full queue or timeout),
+                'max_active', 'max_queued', 'policy': current limits,
+                'tunnels': dict - the same counters per tunnel ('reverse:<bind_port>' / 'local:<port>')
+            }
+        """
+        return self._get_connection_gate().stats()
+
+    def _dispatch_connection(self, tunnel, relay_mode, handler, args, reject):
+        """
+        Admit an accepted connection through the gate and start its relay.
+
+        Args:
+            tunnel (str): Tunnel key the connection belongs to
+            relay_mode (str): Relay engine that runs the handler
+            handler: Mode-specific connection handler, called with args
+            args (tuple): Handler arguments
+            reject: Callable that closes the connection when it is not admitted
+        """
+        gate = self._get_connection_gate()
+        ticket = gate.reserve(tunnel)
+        if ticket is None:
+            print(f"✗ Connection limit reached on {tunnel}, rejecting connection")
+            reject()
+            return
+
+        if relay_mode == 'thread' or ticket == 'queued':
+            self._get_relay_executor().submit(self._run_admitted, tunnel, ticket, relay_mode, handler, args, reject)
+        else:
+            self._start_admitted(tunnel, relay_mode, handler, args)
+
+    def _run_admitted(self, tunnel, ticket, relay_mode, handler, args, reject):
+        """Executor task: wait out the queue if needed, then run or hand off the relay."""
+        gate = self._get_connection_gate()
+        if ticket == 'queued' and not gate.wait(tunnel):
+            print(f"✗ Timed out waiting for a free slot on {tunnel}, rejecting connection")
+            reject()
+            return
+
+        if relay_mode == 'thread':
+            try:
+                handler(*args)
+            finally:
+                gate.release(tunnel)
+        else:
+            self._start_admitted(tunnel, relay_mode, handler, args)
+
+    def _start_admitted(self, tunnel, relay_mode, handler, args):
+        """Hand an admitted connection to the asyncio or multiplex engine; the slot is released when it ends."""
+        gate = self._get_connection_gate()
+        release = lambda *_: gate.release(tunnel)
+        if relay_mode == 'asyncio':
+            self._submit_async_relay(handler(*args)).add_done_callback(release)
+        else:
+            handler(*args, on_close=release)
+
+    def _get_relay_loop(self):
+        """
+        Return the shared asyncio relay loop, starting it on first use.
+        All asyncio-mode connections of this Haruka instance run on this one loop.
+        """
+        import asyncio
+
+        with self._relay_lock:
+            if self._relay_loop is None or self._relay_loop.is_closed():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=self._run_relay_loop,
+                    args=(loop,),
+                    name="haruka-relay-loop",
+                    daemon=True
+                )
+                thread.start()
+                self._relay_loop = loop
+            return self._relay_loop
+
+    def _run_relay_loop(self, loop):
+        """Run the shared relay event loop until it is stopped."""
+        import asyncio
+
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def _submit_async_relay(self, coro):
+        """Schedule a relay coroutine on the shared event loop from any thread."""
+        import asyncio
+
+        return asyncio.run_coroutine_threadsafe(coro, self._get_relay_loop())
+
+    async def _async_chan_recv(self, chan, size):
+        """
+        Receive from a paramiko channel without blocking the event loop.
+        Waits on the channel's pipe fileno until data (or EOF) is available.
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                return chan.recv(size)
+            except socket.timeout:
+                pass
+
+            ready = loop.create_future()
+            fd = chan.fileno()
+            loop.add_reader(fd, lambda: ready.done() or ready.set_result(None))
+            try:
+                await ready
+            finally:
+                loop.remove_reader(fd)
+
+    async def _async_chan_send(self, chan, data):
+        """
+        Send all data to a paramiko channel without blocking the event loop.
+        Yields back to the loop while the channel's send window is full.
+
+        Returns:
+            bool: True if everything was sent, False if the channel closed
+        """
+        import asyncio
+
+        while data:
+            try:
+                sent = chan.send(data)
+            except socket.timeout:
+                await asyncio.sleep(0.005)
+                continue
+            if sent == 0:
+                return False
+            data = data[sent:]
+        return True
+
+    async def _async_relay(self, chan, sock, chunk_size=DEFAULT_CHUNK_SIZE, sampler=None):
+        """
+        Relay data between a paramiko channel and a non-blocking socket
+        until either side closes. A sampler, if given, is fed what is read from the socket.
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+
+        async def sock_to_chan():
+            sample = sampler
+            buffer = bytearray(chunk_size)
+            view = memoryview(buffer)
+            while True:
+                n = await loop.sock_recv_into(sock, buffer)
+                if n == 0:
+                    print("Local connection closed")
+                    return
+                if sample is not None and not sample.feed(view[:n]):
+                    sample = None
+                if not await self._async_chan_send(chan, view[:n]):
+                    return
+
+        async def chan_to_sock():
+            while True:
+                data = await self._async_chan_recv(chan, chunk_size)
+                if len(data) == 0:
+                    print("Remote channel closed")
+                    return
+                await loop.sock_sendall(sock, data)
+
+        tasks = [asyncio.ensure_future(sock_to_chan()), asyncio.ensure_future(chan_to_sock())]
+        try:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in pending:
+                task.cancel()
+            for task in done:
+                if task.exception() is not None:
+                    print(f"Error during data transfer: {task.exception()}")
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _async_reverse_connection(self, chan, local_host, local_port, chunk_size=DEFAULT_CHUNK_SIZE,
+                                        sampler=None):
+        """
+        Handle a single reverse forwarded connection on the shared event loop.
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        chan.settimeout(0.0)
+        try:
+            print(f"Attempting to connect to local service {local_host}:{local_port}...")
+            await asyncio.wait_for(loop.sock_connect(sock, (local_host, local_port)), 5)
+            print(f"✓ Connected to local service {local_host}:{local_port}")
+
+            await self._async_relay(chan, sock, chunk_size, sampler)
+
+        except asyncio.TimeoutError:
+            print(f"✗ Timeout connecting to local service {local_host}:{local_port}")
+            print(f"  → Is your service running on {local_host}:{local_port}?")
+        except ConnectionRefusedError:
+            print(f"✗ Connection refused to local service {local_host}:{local_port}")
+            print(f"  → Is your service running and accepting connections?")
+        except Exception as e:
+            print(f"✗ Error connecting to local service {local_host}:{local_port}: {e}")
+        finally:
+            try:
+                sock.close()
+            except:
+                pass
+            try:
+                chan.close()
+            except:
+                pass
+
+    async def _async_local_connection(self, transport, local_conn, remote_host, remote_port,
+                                      chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Handle a single local connection on the shared event loop.
+        The channel open is a blocking round trip, so it runs in the loop's executor.
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        remote_conn = None
+        try:
+            peer = local_conn.getpeername()
+            remote_conn = await loop.run_in_executor(
+                None, transport.open_channel, 'direct-tcpip', (remote_host, remote_port), peer
+            )
+
+            if remote_conn is None:
+                print(f"Failed to open remote connection to {remote_host}:{remote_port}")
+                return
+
+            self._track_channel(remote_conn)
+            print(f"Tunnel established: {peer} -> {remote_host}:{remote_port}")
+            local_conn.setblocking(False)
+            remote_conn.settimeout(0.0)
+            await self._async_relay(remote_conn, local_conn, chunk_size)
+
+        except Exception as e:
+            print(f"Error handling local connection: {e}")
+        finally:
+            local_conn.close()
+            if remote_conn is not None:
+                remote_conn.close()
+
+    def _get_multiplexer(self):
+        """
+        Return the shared relay multiplexer, starting it on first use.
+        All multiplex-mode connections of this Haruka instance are owned by it.
+        """
+        with self._relay_lock:
+            if self._relay_mux is None:
+                self._relay_mux = _RelayMultiplexer()
+            return self._relay_mux
+
+    def _mux_reverse_connection(self, chan, local_host, local_port, chunk_size=DEFAULT_CHUNK_SIZE, sampler=None,
+                                on_close=None):
+        """
+        Hand a reverse forwarded channel to the multiplexer.
+        The connect to the local service happens non-blocking inside the multiplexer.
+        on_close runs once the pair is finished (or could not be started).
+        """
+        try:
+            address = socket.getaddrinfo(local_host, local_port, socket.AF_INET, socket.SOCK_STREAM)[0][4]
+        except socket.gaierror as e:
+            print(f"✗ Error connecting to local service {local_host}:{local_port}: {e}")
+            chan.close()
+            if on_close is not None:
+                on_close()
+            return
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._get_multiplexer().add(
+            chan, sock, connect_to=address, label=f"{local_host}:{local_port}", chunk_size=chunk_size,
+            on_close=on_close, sampler=sampler
+        )
+
+    def _mux_local_connection(self, transport, local_conn, remote_host, remote_port, chunk_size=DEFAULT_CHUNK_SIZE,
+                              on_close=None):
+        """
+        Open the direct-tcpip channel for a local connection and hand the pair
+        to the multiplexer. on_close runs once the pair is finished (or could not be started).
+        """
+        try:
+            remote_conn = transport.open_channel(
+                'direct-tcpip',
+                (remote_host, remote_port),
+                local_conn.getpeername()
+            )
+        except Exception as e:
+            print(f"Error handling local connection: {e}")
+            remote_conn = None
+        else:
+            if remote_conn is None:
+                print(f"Failed to open remote connection to {remote_host}:{remote_port}")
+            else:
+                self._track_channel(remote_conn)
+
+        if remote_conn is None:
+            local_conn.close()
+            if on_close is not None:
+                on_close()
+            return
+
+        print(f"Tunnel established: {local_conn.getpeername()} -> {remote_host}:{remote_port}")
+        self._get_multiplexer().add(
+            remote_conn, local_conn, label=f"{remote_host}:{remote_port}", chunk_size=chunk_size, on_close=on_close
+        )
+
+    def init_port_forwarding_db(self):
+        """
+        Initialize DuckDB database for storing port forwarding configurations.
+        Creates the necessary tables if they don't exist.
+        """
+        try:
+            with self._db_cursor() as con:
+                con.execute(f"CREATE SEQUENCE IF NOT EXISTS {PORT_CONFIG_ID_SEQUENCE}")
+                con.execute("""
+                    CREATE TABLE IF NOT EXISTS port_configs (
+                        id BIGINT DEFAULT nextval('{PORT_CONFIG_ID_SEQUENCE}'),
+                        name VARCHAR NOT NULL UNIQUE,
+                        local_port INTEGER NOT NULL,
+                        remote_host VARCHAR NOT NULL,
+                        remote_port INTEGER NOT NULL,
+                        server_bind_port INTEGER,
+                        description VARCHAR,
+                        active BOOLEAN DEFAULT FALSE,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        chunk_size INTEGER DEFAULT {DEFAULT_CHUNK_SIZE},
+                        compression VARCHAR DEFAULT '{DEFAULT_COMPRESSION}'
+                    )
+                """.format(DEFAULT_CHUNK_SIZE=DEFAULT_CHUNK_SIZE, DEFAULT_COMPRESSION=DEFAULT_COMPRESSION,
+                           PORT_CONFIG_ID_SEQUENCE=PORT_CONFIG_ID_SEQUENCE))
+                if not self._schema_checked:
+                    self._migrate_port_configs(con)
+            self._invalidate_config_cache()
+            print("✓ Port forwarding database initialized")
+            return True
+        except Exception as e:
+            print(f"✗ Failed to initialize port forwarding database: {e}")
+            return False
+
+    @contextmanager
+    def _db_cursor(self):
+        """
+        Yield a cursor on the shared port forwarding database connection.
+
+        The connection is opened (and the schema upgraded) on first use and
+        closed again after DB_IDLE_TIMEOUT idle seconds, because DuckDB only
+        lets one process hold the file open for writing.
+        """
+        import duckdb
+
+        with self._db_lock:
+            if self._db is None:
+                self._db = duckdb.connect(PORT_CONFIG_DB)
+                if not self._schema_checked:
+                    # Migrate on a cursor that is closed straight away: an unread result
+                    # left on the shared connection keeps a transaction open, and while it
+                    # is open DuckDB keeps the unique index entries of deleted or updated
+                    # rows, so a freed bind port could not be claimed again
+                    migration = self._db.cursor()
+                    try:
+                        self._migrate_port_configs(migration)
+                    finally:
+                        migration.close()
+            self._db_users += 1
+            cursor = self._db.cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+            with self._db_lock:
+                self._db_users -= 1
+                self._db_last_used = time.monotonic()
+                if self._db_close_timer is None:
+                    self._schedule_db_close()
+
+    def _schedule_db_close(self):
+        """Arm the idle-close timer (caller holds the db lock)."""
+        idle = float(os.getenv("DB_IDLE_TIMEOUT", DEFAULT_DB_IDLE_TIMEOUT))
+        delay = max(0.0, self._db_last_used + idle - time.monotonic())
+        self._db_close_timer = threading.Timer(delay, self._close_idle_db)
+        self._db_close_timer.daemon = True
+        self._db_close_timer.start()
+
+    def _close_idle_db(self):
+        """Close the shared connection once it has been idle long enough."""
+        idle = float(os.getenv("DB_IDLE_TIMEOUT", DEFAULT_DB_IDLE_TIMEOUT))
+        with self._db_lock:
+            self._db_close_timer = None
+            if self._db is None:
+                return
+            if self._db_users or time.monotonic() - self._db_last_used < idle:
+                self._schedule_db_close()
+                return
+            self._db.close()
+            self._db = None
+
+    def close_db(self):
+        """
+        Close the shared database connection now (it reopens on next use).
+        """
+        with self._db_lock:
+            if self._db_close_timer is not None:
+                self._db_close_timer.cancel()
+                self._db_close_timer = None
+            if self._db is not None and not self._db_users:
+                self._db.close()
+                self._db = None
+
+    def _db_file_stamp(self):
+        """Size and mtime of the database and its WAL; changes whenever any process writes."""
+        stamp = []
+        for path in (PORT_CONFIG_DB, PORT_CONFIG_DB + '.wal'):
+            try:
+                info = os.stat(path)
+                stamp.append((info.st_mtime_ns, info.st_size))
+            except OSError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def _cached_configs(self):
+        """
+        Return the cached configuration list, reloading it if this or another process wrote to the database.
+        """
+        stamp = self._db_file_stamp()
+        if self._config_cache is not None and stamp == self._config_cache_stamp:
+            return self._config_cache
+
+        with self._db_cursor() as con:
+            rows = con.execute(f"""
+                SELECT {PORT_CONFIG_COLUMNS}
+                FROM port_configs
+                ORDER BY created_at DESC
+            """).fetchall()
+        self._config_cache = [self._row_to_config(row) for row in rows]
+        self._config_by_bind_port = {
+            config['server_bind_port']: config for config in self._config_cache if config['server_bind_port'] is not None
+        }
+        self._config_cache_stamp = stamp
+        return self._config_cache
+
+    def _invalidate_config_cache(self):
+        """Drop the cached configuration list after a write."""
+        self._config_cache = None
+        self._config_cache_stamp = None
+
+    def _migrate_port_configs(self, con):
+        """Apply PORT_CONFIG_MIGRATIONS to an existing port_configs table."""
+        exists = con.execute(
+            "SELECT COUNT(*) FROM information_schema.tables WHERE table_name = 'port_configs'"
+        ).fetchone()[0]
+        if exists:
+            conflicts = self._bind_port_conflicts(con)
+            for statement in PORT_CONFIG_MIGRATIONS:
+                if conflicts and PORT_CONFIG_BIND_INDEX in statement:
+                    continue
+                con.execute(statement)
+            self._schema_checked = True
+
+    def _bind_port_conflicts(self, con):
+        """
+        Report configurations sharing a server bind port before the unique index is created.
+
+        The data is left as it is: while conflicts remain the index is not
+        created, and it is added the next time the database is opened after
+        they have been resolved with update_port_config().
+
+        Returns:
+            dict: Bind port -> names of the configurations claiming it (empty if none or already indexed)
+        """
+        indexed = con.execute(
+            "SELECT COUNT(*) FROM duckdb_indexes() WHERE index_name = ?", [PORT_CONFIG_BIND_INDEX]
+        ).fetchone()[0]
+        if indexed:
+            return {}
+
+        conflicts = dict(con.execute("""
+            SELECT server_bind_port, list(name ORDER BY created_at, name)
+            FROM port_configs
+            WHERE server_bind_port IS NOT NULL
+            GROUP BY server_bind_port
+            HAVING COUNT(*) > 1
+            ORDER BY server_bind_port
+        """).fetchall())
+        if conflicts:
+            print(f"⚠ Unique bind port index not created: {len(conflicts)} bind port(s) are used by several configurations")
+            for bind_port, names in conflicts.items():
+                print(f"  Bind port {bind_port}: {', '.join(names)}")
+            print("  Give all but one a new port with update_port_config(name, server_bind_port=...)")
+        return conflicts
+
+    def _row_to_config(self, row):
+        """Build a port configuration dictionary from a row in PORT_CONFIG_FIELDS order."""
+        return dict(zip(PORT_CONFIG_FIELDS, row))
+
+    def check_port_health_ssh_server(self, bind_port, max_age=None):
+        """
+        Check if a port on the SSH server is open and accepting connections.
+        Tests both port binding AND tunnel functionality.
+
+        Args:
+            bind_port (int): Port on the SSH server to check
+            max_age (float, optional): Accept a cached result up to this many seconds old.
+                Defaults to HEALTH_CACHE_TTL from .env; 0 forces a fresh check.
+
+        Returns:
+            dict: {
+                'healthy': bool - True if port is responsive AND tunnel works,
+                'bound': bool - True if port is listening,
+                'tunnel_working': bool - True if tunnel actually forwards traffic,
+                'port': int - The port checked,
+                'status': str - 'healthy', 'foreign', 'service_down', 'zombie', 'in_use', 'unbound', or 'error'
+            }
+        """
+        return self.check_ports_health_ssh_server([bind_port], max_age=max_age)[bind_port]
+
+    def check_ports_health_ssh_server(self, ports, probe_mode=None, end_to_end=False, max_age=None):
+        """
+        Check many ports on the SSH server with a single remote command.
+
+        Listener and owner state for every port is collected in one exec on
+        the shared SSH connection and evaluated locally, so a full sweep
+        costs one round trip regardless of the number of ports.
+
+        Args:
+            ports (list): Ports on the SSH server to check
+            probe_mode (str, optional): One of HEALTH_PROBE_MODES.
+                Defaults to HEALTH_PROBE_MODE from .env or 'proc'.
+            end_to_end (bool): Also send a probe connection through every bound
+                port (see probe_tunnel()); 'tunnel_working' then reflects real
+                forwarding and the result carries the probe under 'probe'
+            max_age (float, optional): Accept cached results up to this many seconds old.
+                Defaults to HEALTH_CACHE_TTL from .env; 0 forces a fresh check.
+
+        Returns:
+            dict: Port -> result dict, same shape as check_port_health_ssh_server(),
+                plus 'pids' (server processes holding the port; proc mode only)
+                and 'checked_at' (time.time() of the underlying check).
+                Status 'in_use' means a non-SSH process owns the port; 'broken'
+                means a healthy-looking binding failed the end-to-end probe.
+                A port held by another SSH session (or, in netstat mode, one
+                without a matching sshd tunnel process) is always probed, and
+                only a response clears it: 'foreign' if data comes back through
+                it (e.g. the pytunnel daemon's tunnel), 'service_down' if it is
+                closed at once (that session's client is alive but its local
+                service refused), and 'zombie' if it stays silent or fails.
+        """
+        ports = [int(port) for port in ports]
+        if max_age is None:
+            max_age = float(os.getenv("HEALTH_CACHE_TTL", DEFAULT_HEALTH_CACHE_TTL))
+
+        def cached(port):
+            health = self._health_cache.get(port)
+            if health is None or time.time() - health['checked_at'] > max_age:
+                return None
+            if end_to_end and 'probe' not in health and health['bound']:
+                return None
+            return health
+
+        results = {port: cached(port) for port in ports}
+        stale = [port for port, health in results.items() if health is None]
+        if stale:
+            # One refresh at a time; a concurrent caller may already have fetched what we need.
+            # Results are taken as read here: _invalidate_health() may drop cache entries at any time.
+            with self._health_refresh_lock:
+                for port in stale:
+                    results[port] = cached(port)
+                stale = [port for port in stale if results[port] is None]
+                if stale:
+                    fresh = self._check_ports_uncached(stale, probe_mode, end_to_end)
+                    for port, health in fresh.items():
+                        if health['status'] != 'error':
+                            self._health_cache[port] = health
+                        results[port] = health
+        return {port: dict(health) for port, health in results.items()}
+
+    def _invalidate_health(self, *ports):
+        """Forget cached health for ports whose state just changed."""
+        for port in ports:
+            self._health_cache.pop(port, None)
+
+    def start_health_sweeper(self, ports=None, interval=None, end_to_end=False):
+        """
+        Keep the health cache warm from a background thread.
+
+        Every interval seconds all watched ports are re-checked in one batch,
+        so callers of check_port_health_ssh_server() get cached answers
+        instead of waiting on the SSH server.
+
+        Args:
+            ports (list, optional): Bind ports to watch. Defaults to every port
+                this instance tunnels plus every port already in the cache.
+            interval (float, optional): Seconds between sweeps.
+                Defaults to half of HEALTH_CACHE_TTL.
+            end_to_end (bool): Include an end-to-end probe for bound ports
+
+        Returns:
+            bool: True if the sweeper is running
+        """
+        ttl = float(os.getenv("HEALTH_CACHE_TTL", DEFAULT_HEALTH_CACHE_TTL))
+        if interval is None:
+            interval = max(1, ttl / 2)
+        watched = [int(port) for port in ports] if ports else None
+
+        def sweep():
+            while not self._health_sweeper_stop.wait(interval):
+                with self._ssh_pool_lock:
+                    targets = set(watched or ())
+                    if watched is None:
+                        targets.update(port for routes in self._reverse_routes.values() for port in routes)
+                        targets.update(self._health_cache)
+                if targets:
+                    try:
+                        self.check_ports_health_ssh_server(sorted(targets), end_to_end=end_to_end, max_age=0)
+                    except Exception as e:
+                        print(f"✗ Health sweep failed: {e}")
+
+        if self._health_sweeper is not None and self._health_sweeper.is_alive():
+            return True
+        self._health_sweeper_stop.clear()
+        self._health_sweeper = threading.Thread(target=sweep, name="haruka-health-sweeper", daemon=True)
+        self._health_sweeper.start()
+        return True
+
+    def stop_health_sweeper(self):
+        """
+        Stop the background health sweeper. Cached results expire normally.
+        """
+        self._health_sweeper_stop.set()
+        self._health_sweeper = None
+
+    def _check_ports_uncached(self, ports, probe_mode=None, end_to_end=False):
+        """Run the batched server-side check (and optional probes) for ports, bypassing the cache."""
+
+        def result(port, status, pids=()):
+            return {
+                'healthy': status == 'healthy',
+                'bound': status in ('healthy', 'bound_other', 'zombie', 'in_use'),
+                'tunnel_working': status == 'healthy',
+                'port': port,
+                'status': status,
+                'pids': list(pids),
+                'checked_at': time.time(),
+            }
+
+        settings = self._ssh_settings()
+        if settings is None:
+            print("Error: Missing required environment variables")
+            return {port: result(port, 'error') for port in ports}
+
+        probe_mode = (probe_mode or os.getenv("HEALTH_PROBE_MODE", "proc")).lower()
+        if probe_mode not in HEALTH_PROBE_MODES:
+            print(f"Error: Invalid probe mode '{probe_mode}'. Choose from: {', '.join(HEALTH_PROBE_MODES)}")
+            return {port: result(port, 'error') for port in ports}
+
+        try:
+            client = self._borrow_ssh_client(settings)
+            probed = None
+            if probe_mode == 'proc':
+                probed = self._probe_ports_proc(client, ports)
+            if probed is None:
+                probed = self._probe_ports_netstat(client, ports)
+            results = {port: result(port, *probed[port]) for port in ports}
+            if end_to_end:
+                self._apply_tunnel_probes(results)
+            else:
+                # Only a connection through a port held by another SSH session tells a live tunnel from a stale one
+                others = {
+                    port: health for port, health in results.items() if health['status'] in ('bound_other', 'zombie')
+                }
+                if others:
+                    self._apply_tunnel_probes(others)
+            return results
+
         except Exception as e:
-            print(f"Failed to setup local port forwarding: {e}")
-            return False
+            print(f"Error checking ports {ports}: {e}")
+            return {port: result(port, 'error') for port in ports}
 
-    def _forward_worker(self, transport, local_port, remote_host, remote_port):
+    def _apply_tunnel_probes(self, results):
         """
-        Worker function for local port forwarding.
+        Probe every bound port concurrently and fold the outcome into its health result.
+
+        A port held by this instance only needs the connection to reach the
+        service. A port held by another SSH session needs positive evidence
+        that its client is alive, because a frozen session still accepts the
+        connection and then says nothing: data back makes it foreign, an
+        immediate close makes it service_down, and silence leaves it a zombie.
         """
-        # Create a socket to listen on the local port
-        local_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        local_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        bound = [port for port, health in results.items() if health['bound']]
+        if not bound:
+            return
 
-        try:
-            local_socket.bind(('localhost', local_port))
-            local_socket.listen(5)
-            print(f"Listening on localhost:{local_port}")
+        def probe_port(port):
+            # Silence condemns another session's port, so its client gets the full
+            # timeout (not just DEFAULT_PROBE_FIRST_BYTE_TIMEOUT) to answer or refuse
+            if results[port]['status'] in ('bound_other', 'zombie'):
+                return self.probe_tunnel(port, first_byte_timeout=DEFAULT_PROBE_TIMEOUT)
+            return self.probe_tunnel(port)
 
-            while True:
-                # Accept local connection
-                local_conn, addr = local_socket.accept()
-                print(f"Accepted connection from {addr}")
+        with ThreadPoolExecutor(max_workers=min(len(bound), DEFAULT_STARTUP_CONCURRENCY)) as pool:
+            probes = dict(zip(bound, pool.map(probe_port, bound)))
+        for port, probe in probes.items():
+            health = results[port]
+            health['probe'] = probe
+            if health['status'] in ('bound_other', 'zombie'):
+                health['status'] = {'data': 'foreign', 'closed': 'service_down'}.get(probe['response'], 'zombie')
+                health['tunnel_working'] = health['status'] == 'foreign'
+            else:
+                health['tunnel_working'] = probe['ok']
+            health['healthy'] = health['status'] in ('healthy', 'foreign') and health['tunnel_working']
+            if health['status'] == 'healthy' and not probe['ok']:
+                health['status'] = 'broken'
 
-                # Start a thread to handle this connection
-                thread = threading.Thread(
-                    target=self._handle_local_connection,
-                    args=(transport, local_conn, remote_host, remote_port),
-                    daemon=True
-                )
-                thread.start()
+    def probe_tunnel(self, bind_port, timeout=DEFAULT_PROBE_TIMEOUT, send=None, first_byte_timeout=None):
+        """
+        Send a real connection through a reverse tunnel and time it.
 
-        except KeyboardInterrupt:
-            print("Local port forwarding stopped by user")
-        except Exception as e:
-            print(f"Error in local forwarding worker: {e}")
-        finally:
-            local_socket.close()
+        Opens a direct-tcpip channel to localhost:bind_port on the SSH server,
+        which the server hands back through the reverse tunnel to the local
+        service. The result is appended to the tunnel's latency history.
 
-    def _handle_local_connection(self, transport, local_conn, remote_host, remote_port):
-        """
-        Handle a single local connection by forwarding it through SSH.
+        Args:
+            bind_port (int): Tunnel bind port on the SSH server
+            timeout (float): Seconds to wait for the channel
+            send (bytes, optional): Request to send first, for services that wait
+                for the client to speak (e.g. b"HEAD / HTTP/1.0\\r\\n\\r\\n")
+            first_byte_timeout (float, optional): Seconds to wait for the first byte once
+                connected. Defaults to timeout when send is given, otherwise
+                DEFAULT_PROBE_FIRST_BYTE_TIMEOUT: a dead local service closes the channel
+                within that time, while a client-speaks-first service just stays silent.
+
+        Returns:
+            dict: {
+                'port': int,
+                'ok': bool - True if the connection was not refused (data or silence),
+                'response': str or None - 'data', 'silent' (nothing until first_byte_timeout)
+                    or 'closed' (closed before the first byte); None if the channel failed.
+                    Only 'data' and 'closed' prove that a client is relaying the tunnel:
+                    a stale session also accepts the channel and then stays silent,
+                'connect_ms': float - time to open the channel through the tunnel,
+                'first_byte_ms': float or None - time to the first response byte
+                    (None if the service stayed silent until first_byte_timeout),
+                'error': str or None,
+                'timestamp': float
+            }
         """
+        probe = {
+            'port': bind_port,
+            'ok': False,
+            'response': None,
+            'connect_ms': None,
+            'first_byte_ms': None,
+            'error': None,
+            'timestamp': time.time(),
+        }
+        chan = None
         try:
-            # Open a direct-tcpip channel to the remote host
-            remote_conn = transport.open_channel(
-                'direct-tcpip',
-                (remote_host, remote_port),
-                local_conn.getpeername()
+            transport = self._borrow_ssh_client().get_transport()
+            start = time.perf_counter()
+            chan = transport.open_channel(
+                "direct-tcpip", ("localhost", bind_port), ("127.0.0.1", 0), timeout=timeout
             )
+            connected = time.perf_counter()
+            probe['connect_ms'] = round((connected - start) * 1000, 2)
 
-            if remote_conn is None:
-                print(f"Failed to open remote connection to {remote_host}:{remote_port}")
-                local_conn.close()
-                return
+            if send:
+                chan.sendall(send)
+            if first_byte_timeout is None:
+                first_byte_timeout = timeout if send else DEFAULT_PROBE_FIRST_BYTE_TIMEOUT
+            chan.settimeout(first_byte_timeout)
+            try:
+                data = chan.recv(1)
+            except socket.timeout:
+                # Connected, but the service waits for the client to speak first (or nobody relays)
+                probe['ok'] = True
+                probe['response'] = 'silent'
+            else:
+                if data:
+                    probe['ok'] = True
+                    probe['response'] = 'data'
+                    probe['first_byte_ms'] = round((time.perf_counter() - connected) * 1000, 2)
+                else:
+                    probe['response'] = 'closed'
+                    probe['error'] = "closed before first byte (local service down?)"
+        except Exception as e:
+            probe['error'] = str(e) or e.__class__.__name__
+        finally:
+            if chan is not None:
+                chan.close()
 
-            print(f"Tunnel established: {local_conn.getpeername()} -> {remote_host}:{remote_port}")
+        with self._ssh_pool_lock:
+            self._probe_history.setdefault(bind_port, deque(maxlen=PROBE_HISTORY)).append(probe)
+        return probe
 
-            # Forward data between local and remote connections
-            while True:
-                r, w, x = select.select([local_conn, remote_conn], [], [], 1)
+    def get_tunnel_latency(self, bind_port=None):
+        """
+        Summarize the end-to-end probe history of one or all tunnels.
 
-                if local_conn in r:
-                    data = local_conn.recv(4096)
-                    if len(data) == 0:
-                        break
-                    remote_conn.send(data)
+        Args:
+            bind_port (int, optional): Tunnel bind port; all probed tunnels if omitted
 
-                if remote_conn in r:
-                    data = remote_conn.recv(4096)
-                    if len(data) == 0:
-                        break
-                    local_conn.send(data)
+        Returns:
+            dict: probes, failures, last_ok and p50/p95/max of connect_ms and
+                first_byte_ms over the kept history (or a port -> summary dict
+                when bind_port is omitted)
+        """
+        if bind_port is None:
+            return {port: self.get_tunnel_latency(port) for port in list(self._probe_history)}
 
-        except Exception as e:
-            print(f"Error handling local connection: {e}")
-        finally:
-            local_conn.close()
-            if 'remote_conn' in locals():
-                remote_conn.close()
+        with self._ssh_pool_lock:
+            history = list(self._probe_history.get(bind_port, ()))
 
-    def init_port_forwarding_db(self):
+        def percentiles(values):
+            if not values:
+                return {'p50': None, 'p95': None, 'max': None}
+            values = sorted(values)
+            return {
+                'p50': values[len(values) // 2],
+                'p95': values[min(len(values) - 1, int(len(values) * 0.95))],
+                'max': values[-1],
+            }
+
+        ok = [probe for probe in history if probe['ok']]
+        return {
+            'port': bind_port,
+            'probes': len(history),
+            'failures': len(history) - len(ok),
+            'last_ok': history[-1]['ok'] if history else None,
+            'connect_ms': percentiles([probe['connect_ms'] for probe in ok]),
+            'first_byte_ms': percentiles([probe['first_byte_ms'] for probe in ok if probe['first_byte_ms'] is not None]),
+        }
+
+    def _probe_ports_netstat(self, client, ports):
         """
-        Initialize DuckDB database for storing port forwarding configurations.
-        Creates the necessary tables if they don't exist.
+        Classify ports from netstat and ps output (one exec).
+
+        Returns:
+            dict: Port -> (status, pids); pids are not resolved in this mode
         """
-        try:
-            con = duckdb.connect('port_forwarding.db')
-            con.execute("""
-                CREATE TABLE IF NOT EXISTS port_configs (
-                    name VARCHAR NOT NULL UNIQUE,
-                    local_port INTEGER NOT NULL,
-                    remote_host VARCHAR NOT NULL,
-                    remote_port INTEGER NOT NULL,
-                    server_bind_port INTEGER,
-                    description VARCHAR,
-                    active BOOLEAN DEFAULT FALSE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            con.close()
-            print("✓ Port forwarding database initialized")
-            return True
-        except Exception as e:
-            print(f"✗ Failed to initialize port forwarding database: {e}")
-            return False
+        # Listening sockets, then sshd processes that look like reverse tunnels
+        stdin, stdout, stderr = client.exec_command(
+            "netstat -tuln 2>/dev/null | grep LISTEN; echo __HARUKA_PS__; "
+            "ps aux 2>/dev/null | grep -E 'sshd.*R' | grep -v grep"
+        )
+        output = stdout.read().decode(errors='replace')
+        listen_output, _, ps_output = output.partition("__HARUKA_PS__")
+
+        listening = set()
+        for line in listen_output.splitlines():
+            fields = line.split()
+            if len(fields) >= 4 and ':' in fields[3]:
+                port = fields[3].rsplit(':', 1)[1]
+                if port.isdigit():
+                    listening.add(int(port))
+        ssh_processes = ps_output.splitlines()
+
+        probed = {}
+        for port in ports:
+            if port not in listening:
+                probed[port] = ('unbound', ())
+                continue
+            # Bound with an active SSH reverse tunnel process is healthy, otherwise a zombie
+            pattern = re.compile(rf'sshd.*R.*{port}')
+            if any(pattern.search(line) for line in ssh_processes):
+                probed[port] = ('healthy', ())
+            else:
+                probed[port] = ('zombie', ())
+        return probed
 
-    def check_port_health_ssh_server(self, bind_port):
+    def _probe_ports_proc(self, client, ports):
         """
-        Check if a port on the SSH server is open and accepting connections.
-        Tests both port binding AND tunnel functionality.
+        Classify ports from /proc/net/tcp{,6} and socket inodes (one exec, no netstat/ps/lsof).
 
-        Args:
-            bind_port (int): Port on the SSH server to check
+        A port held by the SSH session serving this connection, or by an sshd
+        process while this instance has a live tunnel on it, is healthy; one
+        held by any other sshd process is bound_other (it may be a live tunnel
+        of another process, e.g. the pytunnel daemon or an OpenSSH master, so
+        the caller settles it with a probe); anything else is in_use.
 
         Returns:
-            dict: {
-                'healthy': bool - True if port is responsive AND tunnel works,
-                'bound': bool - True if port is listening,
-                'tunnel_working': bool - True if tunnel actually forwards traffic,
-                'port': int - The port checked,
-                'status': str - 'healthy', 'zombie', 'unbound', or 'error'
-            }
+            dict: Port -> (status, pids), or None if the server has no readable /proc
         """
-        ssh_host = os.getenv("SSH_HOST")
-        ssh_port = int(os.getenv("SSH_PORT", 22))
-        ssh_user = os.getenv("SSH_USER")
-        private_key_path = os.getenv("PRIVATE_KEY_PATH")
+        stdin, stdout, stderr = client.exec_command(PROC_PORT_PROBE % ",".join(str(port) for port in ports))
+        parsed = self._parse_proc_probe(stdout.read().decode(errors='replace'))
+        if parsed is None:
+            return None
+        session_pid, listening, owners, _, _ = parsed
 
-        if not all([ssh_host, ssh_user, private_key_path]):
-            print("Error: Missing required environment variables")
-            return {'healthy': False, 'bound': False, 'tunnel_working': False, 'port': bind_port, 'status': 'error'}
+        probed = {}
+        for port in ports:
+            port_owners = owners.get(port, {})
+            pids = sorted(int(pid) for pid in port_owners)
+            if port not in listening:
+                probed[port] = ('unbound', ())
+            elif session_pid in port_owners or (
+                any(comm.startswith('sshd') for comm in port_owners.values()) and self._has_live_route(port)
+            ):
+                probed[port] = ('healthy', pids)
+            elif any(comm.startswith('sshd') for comm in port_owners.values()):
+                probed[port] = ('bound_other', pids)
+            else:
+                probed[port] = ('in_use', pids)
+        return probed
 
-        try:
-            client = paramiko.SSHClient()
-            client.load_system_host_keys()
-            client.set_missing_host_key_policy(paramiko.WarningPolicy())
-            private_key = paramiko.RSAKey(filename=private_key_path)
+    def _parse_proc_probe(self, output):
+        """
+        Parse PROC_PORT_PROBE / PROC_PID_KILL output.
 
-            client.connect(
-                hostname=str(ssh_host),
-                port=ssh_port,
-                username=str(ssh_user),
-                pkey=private_key,
-                timeout=10
-            )
+        Returns:
+            tuple: (session_pid, listening ports, {port: {pid: comm}},
+                {pid: other listening ports}, killed pids), or None if the server reported no /proc
+        """
+        lines = output.splitlines()
+        if "NOPROC" in lines:
+            return None
 
-            # Check if port is listening on SSH server
-            stdin, stdout, stderr = client.exec_command(f"netstat -tuln | grep :{bind_port} | grep LISTEN")
-            output = stdout.read().decode().strip()
-            
-            if not output:
-                client.close()
-                return {'healthy': False, 'bound': False, 'tunnel_working': False, 'port': bind_port, 'status': 'unbound'}
-            
-            # Port is bound, now check if it's OUR tunnel process or a zombie
-            # Check if there's an active SSH reverse tunnel process for this port
-            print(f"🔍 Port {bind_port} is bound, checking if it's an active tunnel...")
-            
-            # Look for SSH process with reverse tunnel (-R) for this port
-            stdin, stdout, stderr = client.exec_command(
-                f"ps aux | grep -E 'sshd.*R.*{bind_port}' | grep -v grep | wc -l"
+        session_pid = None
+        listening = set()
+        owners = {}
+        sessions = {}
+        killed = set()
+        for line in lines:
+            fields = line.split(None, 3)
+            if fields[:1] == ['SELF'] and len(fields) > 1:
+                session_pid = fields[1]
+            elif fields[:1] == ['L'] and len(fields) >= 3:
+                listening.add(int(fields[1]))
+            elif fields[:1] == ['P'] and len(fields) >= 3:
+                owners.setdefault(int(fields[1]), {})[fields[2]] = fields[3] if len(fields) > 3 else '?'
+            elif fields[:1] == ['S'] and len(fields) >= 3:
+                sessions.setdefault(fields[1], set()).add(int(fields[2]))
+            elif fields[:1] == ['K'] and len(fields) >= 2:
+                killed.add(fields[1])
+        return session_pid, listening, owners, sessions, killed
+
+    def _has_live_route(self, bind_port):
+        """True if this instance has a reverse forward for bind_port on an active transport or OpenSSH master."""
+        with self._ssh_pool_lock:
+            if any(
+                bind_port in routes and transport.is_active()
+                for transport, routes in self._reverse_routes.items()
+            ):
+                return True
+        # An OpenSSH master's server session is another sshd process, so this is what keeps it off the reaper
+        with self._openssh_lock:
+            return any(
+                ('R', bind_port) in master['forwards'] and master['process'] is not None
+                and master['process'].poll() is None
+                for master in self._openssh_masters.values()
             )
-            ssh_process_count = stdout.read().decode().strip()
-            
-            client.close()
-            
-            # If there's an active SSH tunnel process, consider it healthy
-            # (We can't easily test if local service responds without complex setup)
-            if ssh_process_count and int(ssh_process_count) > 0:
-                return {'healthy': True, 'bound': True, 'tunnel_working': True, 'port': bind_port, 'status': 'healthy'}
-            else:
-                # Port is bound but no SSH tunnel process - it's a zombie
-                return {'healthy': False, 'bound': True, 'tunnel_working': False, 'port': bind_port, 'status': 'zombie'}
 
-        except Exception as e:
-            print(f"Error checking port {bind_port}: {e}")
-            return {'healthy': False, 'bound': False, 'tunnel_working': False, 'port': bind_port, 'status': 'error'}
+    def _supervisor_reap(self, ports):
+        """Reap bind ports the supervisor could not restore; shared sessions are reported and kept, never forced."""
+        for port, outcome in self.kill_zombie_ports_ssh_server(ports).items():
+            if outcome['status'] == 'shared_session':
+                print(f"⚠ Port {port} not reaped: {outcome['error']}")
+
+    def _choose_reap_pids(self, targets, session_pid, owners, sessions, force=False):
+        """
+        Pick the sshd processes to kill for the target ports.
+
+        One sshd session carries every forward of its connection, so a process
+        holding a stale port may also serve live ones. Its other listening
+        ports are live if this instance routes them (e.g. through an OpenSSH
+        master's session) or a probe through them gets a response; silence
+        does not count (see _apply_tunnel_probes()). Such a shared session is
+        left alone unless force is set.
 
-    def kill_zombie_port_ssh_server(self, bind_port):
+        Returns:
+            tuple: (pids to kill, {pid: live ports} of the shared sessions kept)
+        """
+        candidates = {
+            pid for port in targets for pid, comm in owners.get(port, {}).items()
+            if pid != session_pid and comm.startswith('sshd')
+        }
+        if force:
+            return candidates, {}
+
+        others = {pid: sessions.get(pid, set()) - set(targets) for pid in candidates}
+        ports = sorted(set().union(*others.values()))
+        live = {port for port in ports if self._has_live_route(port)}
+        unknown = [port for port in ports if port not in live]
+        if unknown:
+            # Silence gets the session killed, so give its client the full timeout to answer or refuse
+            def probe(port):
+                return self.probe_tunnel(port, first_byte_timeout=DEFAULT_PROBE_TIMEOUT)
+
+            with ThreadPoolExecutor(max_workers=min(len(unknown), DEFAULT_STARTUP_CONCURRENCY)) as pool:
+                for port, result in zip(unknown, pool.map(probe, unknown)):
+                    if result['response'] in ('data', 'closed'):
+                        live.add(port)
+
+        shared = {pid: sorted(held & live) for pid, held in others.items() if held & live}
+        return candidates - set(shared), shared
+
+    def kill_zombie_port_ssh_server(self, bind_port, force=False):
         """
         Kill/unbind a zombie port binding on the SSH server.
         Finds and terminates the process holding the port.
 
         Args:
             bind_port (int): Port on the SSH server to kill
+            force (bool): Also kill an SSH session that still serves other live ports
 
         Returns:
             bool: True if port was killed successfully, False otherwise
         """
-        ssh_host = os.getenv("SSH_HOST")
-        ssh_port = int(os.getenv("SSH_PORT", 22))
-        ssh_user = os.getenv("SSH_USER")
-        private_key_path = os.getenv("PRIVATE_KEY_PATH")
+        outcome = self.kill_zombie_ports_ssh_server([bind_port], force=force)[bind_port]
+        if outcome['status'] == 'freed':
+            print(f"✓ Port {bind_port} is now free")
+            return True
+        if outcome['status'] == 'not_bound':
+            print(f"✗ No process found using port {bind_port}")
+        elif outcome['status'] in ('skipped', 'shared_session'):
+            print(f"✗ Port {bind_port} not killed: {outcome['error']}")
+        elif outcome['status'] == 'still_bound':
+            print(f"✗ Port {bind_port} still bound after kill attempt")
+        else:
+            print(f"✗ Error killing zombie port: {outcome['error']}")
+        return False
 
-        if not all([ssh_host, ssh_user, private_key_path]):
-            print("Error: Missing required environment variables")
-            return False
+    def kill_zombie_ports_ssh_server(self, ports, timeout=DEFAULT_REAP_TIMEOUT, on_result=None, force=False):
+        """
+        Kill the stale server processes holding many bind ports at once.
 
-        try:
-            client = paramiko.SSHClient()
-            client.load_system_host_keys()
-            client.set_missing_host_key_policy(paramiko.WarningPolicy())
-            private_key = paramiko.RSAKey(filename=private_key_path)
+        Owners of every port, and the other ports they listen on, are resolved
+        with one remote command and the chosen ones killed with a second. Only
+        sshd processes other than the session serving this connection are
+        killed; ports with a live tunnel in this instance are left alone, and
+        so is an sshd session that also serves other live ports (see
+        _choose_reap_pids()) unless force is set. The ports are then polled
+        with a short backoff and each one is reported as soon as it is released.
 
-            print(f"Connecting to {ssh_host} to kill port {bind_port}...")
-            client.connect(
-                hostname=str(ssh_host),
-                port=ssh_port,
-                username=str(ssh_user),
-                pkey=private_key,
-                timeout=10
-            )
+        Args:
+            ports (list): Bind ports on the SSH server
+            timeout (float): Seconds to wait for the ports to be released
+            on_result (callable, optional): Called with (port, outcome) as soon
+                as each port's outcome is known
+            force (bool): Also kill shared sessions that still serve live ports
 
-            # Find PID using the port
-            print(f"Finding process using port {bind_port}...")
-            stdin, stdout, stderr = client.exec_command(
-                f"lsof -ti :{bind_port} 2>/dev/null || netstat -tulnp 2>/dev/null | grep :{bind_port} | awk '{{print $7}}' | cut -d'/' -f1"
-            )
-            pid_output = stdout.read().decode().strip()
+        Returns:
+            dict: Port -> {
+                'port': int,
+                'status': str - 'freed', 'not_bound', 'skipped', 'shared_session', 'still_bound' or 'error',
+                'pids': list - server processes that held the port,
+                'seconds': float - time until the outcome was known,
+                'error': str or None
+            }
+        """
+        ports = [int(port) for port in ports]
+        started = time.perf_counter()
+        outcomes = {}
 
-            if not pid_output:
-                print(f"✗ No process found using port {bind_port}")
-                client.close()
-                return False
+        def finish(port, status, pids=(), error=None):
+            outcomes[port] = {
+                'port': port,
+                'status': status,
+                'pids': list(pids),
+                'seconds': round(time.perf_counter() - started, 3),
+                'error': error,
+            }
+            self._invalidate_health(port)
+            if on_result is not None:
+                on_result(port, outcomes[port])
 
-            # Extract PID (might have multiple)
-            pids = [p for p in pid_output.split('\n') if p]
-            
-            if not pids:
-                print(f"✗ Could not determine PID for port {bind_port}")
-                client.close()
-                return False
+        settings = self._ssh_settings()
+        if settings is None:
+            print("Error: Missing required environment variables")
+            for port in ports:
+                finish(port, 'error', error="missing SSH settings")
+            return outcomes
 
-            # Kill the process(es)
-            for pid in pids:
-                pid = pid.strip()
-                if pid and pid.isdigit():
-                    print(f"Killing process PID {pid}...")
-                    stdin, stdout, stderr = client.exec_command(f"kill -9 {pid}")
-                    error = stderr.read().decode().strip()
-                    
-                    if error:
-                        print(f"⚠ Warning killing PID {pid}: {error}")
-                    else:
-                        print(f"✓ Successfully killed PID {pid}")
+        targets = []
+        for port in ports:
+            if self._has_live_route(port):
+                finish(port, 'skipped', error="port carries a live tunnel of this instance")
+            else:
+                targets.append(port)
+        if not targets:
+            return outcomes
 
-            # Verify port is now free
-            time.sleep(1)
-            stdin, stdout, stderr = client.exec_command(f"netstat -tuln | grep :{bind_port} | grep LISTEN")
-            verify_output = stdout.read().decode().strip()
-            client.close()
+        try:
+            client = self._borrow_ssh_client(settings)
+            print(f"Killing stale owners of {len(targets)} port(s) on {settings['host']}...")
+            port_list = ",".join(str(port) for port in targets)
+            stdin, stdout, stderr = client.exec_command(PROC_PORT_PROBE % port_list)
+            parsed = self._parse_proc_probe(stdout.read().decode(errors='replace'))
 
-            if verify_output:
-                print(f"✗ Port {bind_port} still bound after kill attempt")
-                return False
+            waiting = {}
+            if parsed is not None:
+                session_pid, listening, owners, sessions, _ = parsed
+                kill, shared = self._choose_reap_pids(targets, session_pid, owners, sessions, force)
+                killed = set()
+                if kill:
+                    stdin, stdout, stderr = client.exec_command(PROC_PID_KILL % " ".join(sorted(kill, key=int)))
+                    killed = self._parse_proc_probe(stdout.read().decode(errors='replace'))[4]
+                for port in targets:
+                    port_owners = owners.get(port, {})
+                    pids = sorted(int(pid) for pid in port_owners)
+                    live = sorted({live_port for pid in port_owners for live_port in shared.get(pid, ())})
+                    if port not in listening:
+                        finish(port, 'not_bound')
+                    elif live:
+                        finish(port, 'shared_session', pids,
+                               f"port is held by an SSH session that also serves live port(s) "
+                               f"{', '.join(str(live_port) for live_port in live)}; use force=True to kill it anyway")
+                    elif any(pid in killed for pid in port_owners):
+                        waiting[port] = pids
+                    elif session_pid in port_owners:
+                        finish(port, 'skipped', pids, "port is held by this SSH session")
+                    else:
+                        finish(port, 'skipped', pids, "port is held by a non-SSH process")
             else:
-                print(f"✓ Port {bind_port} is now free")
-                return True
+                # No /proc on the server: resolve with lsof/netstat and kill whatever holds the port
+                stdin, stdout, stderr = client.exec_command(NETSTAT_PORT_REAP % port_list.replace(",", " "))
+                killed = {}
+                for line in stdout.read().decode(errors='replace').splitlines():
+                    fields = line.split()
+                    if len(fields) == 3 and fields[0] == 'K':
+                        killed.setdefault(int(fields[2]), []).append(int(fields[1]))
+                for port in targets:
+                    if port in killed:
+                        waiting[port] = killed[port]
+                    else:
+                        finish(port, 'not_bound')
+
+            # Poll for release instead of sleeping a fixed time
+            delay = REAP_POLL_INITIAL
+            deadline = time.monotonic() + timeout
+            while waiting and time.monotonic() < deadline:
+                time.sleep(delay)
+                delay = min(REAP_POLL_MAX, delay * 2)
+                health = self._check_ports_uncached(list(waiting))
+                for port in list(waiting):
+                    if health[port]['status'] == 'unbound':
+                        finish(port, 'freed', waiting.pop(port))
+            for port, pids in waiting.items():
+                finish(port, 'still_bound', pids)
 
         except Exception as e:
-            print(f"✗ Error killing zombie port: {e}")
-            return False
+            print(f"✗ Error killing zombie ports: {e}")
+            for port in targets:
+                if port not in outcomes:
+                    finish(port, 'error', error=str(e))
+
+        return outcomes
 
-    def add_port_config(self, name, local_port, remote_host, remote_port, server_bind_port=None, description=""):
+    def add_port_config(self, name, local_port, remote_host, remote_port, server_bind_port=None, description="",
+                        chunk_size=None, compression=None):
         """
         Add a new port forwarding configuration to the database.
 
@@ -696,28 +3753,46 @@ class Haruka:
             remote_port (int): Remote port to forward to
             server_bind_port (int, optional): Port to bind on the server (for reverse forwarding)
             description (str): Optional description
+            chunk_size (int, optional): Relay buffer size in bytes (default DEFAULT_CHUNK_SIZE)
+            compression (str, optional): SSH compression, one of COMPRESSION_MODES (default DEFAULT_COMPRESSION)
 
         Returns:
             bool: True if added successfully, False otherwise
         """
+        chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+        if not MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE:
+            print(f"✗ Chunk size must be between {MIN_CHUNK_SIZE} and {MAX_CHUNK_SIZE} bytes")
+            return False
+        compression = (compression or DEFAULT_COMPRESSION).strip().lower()
+        if compression not in COMPRESSION_MODES:
+            print(f"✗ Compression must be one of: {', '.join(COMPRESSION_MODES)}")
+            return False
+
         try:
-            con = duckdb.connect('port_forwarding.db')
+            with self._db_cursor() as con:
+                # Check if name already exists
+                existing = con.execute("SELECT id FROM port_configs WHERE name = ?", [name]).fetchone()
+                if existing:
+                    print(f"✗ Port configuration '{name}' already exists")
+                    return False
 
-            # Check if name already exists
-            existing = con.execute("SELECT rowid FROM port_configs WHERE name = ?", [name]).fetchone()
-            if existing:
-                print(f"✗ Port configuration '{name}' already exists")
-                con.close()
-                return False
+                if server_bind_port is not None:
+                    owner = con.execute(
+                        "SELECT name FROM port_configs WHERE server_bind_port = ?", [server_bind_port]
+                    ).fetchone()
+                    if owner:
+                        print(f"✗ Bind port {server_bind_port} is already used by '{owner[0]}'")
+                        return False
 
-            # Insert new configuration
-            con.execute("""
-                INSERT INTO port_configs (name, local_port, remote_host, remote_port, server_bind_port, description)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, [name, local_port, remote_host, remote_port, server_bind_port, description])
+                # Insert new configuration
+                con.execute("""
+                    INSERT INTO port_configs (name, local_port, remote_host, remote_port, server_bind_port, description,
+                                              chunk_size, compression)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, [name, local_port, remote_host, remote_port, server_bind_port, description, chunk_size,
+                      compression])
 
-            con.commit()
-            con.close()
+            self._invalidate_config_cache()
             print(f"✓ Added port configuration '{name}': localhost:{local_port} -> {remote_host}:{remote_port}")
             return True
 
@@ -728,36 +3803,13 @@ class Haruka:
     def list_port_configs(self):
         """
         List all port forwarding configurations from the database.
+        Served from memory until the database changes.
 
         Returns:
             list: List of port configuration dictionaries
         """
         try:
-            con = duckdb.connect('port_forwarding.db')
-            result = con.execute("""
-                SELECT rowid, name, local_port, remote_host, remote_port, server_bind_port,
-                       description, active, created_at
-                FROM port_configs
-                ORDER BY created_at DESC
-            """).fetchall()
-
-            configs = []
-            for row in result:
-                config = {
-                    'id': row[0],
-                    'name': row[1],
-                    'local_port': row[2],
-                    'remote_host': row[3],
-                    'remote_port': row[4],
-                    'server_bind_port': row[5],
-                    'description': row[6],
-                    'active': row[7],
-                    'created_at': row[8]
-                }
-                configs.append(config)
-
-            con.close()
-            return configs
+            return [dict(config) for config in self._cached_configs()]
 
         except Exception as e:
             print(f"✗ Failed to list port configurations: {e}")
@@ -774,47 +3826,115 @@ class Haruka:
             dict: Port configuration dictionary or None if not found
         """
         try:
-            con = duckdb.connect('port_forwarding.db')
+            # Names are strings, IDs are integers
+            key = 'name' if isinstance(name_or_id, str) else 'id'
+            for config in self._cached_configs():
+                if config[key] == name_or_id:
+                    return dict(config)
+            return None
 
-            # Try to get by name first
-            if isinstance(name_or_id, str):
-                result = con.execute("""
-                    SELECT rowid, name, local_port, remote_host, remote_port, server_bind_port,
-                           description, active, created_at
-                    FROM port_configs
-                    WHERE name = ?
-                """, [name_or_id]).fetchone()
-            else:
-                # Get by rowid
-                result = con.execute("""
-                    SELECT rowid, name, local_port, remote_host, remote_port, server_bind_port,
-                           description, active, created_at
-                    FROM port_configs
-                    WHERE rowid = ?
-                """, [name_or_id]).fetchone()
+        except Exception as e:
+            print(f"✗ Failed to get port configuration: {e}")
+            return None
 
-            con.close()
+    def get_port_config_by_bind_port(self, bind_port):
+        """
+        Get the port configuration that owns a server bind port.
 
-            if result:
-                config = {
-                    'id': result[0],
-                    'name': result[1],
-                    'local_port': result[2],
-                    'remote_host': result[3],
-                    'remote_port': result[4],
-                    'server_bind_port': result[5],
-                    'description': result[6],
-                    'active': result[7],
-                    'created_at': result[8]
-                }
-                return config
-            else:
-                return None
+        Args:
+            bind_port (int): Port bound on the SSH server
+
+        Returns:
+            dict: Port configuration dictionary or None if no configuration uses the port
+        """
+        try:
+            self._cached_configs()
+            config = self._config_by_bind_port.get(bind_port)
+            return dict(config) if config else None
 
         except Exception as e:
             print(f"✗ Failed to get port configuration: {e}")
             return None
 
+    def update_port_config(self, name_or_id, **fields):
+        """
+        Update a port forwarding configuration in place.
+
+        Only columns whose value actually changes are written, in a single
+        UPDATE that also sets updated_at, so created_at and the active flag are
+        kept. The configuration keeps its ID, even when name or
+        server_bind_port changes.
+
+        Args:
+            name_or_id: Configuration name (str) or ID (int)
+            **fields: New values for any of PORT_CONFIG_UPDATABLE
+
+        Returns:
+            bool: True if the configuration was updated (or already matched), False otherwise
+        """
+        unknown = set(fields) - set(PORT_CONFIG_UPDATABLE)
+        if unknown:
+            print(f"✗ Cannot update field(s): {', '.join(sorted(unknown))}")
+            return False
+        if 'chunk_size' in fields:
+            fields['chunk_size'] = fields['chunk_size'] or DEFAULT_CHUNK_SIZE
+            if not MIN_CHUNK_SIZE <= fields['chunk_size'] <= MAX_CHUNK_SIZE:
+                print(f"✗ Chunk size must be between {MIN_CHUNK_SIZE} and {MAX_CHUNK_SIZE} bytes")
+                return False
+        if 'compression' in fields:
+            fields['compression'] = (fields['compression'] or DEFAULT_COMPRESSION).strip().lower()
+            if fields['compression'] not in COMPRESSION_MODES:
+                print(f"✗ Compression must be one of: {', '.join(COMPRESSION_MODES)}")
+                return False
+
+        try:
+            with self._db_cursor() as con:
+                column = 'name' if isinstance(name_or_id, str) else 'id'
+                con.execute("BEGIN TRANSACTION")
+                try:
+                    row = con.execute(
+                        f"SELECT {PORT_CONFIG_COLUMNS} FROM port_configs WHERE {column} = ?", [name_or_id]
+                    ).fetchone()
+                    if row is None:
+                        con.execute("ROLLBACK")
+                        print(f"✗ Port configuration '{name_or_id}' not found")
+                        return False
+
+                    current = self._row_to_config(row)
+                    changed = {key: value for key, value in fields.items() if current[key] != value}
+                    if not changed:
+                        con.execute("ROLLBACK")
+                        print(f"✓ Port configuration '{current['name']}' already up to date")
+                        return True
+
+                    if changed.get('server_bind_port') is not None:
+                        owner = con.execute(
+                            "SELECT name FROM port_configs WHERE server_bind_port = ? AND id <> ?",
+                            [changed['server_bind_port'], current['id']]
+                        ).fetchone()
+                        if owner:
+                            con.execute("ROLLBACK")
+                            print(f"✗ Bind port {changed['server_bind_port']} is already used by '{owner[0]}'")
+                            return False
+
+                    assignments = ", ".join(f"{key} = ?" for key in changed)
+                    con.execute(
+                        f"UPDATE port_configs SET {assignments}, updated_at = now() WHERE id = ?",
+                        list(changed.values()) + [current['id']]
+                    )
+                    con.execute("COMMIT")
+                except Exception:
+                    con.execute("ROLLBACK")
+                    raise
+
+            self._invalidate_config_cache()
+            print(f"✓ Updated port configuration '{current['name']}': {', '.join(changed)}")
+            return True
+
+        except Exception as e:
+            print(f"✗ Failed to update port configuration: {e}")
+            return False
+
     def delete_port_config(self, name_or_id):
         """
         Delete a port forwarding configuration from the database.
@@ -826,21 +3946,228 @@ class Haruka:
             bool: True if deleted successfully, False otherwise
         """
         try:
-            con = duckdb.connect('port_forwarding.db')
-
-            # Try to delete by name first
-            if isinstance(name_or_id, str):
-                result = con.execute("DELETE FROM port_configs WHERE name = ?", [name_or_id])
-            else:
-                # Delete by rowid
-                result = con.execute("DELETE FROM port_configs WHERE rowid = ?", [name_or_id])
-
-            con.commit()
-            con.close()
+            with self._db_cursor() as con:
+                # Try to delete by name first
+                if isinstance(name_or_id, str):
+                    con.execute("DELETE FROM port_configs WHERE name = ?", [name_or_id])
+                else:
+                    # Delete by ID
+                    con.execute("DELETE FROM port_configs WHERE id = ?", [name_or_id])
 
+            self._invalidate_config_cache()
             print(f"✓ Deleted port configuration '{name_or_id}'")
             return True
 
         except Exception as e:
             print(f"✗ Failed to delete port configuration: {e}")
             return False
+
+    def import_port_configs(self, path, file_format=None, upsert=True, dry_run=False):
+        """
+        Import port forwarding configurations from a JSON, CSV or Parquet file.
+
+        The file is loaded with DuckDB's own readers and validated in SQL. Valid
+        rows are written in a single transaction; invalid rows are skipped and
+        listed in the report. Optional columns missing from the file (or empty in
+        a row) keep their current value on update and their default on insert.
+
+        Args:
+            path (str): File to import
+            file_format (str, optional): 'json', 'csv' or 'parquet' (default: from the file extension)
+            upsert (bool): Update configurations whose name already exists (default True);
+                if False those rows are reported as invalid
+            dry_run (bool): Validate and count only, write nothing
+
+        Returns:
+            dict: Report with success, total, inserted, updated, unchanged, invalid,
+                errors (list of row/name/error dicts), ignored_columns and dry_run
+        """
+        report = {
+            'success': False, 'total': 0, 'inserted': 0, 'updated': 0, 'unchanged': 0, 'invalid': 0,
+            'errors': [], 'ignored_columns': [], 'dry_run': dry_run
+        }
+        file_format = file_format or PORT_CONFIG_FORMATS.get(os.path.splitext(path)[1].lower())
+        if file_format not in PORT_CONFIG_READERS:
+            print(f"✗ Cannot import {path}: unknown format (use {', '.join(PORT_CONFIG_READERS)})")
+            report['error'] = 'unknown format'
+            return report
+
+        try:
+            with self._db_cursor() as con:
+                con.execute("BEGIN TRANSACTION")
+                try:
+                    present = self._stage_port_config_import(con, path, file_format, upsert, report)
+                    if dry_run:
+                        con.execute("ROLLBACK")
+                    else:
+                        self._apply_port_config_import(con, present, upsert)
+                        con.execute("COMMIT")
+                except Exception:
+                    con.execute("ROLLBACK")
+                    raise
+
+        except Exception as e:
+            print(f"✗ Failed to import port configurations: {e}")
+            report['error'] = str(e)
+            return report
+
+        if not dry_run:
+            self._invalidate_config_cache()
+        report['success'] = True
+
+        verb = "Validated" if dry_run else "Imported"
+        print(f"✓ {verb} {path}: {report['inserted']} new, {report['updated']} updated, "
+              f"{report['unchanged']} unchanged, {report['invalid']} invalid")
+        for error in report['errors']:
+            print(f"  ✗ Row {error['row']} ({error['name'] or 'no name'}): {error['error']}")
+        if report['ignored_columns']:
+            print(f"  ⚠ Ignored columns: {', '.join(report['ignored_columns'])}")
+        return report
+
+    def _stage_port_config_import(self, con, path, file_format, upsert, report):
+        """
+        Load an import file into the temp table port_config_import and validate every row.
+
+        Fills in the counts, errors and ignored columns of report.
+
+        Returns:
+            list: Fields of PORT_CONFIG_UPDATABLE present in the file
+        """
+        con.execute(f"CREATE TEMP TABLE port_config_raw AS SELECT * FROM {PORT_CONFIG_READERS[file_format]}", [path])
+        columns = [row[0] for row in con.execute("DESCRIBE port_config_raw").fetchall()]
+        missing = [field for field in PORT_CONFIG_REQUIRED if field not in columns]
+        if missing:
+            raise ValueError(f"missing required column(s): {', '.join(missing)}")
+        report['ignored_columns'] = [column for column in columns if column not in PORT_CONFIG_UPDATABLE]
+        present = [field for field in PORT_CONFIG_UPDATABLE if field in columns]
+
+        # One typed column per field plus a '; '-joined list of everything wrong with the row
+        select = []
+        checks = []
+        for field in PORT_CONFIG_UPDATABLE:
+            sql_type = PORT_CONFIG_TYPES.get(field, 'VARCHAR')
+            if field not in present:
+                select.append(f"CAST(NULL AS {sql_type}) AS {field}")
+                continue
+            typed = f'TRY_CAST("{field}" AS {sql_type})'
+            if field in PORT_CONFIG_CHOICES:
+                typed = f"lower(trim({typed}))"
+            select.append(f"{typed} AS {field}")
+            empty = f'"{field}" IS NULL'
+            if sql_type == 'VARCHAR':
+                empty += f""" OR trim(CAST("{field}" AS VARCHAR)) = ''"""
+            # Empty optional fields fall back to the current value or default, empty required ones are errors
+            when_empty = f"'{field} is required'" if field in PORT_CONFIG_REQUIRED else "NULL"
+            check = f"CASE WHEN {empty} THEN {when_empty}"
+            check += f" WHEN {typed} IS NULL THEN '{field} is not a valid {sql_type.lower()}'"
+            if field in PORT_CONFIG_RANGES:
+                low, high = PORT_CONFIG_RANGES[field]
+                check += f" WHEN {typed} NOT BETWEEN {low} AND {high} THEN '{field} must be between {low} and {high}'"
+            if field in PORT_CONFIG_CHOICES:
+                choices = PORT_CONFIG_CHOICES[field]
+                check += (f" WHEN {typed} NOT IN ({', '.join(repr(choice) for choice in choices)})"
+                          f" THEN '{field} must be one of {', '.join(choices)}'")
+            checks.append(check + " END")
+        checks.append("""CASE WHEN count(*) OVER (PARTITION BY CAST("name" AS VARCHAR)) > 1 THEN 'duplicate name in file' END""")
+        if not upsert:
+            checks.append("""CASE WHEN CAST("name" AS VARCHAR) IN (SELECT name FROM port_configs) THEN 'name already exists' END""")
+        if 'server_bind_port' in present:
+            bind_port = 'TRY_CAST("server_bind_port" AS INTEGER)'
+            checks.append(f"""
+                CASE WHEN {bind_port} IS NOT NULL AND count(*) OVER (PARTITION BY {bind_port}) > 1
+                     THEN 'duplicate server_bind_port in file' END
+            """)
+            # Qualified, since bare names inside the subquery would resolve to port_configs
+            checks.append("""(
+                SELECT 'server_bind_port already used by ' || any_value(p.name)
+                FROM port_configs p
+                WHERE p.server_bind_port = TRY_CAST(port_config_raw."server_bind_port" AS INTEGER)
+                  AND p.name <> CAST(port_config_raw."name" AS VARCHAR)
+            )""")
+
+        con.execute(f"""
+            CREATE TEMP TABLE port_config_import AS
+            SELECT row_number() OVER (ORDER BY rowid) AS line, {', '.join(select)}, concat_ws('; ', {', '.join(checks)}) AS error
+            FROM port_config_raw
+        """)
+
+        report['errors'] = [
+            {'row': line, 'name': name, 'error': error}
+            for line, name, error in con.execute(
+                "SELECT line, name, error FROM port_config_import WHERE error <> '' ORDER BY line"
+            ).fetchall()
+        ]
+        changed = ' OR '.join(
+            f"(i.{field} IS NOT NULL AND i.{field} IS DISTINCT FROM p.{field})" for field in present if field != 'name'
+        )
+        total, inserted, updated = con.execute(f"""
+            SELECT COUNT(*),
+                   COUNT(*) FILTER (WHERE i.error = '' AND p.name IS NULL),
+                   COUNT(*) FILTER (WHERE i.error = '' AND p.name IS NOT NULL AND ({changed}))
+            FROM port_config_import i LEFT JOIN port_configs p ON p.name = i.name
+        """).fetchone()
+        report['total'] = total
+        report['invalid'] = len(report['errors'])
+        report['inserted'] = inserted
+        report['updated'] = updated
+        report['unchanged'] = total - report['invalid'] - inserted - updated
+        return present
+
+    def _apply_port_config_import(self, con, present, upsert):
+        """Write the valid rows of port_config_import: update changed configurations, then insert new ones."""
+        fields = [field for field in present if field != 'name']
+        if upsert:
+            assignments = ', '.join(f"{field} = coalesce(i.{field}, port_configs.{field})" for field in fields)
+            changed = ' OR '.join(
+                f"(i.{field} IS NOT NULL AND i.{field} IS DISTINCT FROM port_configs.{field})" for field in fields
+            )
+            con.execute(f"""
+                UPDATE port_configs SET {assignments}, updated_at = now()
+                FROM port_config_import i
+                WHERE port_configs.name = i.name AND i.error = '' AND ({changed})
+            """)
+
+        con.execute(f"""
+            INSERT INTO port_configs (name, local_port, remote_host, remote_port, server_bind_port, description,
+                                      active, chunk_size, compression)
+            SELECT name, local_port, remote_host, remote_port, server_bind_port, coalesce(description, ''),
+                   coalesce(active, FALSE), coalesce(chunk_size, {DEFAULT_CHUNK_SIZE}),
+                   coalesce(compression, '{DEFAULT_COMPRESSION}')
+            FROM port_config_import
+            WHERE error = '' AND name NOT IN (SELECT name FROM port_configs)
+            ORDER BY line
+        """)
+
+    def export_port_configs(self, path, file_format=None):
+        """
+        Export all port forwarding configurations to a JSON, CSV or Parquet file.
+        The file uses the columns import_port_configs() reads, so it can be re-imported.
+
+        Args:
+            path (str): File to write (overwritten if it exists)
+            file_format (str, optional): 'json', 'csv' or 'parquet' (default: from the file extension)
+
+        Returns:
+            bool: True if exported successfully, False otherwise
+        """
+        file_format = file_format or PORT_CONFIG_FORMATS.get(os.path.splitext(path)[1].lower())
+        if file_format not in PORT_CONFIG_WRITERS:
+            print(f"✗ Cannot export to {path}: unknown format (use {', '.join(PORT_CONFIG_WRITERS)})")
+            return False
+
+        try:
+            with self._db_cursor() as con:
+                count = con.execute("SELECT COUNT(*) FROM port_configs").fetchone()[0]
+                # COPY takes no parameters; quote the path as a SQL string literal
+                target = path.replace("'", "''")
+                con.execute(f"""
+                    COPY (SELECT {', '.join(PORT_CONFIG_UPDATABLE)} FROM port_configs ORDER BY name)
+                    TO '{target}' ({PORT_CONFIG_WRITERS[file_format]})
+                """)
+
+            print(f"✓ Exported {count} port configuration(s) to {path}")
+            return True
+
+        except Exception as e:
+            print(f"✗ Failed to export port configurations: {e}")
+            return False
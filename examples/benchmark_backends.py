@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Tunnel backend benchmark.
+
+Starts the same reverse tunnels with the paramiko backend and with the
+openssh backend (an `ssh` ControlMaster subprocess), downloads a payload
+through every tunnel at once and reports the aggregate throughput and the
+CPU time this process spent per GiB moved. With openssh the encryption and
+relaying happen in the ssh process, so Haruka's own CPU time is mostly the
+benchmark's download clients.
+
+Afterwards the SSH connections are killed (the ControlMaster process for
+openssh, the pooled transports for paramiko) and the time the tunnel
+supervisor takes to bring every tunnel back is reported. --compression runs
+each backend once per compression mode, so the restore of compressed
+connections (a separate ControlMaster or transport pool) is covered too.
+
+By default the SSH server is examples/loopback_server.py in a separate
+process. That server is one Python process doing paramiko crypto for both
+backends and caps what either can reach; use --server env to measure
+against the real SSH server configured in .env (the bind ports must be
+reachable from here, e.g. a local sshd).
+
+Usage:
+    python examples/benchmark_backends.py
+    python examples/benchmark_backends.py --tunnels 8 --size-mb 128 --mode multiplex
+    python examples/benchmark_backends.py --server env
+    python examples/benchmark_backends.py --compression off on
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import threading
+import time
+
+# Add parent directory to path to import Haruka
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from __init__ import Haruka, RELAY_MODES, SSH_BACKENDS
+from benchmark_relay import start_source_service, free_port, download
+from benchmark_shards import start_loopback_process
+
+
+def kill_connections(haruka, backend):
+    """Kill every SSH connection of one backend as if the network had dropped it."""
+    if backend == 'openssh':
+        with haruka._openssh_lock:
+            for master in haruka._openssh_masters.values():
+                if master['process'] is not None:
+                    master['process'].kill()
+                    master['process'].wait()
+        return
+    with haruka._ssh_pool_lock:
+        transports = [client.get_transport() for clients in haruka._ssh_pool.values() for client in clients]
+    for transport in transports:
+        transport.close()
+
+
+def measure_restore(haruka, backend, bind_ports, payload_size, host, timeout=30):
+    """
+    Kill the connections, let the tunnel supervisor restore them and check every tunnel again.
+
+    Returns:
+        float: Seconds until every tunnel was restored and answered, or None if that did not happen within timeout
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        haruka.start_tunnel_supervisor(interval=0.2)
+        restored_before = haruka.get_supervisor_stats()['restored_tunnels']
+        start = time.perf_counter()
+        kill_connections(haruka, backend)
+        while time.perf_counter() - start < timeout:
+            stats = haruka.get_supervisor_stats()
+            if stats['restored_tunnels'] - restored_before >= len(bind_ports) and not stats['pending_tunnels']:
+                break
+            time.sleep(0.05)
+        else:
+            haruka.stop_tunnel_supervisor()
+            return None
+        elapsed = time.perf_counter() - start
+        haruka.stop_tunnel_supervisor()
+        try:
+            for bind_port in bind_ports:
+                download(bind_port, payload_size, host=host)
+        except Exception:
+            return None
+    return elapsed
+
+
+def run(backend, tunnels, source_port, payload_size, relay_mode, repeat, compression='off'):
+    """
+    Start tunnels on one backend and download through all of them at once,
+    then measure how long the supervisor takes to restore them.
+
+    Returns:
+        tuple: (best aggregate throughput in MiB/s, CPU seconds of this process per GiB,
+            restore seconds or None), or None if a tunnel failed
+    """
+    haruka = Haruka()
+    host = os.getenv("SSH_HOST")
+    bind_ports = [free_port() for _ in range(tunnels)]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        ok = haruka.reverse_forward_multiple(
+            [(source_port, bind_port) for bind_port in bind_ports], background=True, relay_mode=relay_mode,
+            backend=backend, compression=compression
+        )
+    if not ok:
+        with contextlib.redirect_stdout(io.StringIO()):
+            haruka.close_ssh_connections()
+        return None
+    time.sleep(0.3)
+
+    best = None
+    best_cpu = None
+    for _ in range(repeat):
+        errors = []
+
+        def fetch(bind_port):
+            try:
+                download(bind_port, payload_size, host=host)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=fetch, args=(bind_port,)) for bind_port in bind_ports]
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        elapsed = time.perf_counter() - start
+        cpu = time.process_time() - cpu_start
+        if errors:
+            print(f"  ✗ {errors[0]}")
+            break
+        if best is None or elapsed < best:
+            best, best_cpu = elapsed, cpu
+
+    restore = measure_restore(haruka, backend, bind_ports, payload_size, host) if best else None
+    with contextlib.redirect_stdout(io.StringIO()):
+        haruka.close_ssh_connections()
+    if not best:
+        return None
+    gib = tunnels * payload_size / (1024 ** 3)
+    return tunnels * payload_size / best / (1024 * 1024), best_cpu / gib, restore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tunnel throughput per SSH backend")
+    parser.add_argument("--size-mb", type=int, default=32, help="payload per tunnel per run in MiB (default 32)")
+    parser.add_argument("--tunnels", type=int, default=4, help="concurrent tunnels (default 4)")
+    parser.add_argument("--backends", nargs="+", default=list(SSH_BACKENDS), choices=SSH_BACKENDS)
+    parser.add_argument("--mode", default="thread", choices=RELAY_MODES, help="relay mode for the paramiko backend")
+    parser.add_argument("--compression", nargs="+", default=["off"], choices=("off", "on"),
+                        help="SSH compression modes to run each backend with (default off)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per backend, best is reported")
+    parser.add_argument("--server", default="loopback", choices=("loopback", "env"))
+    args = parser.parse_args()
+
+    if "openssh" in args.backends and shutil.which(os.getenv("SSH_BINARY", "ssh")) is None:
+        print("✗ No ssh client found; install OpenSSH or set SSH_BINARY")
+        return 1
+
+    payload_size = args.size_mb * 1024 * 1024
+
+    server = None
+    if args.server == "loopback":
+        print("Starting loopback SSH server process...")
+        server = start_loopback_process()
+    source_port = start_source_service(payload_size)
+
+    print(f"\n{args.tunnels} tunnels × {args.size_mb} MiB, best of {args.repeat}\n")
+    print(f"  {'Backend':<9} {'Compress':<9} {'MiB/s':>9} {'Speedup':>8} {'CPU s/GiB':>10} {'Restore s':>10}")
+    print("  " + "─" * 60)
+
+    baseline = None
+    try:
+        for backend in args.backends:
+            for compression in args.compression:
+                result = run(backend, args.tunnels, source_port, payload_size, args.mode, args.repeat, compression)
+                if result is None:
+                    print(f"  {backend:<9} {compression:<9} {'failed':>9}")
+                    continue
+                rate, cpu_per_gib, restore = result
+                baseline = baseline or rate
+                restore_text = f"{restore:.2f}" if restore is not None else "failed"
+                print(f"  {backend:<9} {compression:<9} {rate:>9.1f} {rate / baseline:>7.2f}x {cpu_per_gib:>10.2f} "
+                      f"{restore_text:>10}")
+    finally:
+        if server is not None:
+            server.terminate()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Cipher and MAC throughput benchmark.
+
+Opens a reverse tunnel once per cipher (and per MAC, for ciphers that are
+not AEAD) with SSH_CIPHERS / SSH_MACS set to that single algorithm,
+downloads a payload through it and reports the throughput next to paramiko's
+default negotiation. The winning names can go straight into SSH_CIPHERS and
+SSH_MACS in .env.
+
+The SSH server is examples/loopback_server.py in a separate process, so
+both ends of the connection run paramiko's implementation of each cipher.
+Use --server env to measure against the real SSH server configured in .env
+(the bind port must be reachable from here, e.g. a local sshd).
+
+Usage:
+    python examples/benchmark_ciphers.py
+    python examples/benchmark_ciphers.py --ciphers aes128-gcm@openssh.com aes128-ctr --macs hmac-sha2-256-etm@openssh.com
+    python examples/benchmark_ciphers.py --size-mb 128 --mode multiplex
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+# Add parent directory to path to import Haruka
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import paramiko
+
+from __init__ import Haruka, RELAY_MODES
+from benchmark_relay import start_source_service, free_port, download
+from benchmark_shards import start_loopback_process
+
+# AEAD ciphers authenticate the data themselves, so the MAC is not used
+AEAD_CIPHERS = ('aes128-gcm@openssh.com', 'aes256-gcm@openssh.com')
+
+
+def run(cipher, mac, source_port, payload_size, relay_mode, repeat):
+    """
+    Start one tunnel with the given cipher and MAC (None = paramiko's default) and download through it.
+
+    Returns:
+        tuple: (best throughput in MiB/s, negotiated cipher, negotiated mac), or None if the tunnel failed
+    """
+    for env_name, value in (("SSH_CIPHERS", cipher), ("SSH_MACS", mac)):
+        if value:
+            os.environ[env_name] = value
+        else:
+            os.environ.pop(env_name, None)
+
+    haruka = Haruka()
+    host = os.getenv("SSH_HOST")
+    bind_port = free_port()
+    with contextlib.redirect_stdout(io.StringIO()):
+        ok = haruka.reverse_forward_tunnel(source_port, bind_port, background=True, relay_mode=relay_mode)
+    if not ok:
+        with contextlib.redirect_stdout(io.StringIO()):
+            haruka.close_ssh_connections()
+        return None
+    time.sleep(0.2)
+
+    links = haruka.get_link_stats()
+    negotiated = (links[0]['cipher'], links[0]['mac']) if links else (cipher, mac)
+
+    best = None
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(repeat):
+                start = time.perf_counter()
+                download(bind_port, payload_size, host=host)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+    except Exception as e:
+        print(f"  ✗ {cipher}: {e}")
+    finally:
+        with contextlib.redirect_stdout(io.StringIO()):
+            haruka.close_ssh_connections()
+    if best is None:
+        return None
+    return (payload_size / best / (1024 * 1024),) + negotiated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tunnel throughput per SSH cipher and MAC")
+    parser.add_argument("--size-mb", type=int, default=32, help="payload per run in MiB (default 32)")
+    parser.add_argument("--ciphers", nargs="+", default=list(paramiko.Transport._preferred_ciphers),
+                        help="ciphers to measure (default: every cipher paramiko supports)")
+    parser.add_argument("--macs", nargs="+", default=None,
+                        help="MACs to pair with non-AEAD ciphers (default: paramiko's choice)")
+    parser.add_argument("--mode", default="thread", choices=RELAY_MODES, help="relay mode")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per combination, best is reported")
+    parser.add_argument("--server", default="loopback", choices=("loopback", "env"))
+    args = parser.parse_args()
+
+    payload_size = args.size_mb * 1024 * 1024
+
+    server = None
+    if args.server == "loopback":
+        print("Starting loopback SSH server process...")
+        server = start_loopback_process()
+    source_port = start_source_service(payload_size)
+
+    print(f"\n{args.size_mb} MiB through one tunnel, {args.mode} relays, best of {args.repeat}\n")
+    print(f"  {'Cipher':<24} {'MAC':<30} {'MiB/s':>8} {'vs default':>11}")
+    print("  " + "─" * 76)
+
+    combinations = [(None, None)]
+    for cipher in args.ciphers:
+        for mac in ([None] if cipher in AEAD_CIPHERS else (args.macs or [None])):
+            combinations.append((cipher, mac))
+
+    baseline = None
+    results = []
+    try:
+        for cipher, mac in combinations:
+            result = run(cipher, mac, source_port, payload_size, args.mode, args.repeat)
+            label = cipher or "(default)"
+            if result is None:
+                print(f"  {label:<24} {mac or '':<30} {'failed':>8}")
+                continue
+            rate, negotiated_cipher, negotiated_mac = result
+            baseline = baseline or rate
+            if cipher in AEAD_CIPHERS:
+                negotiated_mac = "(AEAD)"
+            elif cipher is None:
+                label = f"({negotiated_cipher})"
+            print(f"  {label:<24} {negotiated_mac or '':<30} {rate:>8.1f} {rate / baseline:>10.2f}x")
+            if cipher:
+                results.append((rate, cipher, mac))
+    finally:
+        if server is not None:
+            server.terminate()
+
+    if results:
+        rate, cipher, mac = max(results)
+        print(f"\nFastest: SSH_CIPHERS={cipher}" + (f" SSH_MACS={mac}" if mac else "") + f" ({rate:.1f} MiB/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark.
+
+Imports the Haruka module, pymanage and pytunnel in fresh interpreters with
+`python -X importtime` and reports the cumulative import time of each, plus
+the slowest modules they pull in. paramiko and duckdb are loaded on first use,
+so they should not show up here; the run fails if one of them does, or if an
+import exceeds --max-ms.
+
+Usage:
+    python examples/benchmark_import.py
+    python examples/benchmark_import.py --repeat 10 --top 8 --max-ms 100
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entry points, as imported by the CLIs and by `from __init__ import Haruka`
+MODULES = ("__init__", "pymanage", "pytunnel")
+
+# Dependencies that must only be imported when first used
+LAZY_MODULES = ("paramiko", "duckdb", "asyncio")
+
+
+def import_times(module=None):
+    """
+    Import module in a fresh interpreter with -X importtime.
+
+    Args:
+        module (str, optional): Module to import; None only starts the interpreter
+
+    Returns:
+        dict: Cumulative microseconds per imported module name
+    """
+    code = f"import sys; sys.path.insert(0, {ROOT!r}); import {module}" if module else "pass"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Haruka import time")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per module, best is reported (default 5)")
+    parser.add_argument("--top", type=int, default=5, help="slowest dependencies to list per module")
+    parser.add_argument("--max-ms", type=float, default=None, help="fail if any module takes longer than this")
+    args = parser.parse_args()
+
+    # Modules every interpreter imports at startup are not ours to account for
+    startup = set(import_times())
+
+    failed = False
+    print(f"\nBest of {args.repeat} runs\n")
+    print(f"  {'Module':<10} {'Import ms':>10}")
+    print("  " + "─" * 22)
+
+    for module in MODULES:
+        best = None
+        for _ in range(args.repeat):
+            times = import_times(module)
+            if best is None or times[module] < best[module]:
+                best = times
+
+        total_ms = best[module] / 1000
+        print(f"  {module:<10} {total_ms:>10.1f}")
+
+        dependencies = sorted(
+            ((name, us) for name, us in best.items() if name != module and name not in startup and "." not in name),
+            key=lambda item: item[1], reverse=True
+        )
+        for name, us in dependencies[:args.top]:
+            print(f"      {name:<24} {us / 1000:>7.1f} ms")
+
+        eager = [name for name in LAZY_MODULES if name in best]
+        if eager:
+            print(f"  ✗ {module} imports {', '.join(eager)} at import time")
+            failed = True
+        if args.max_ms is not None and total_ms > args.max_ms:
+            print(f"  ✗ {module} took {total_ms:.1f} ms (limit {args.max_ms} ms)")
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
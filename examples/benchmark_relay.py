@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Relay throughput benchmark.
+
+Runs a reverse tunnel against the in-process loopback SSH server and
+downloads a fixed payload from a local "source" service through it, for
+every combination of relay mode and relay chunk size. 4096 bytes is the
+fixed read size the relays used before chunk_size existed.
+
+Usage:
+    python examples/benchmark_relay.py
+    python examples/benchmark_relay.py --size-mb 256 --modes thread multiplex --chunks 4096 65536 1048576
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import socket
+import sys
+import threading
+import time
+
+# Add parent directory to path to import Haruka
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from __init__ import Haruka, RELAY_MODES
+from loopback_server import LoopbackSSHServer
+
+
+def start_source_service(payload_size):
+    """Local service that writes payload_size bytes to every client, then closes."""
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(16)
+    block = memoryview(bytes(1024 * 1024))
+
+    def serve(conn):
+        remaining = payload_size
+        try:
+            while remaining:
+                n = min(remaining, len(block))
+                conn.sendall(block[:n])
+                remaining -= n
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
+    def accept_loop():
+        while True:
+            conn, _ = listener.accept()
+            threading.Thread(target=serve, args=(conn,), daemon=True).start()
+
+    threading.Thread(target=accept_loop, daemon=True).start()
+    return listener.getsockname()[1]
+
+
+def free_port():
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    s.bind(("127.0.0.1", 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+def download(port, payload_size, host="127.0.0.1"):
+    """Read payload_size bytes from the public side of the tunnel. Returns seconds taken."""
+    buffer = bytearray(1024 * 1024)
+    received = 0
+    start = time.perf_counter()
+    with socket.create_connection((host, port), timeout=60) as conn:
+        while received < payload_size:
+            n = conn.recv_into(buffer)
+            if n == 0:
+                break
+            received += n
+    elapsed = time.perf_counter() - start
+    if received != payload_size:
+        raise RuntimeError(f"short read: {received}/{payload_size} bytes")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Haruka relay throughput")
+    parser.add_argument("--size-mb", type=int, default=64, help="payload per run in MiB (default 64)")
+    parser.add_argument("--modes", nargs="+", default=list(RELAY_MODES), choices=RELAY_MODES)
+    parser.add_argument("--chunks", nargs="+", type=int, default=[4096, 65536, 262144, 1048576])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per combination, best is reported")
+    args = parser.parse_args()
+
+    payload_size = args.size_mb * 1024 * 1024
+
+    print("Starting loopback SSH server...")
+    server = LoopbackSSHServer().start()
+    server.apply_env()
+    source_port = start_source_service(payload_size)
+    haruka = Haruka()
+
+    print(f"\nPayload: {args.size_mb} MiB per run, best of {args.repeat}\n")
+    print(f"  {'Mode':<10} {'Chunk':>9} {'MiB/s':>9}")
+    print("  " + "─" * 30)
+
+    for mode in args.modes:
+        for chunk_size in args.chunks:
+            bind_port = free_port()
+            with contextlib.redirect_stdout(io.StringIO()):
+                ok = haruka.reverse_forward_tunnel(
+                    source_port, bind_port, background=True, relay_mode=mode, chunk_size=chunk_size
+                )
+                time.sleep(0.3)
+                best = None
+                if ok:
+                    for _ in range(args.repeat):
+                        elapsed = download(bind_port, payload_size)
+                        best = elapsed if best is None else min(best, elapsed)
+            if best is None:
+                print(f"  {mode:<10} {chunk_size:>9} {'failed':>9}")
+                continue
+            rate = payload_size / best / (1024 * 1024)
+            print(f"  {mode:<10} {chunk_size:>9} {rate:>9.1f}")
+
+    server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
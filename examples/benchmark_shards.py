@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Transport sharding benchmark.
+
+Starts several reverse tunnels with SSH_TRANSPORTS_PER_HOST set to each
+requested shard count, downloads a payload through every tunnel at once and
+reports the aggregate throughput. Each pooled transport has its own paramiko
+packet thread, so with more shards the tunnels' encryption is no longer
+serialized through a single thread.
+
+By default the SSH server is examples/loopback_server.py in a separate
+process, so its crypto does not compete with Haruka for the GIL. That server
+is itself one Python process and caps what any shard count can reach. Use
+--server env to measure against the real SSH server configured in .env (the
+bind ports must be reachable from here, e.g. a local sshd).
+
+Usage:
+    python examples/benchmark_shards.py
+    python examples/benchmark_shards.py --tunnels 8 --shards 1 2 4 8 --policy least_loaded --size-mb 128
+    python examples/benchmark_shards.py --server env
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import threading
+import time
+
+# Add parent directory to path to import Haruka
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from __init__ import Haruka, RELAY_MODES, SHARD_POLICIES
+from benchmark_relay import start_source_service, free_port, download
+
+
+def start_loopback_process():
+    """Run loopback_server.py in its own interpreter and point the SSH_* variables at it."""
+    server = subprocess.Popen(
+        [sys.executable, "-u", os.path.join(os.path.dirname(os.path.abspath(__file__)), "loopback_server.py")],
+        # Its stderr only carries paramiko's noise about clients hanging up
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    port = int(server.stdout.readline().rsplit(":", 1)[1])
+    key_path = server.stdout.readline().split(":", 1)[1].strip()
+    os.environ["SSH_HOST"] = "127.0.0.1"
+    os.environ["SSH_PORT"] = str(port)
+    os.environ["SSH_USER"] = "loopback"
+    os.environ["PRIVATE_KEY_PATH"] = key_path
+    os.environ["FORWARD_HOST"] = "127.0.0.1"
+    os.environ["SUPERVISOR_KILL_ZOMBIES"] = "False"
+    # Its host key is new every run; keep it out of the user's known_hosts (openssh backend)
+    os.environ["SSH_KNOWN_HOSTS"] = os.devnull
+    return server
+
+
+def run(shards, tunnels, source_port, payload_size, relay_mode, repeat):
+    """
+    Start tunnels over a pool of shards transports and download through all of them at once.
+
+    Returns:
+        float: Best aggregate throughput in MiB/s, or None if a tunnel failed
+    """
+    os.environ["SSH_TRANSPORTS_PER_HOST"] = str(shards)
+    haruka = Haruka()
+    host = os.getenv("SSH_HOST")
+    bind_ports = [free_port() for _ in range(tunnels)]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        ok = haruka.reverse_forward_multiple(
+            [(source_port, bind_port) for bind_port in bind_ports], background=True, relay_mode=relay_mode
+        )
+    if not ok:
+        haruka.close_ssh_connections()
+        return None
+    time.sleep(0.3)
+
+    best = None
+    for _ in range(repeat):
+        errors = []
+
+        def fetch(bind_port):
+            try:
+                download(bind_port, payload_size, host=host)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=fetch, args=(bind_port,)) for bind_port in bind_ports]
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        elapsed = time.perf_counter() - start
+        if errors:
+            print(f"  ✗ {errors[0]}")
+            break
+        best = elapsed if best is None else min(best, elapsed)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        haruka.close_ssh_connections()
+    return tunnels * payload_size / best / (1024 * 1024) if best else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark aggregate tunnel throughput versus transport shards")
+    parser.add_argument("--size-mb", type=int, default=32, help="payload per tunnel per run in MiB (default 32)")
+    parser.add_argument("--tunnels", type=int, default=4, help="concurrent tunnels (default 4)")
+    parser.add_argument("--shards", nargs="+", type=int, default=[1, 2, 4], help="SSH_TRANSPORTS_PER_HOST values")
+    parser.add_argument("--policy", default="hash", choices=SHARD_POLICIES)
+    parser.add_argument("--mode", default="thread", choices=RELAY_MODES, help="relay mode")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per shard count, best is reported")
+    parser.add_argument("--server", default="loopback", choices=("loopback", "env"))
+    args = parser.parse_args()
+
+    payload_size = args.size_mb * 1024 * 1024
+    os.environ["SSH_SHARD_POLICY"] = args.policy
+
+    server = None
+    if args.server == "loopback":
+        print("Starting loopback SSH server process...")
+        server = start_loopback_process()
+    source_port = start_source_service(payload_size)
+
+    print(f"\n{args.tunnels} tunnels × {args.size_mb} MiB, policy {args.policy}, {args.mode} relays, "
+          f"best of {args.repeat}\n")
+    print(f"  {'Shards':>6} {'MiB/s':>9} {'Speedup':>8}")
+    print("  " + "─" * 26)
+
+    baseline = None
+    try:
+        for shards in args.shards:
+            rate = run(shards, args.tunnels, source_port, payload_size, args.mode, args.repeat)
+            if rate is None:
+                print(f"  {shards:>6} {'failed':>9}")
+                continue
+            baseline = baseline or rate
+            print(f"  {shards:>6} {rate:>9.1f} {rate / baseline:>7.2f}x")
+    finally:
+        if server is not None:
+            server.terminate()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+In-process paramiko SSH server for local testing and benchmarks.
+
+Accepts any public key, honours remote (-R) and local (-L) port forward
+requests, and exposes a minimal exec_command for the health helpers.
+Nothing here is meant for production use.
+"""
+
+import os
+import socket
+import sys
+import tempfile
+import threading
+
+import paramiko
+
+
+class _LoopbackInterface(paramiko.ServerInterface):
+    """Permissive server policy: any key, any forward."""
+
+    def __init__(self, server, transport):
+        self.server = server
+        self.transport = transport
+
+    def get_allowed_auths(self, username):
+        return "publickey"
+
+    def check_auth_publickey(self, username, key):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_channel_request(self, kind, chanid):
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_direct_tcpip_request(self, chanid, origin, destination):
+        self.server.pending_direct[chanid] = destination
+        return paramiko.OPEN_SUCCEEDED
+
+    def check_channel_exec_request(self, channel, command):
+        self.server.commands.append(command.decode() if isinstance(command, bytes) else command)
+        threading.Thread(target=self.server.run_exec, args=(channel, command), daemon=True).start()
+        return True
+
+    def check_port_forward_request(self, address, port):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            listener.bind(("127.0.0.1", port))
+        except OSError:
+            # Refuse like sshd does instead of tearing down the transport
+            listener.close()
+            return False
+        listener.listen(128)
+        bound_port = listener.getsockname()[1]
+        self.server.listeners[bound_port] = listener
+        self.server.listener_owners[bound_port] = self.transport
+        threading.Thread(
+            target=self.server.serve_forward,
+            args=(self.transport, listener, address, bound_port),
+            daemon=True
+        ).start()
+        return bound_port
+
+    def cancel_port_forward_request(self, address, port):
+        listener = self.server.listeners.pop(port, None)
+        if listener is not None:
+            _close_listener(listener)
+
+
+class LoopbackSSHServer:
+    """
+    Minimal SSH server bound to 127.0.0.1 on an ephemeral port.
+
+    Usage:
+        server = LoopbackSSHServer()
+        server.start()
+        server.apply_env()   # points SSH_* variables at this server
+        ...
+        server.stop()
+    """
+
+    def __init__(self):
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self.client_key = paramiko.RSAKey.generate(2048)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("127.0.0.1", 0))
+        self.port = self.sock.getsockname()[1]
+        self.transports = []
+        self.listeners = {}
+        self.listener_owners = {}
+        self.pending_direct = {}
+        self.commands = []
+        self.running = False
+        self._key_dir = tempfile.mkdtemp(prefix="haruka-loopback-")
+        self.key_path = os.path.join(self._key_dir, "id_rsa")
+        self.client_key.write_private_key_file(self.key_path)
+
+    def start(self):
+        """Start accepting SSH connections in a background thread."""
+        self.running = True
+        self.sock.listen(128)
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        return self
+
+    def stop(self):
+        """Close every transport and listener."""
+        self.running = False
+        for listener in list(self.listeners.values()):
+            _close_listener(listener)
+        for transport in self.transports:
+            transport.close()
+        self.sock.close()
+
+    def apply_env(self):
+        """Point the SSH_* environment variables used by Haruka at this server."""
+        os.environ["SSH_HOST"] = "127.0.0.1"
+        os.environ["SSH_PORT"] = str(self.port)
+        os.environ["SSH_USER"] = "loopback"
+        os.environ["PRIVATE_KEY_PATH"] = self.key_path
+        os.environ["FORWARD_HOST"] = "127.0.0.1"
+        # Remote commands run on this host; never let the supervisor kill "zombie" port owners here
+        os.environ["SUPERVISOR_KILL_ZOMBIES"] = "False"
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                client, _ = self.sock.accept()
+            except OSError:
+                return
+            transport = paramiko.Transport(client)
+            transport.add_server_key(self.host_key)
+            # Offer zlib like sshd does, so clients asking for compression get it
+            transport.use_compression(True)
+            transport.start_server(server=_LoopbackInterface(self, transport))
+            self.transports.append(transport)
+            threading.Thread(target=self._accept_channels, args=(transport,), daemon=True).start()
+
+    def _accept_channels(self, transport):
+        while transport.is_active():
+            chan = transport.accept(1)
+            if chan is None:
+                continue
+            destination = self.pending_direct.pop(chan.get_id(), None)
+            if destination is None:
+                continue
+            try:
+                sock = socket.create_connection(destination, timeout=5)
+            except OSError:
+                chan.close()
+                continue
+            # The timeout covers the connect only; like sshd, never close an idle forward
+            sock.settimeout(None)
+            _pipe(chan, sock)
+
+        # Like sshd, release the session's forwarded ports once it is gone
+        for port, owner in list(self.listener_owners.items()):
+            if owner is transport:
+                self.listener_owners.pop(port, None)
+                listener = self.listeners.pop(port, None)
+                if listener is not None:
+                    _close_listener(listener)
+
+    def serve_forward(self, transport, listener, address, port):
+        """Open a forwarded-tcpip channel back to the client for every public connection."""
+        while self.running:
+            try:
+                conn, origin = listener.accept()
+            except OSError:
+                return
+            try:
+                # Echo the requested listen address, as sshd does; OpenSSH clients match on it
+                chan = transport.open_forwarded_tcpip_channel(origin, (address, port))
+            except Exception:
+                conn.close()
+                continue
+            _pipe(chan, conn)
+
+    def run_exec(self, channel, command):
+        """Run an exec request through the local shell and return its output."""
+        import subprocess
+        if isinstance(command, bytes):
+            command = command.decode()
+        result = subprocess.run(["sh", "-c", command], capture_output=True)
+        channel.sendall(result.stdout)
+        channel.sendall_stderr(result.stderr)
+        channel.send_exit_status(result.returncode)
+        channel.close()
+
+
+def _close_listener(listener):
+    """Close a listening socket, waking any thread blocked in accept()."""
+    try:
+        listener.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    listener.close()
+
+
+def _pipe(chan, sock):
+    """Relay bytes both ways between a channel and a socket using two threads."""
+
+    def forward(src_recv, dst_sendall, on_done):
+        try:
+            while True:
+                data = src_recv(65536)
+                if not data:
+                    break
+                dst_sendall(data)
+        except Exception:
+            pass
+        finally:
+            on_done()
+
+    def close_both():
+        try:
+            # shutdown() sends the FIN now; close() alone waits for the other thread's recv()
+            sock.shutdown(socket.SHUT_RDWR)
+        except Exception:
+            pass
+        try:
+            sock.close()
+        except Exception:
+            pass
+        try:
+            chan.close()
+        except Exception:
+            pass
+
+    threading.Thread(target=forward, args=(chan.recv, sock.sendall, close_both), daemon=True).start()
+    threading.Thread(target=forward, args=(sock.recv, chan.sendall, close_both), daemon=True).start()
+
+
+if __name__ == "__main__":
+    server = LoopbackSSHServer().start()
+    print(f"Loopback SSH server listening on 127.0.0.1:{server.port}")
+    print(f"Client key: {server.key_path}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+        sys.exit(0)
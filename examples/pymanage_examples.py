@@ -8,6 +8,8 @@ port forwarding configurations programmatically (non-interactive).
 
 import sys
 import os
+import json
+import tempfile
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -141,25 +143,33 @@ def example_batch_operations():
     manager = PyManage()
     haruka = manager.haruka
     
-    # Create multiple configs
-    print("\n1️⃣  Creating multiple configurations...")
+    # Create multiple configs from an inventory file in one transaction
+    print("\n1️⃣  Importing multiple configurations...")
     services = [
         ("service1", 3000, 5000, "Development service"),
         ("service2", 3001, 5001, "Staging service"),
         ("service3", 3002, 5002, "Production service"),
     ]
     
-    for name, local, bind, desc in services:
-        haruka.add_port_config(
-            name=name,
-            local_port=local,
-            remote_host="localhost",
-            remote_port=local,
-            server_bind_port=bind,
-            description=desc
-        )
-    
-    print(f"   ✓ Created {len(services)} configurations")
+    inventory = os.path.join(tempfile.mkdtemp(), "inventory.json")
+    with open(inventory, "w") as f:
+        json.dump([
+            {
+                "name": name,
+                "local_port": local,
+                "remote_host": "localhost",
+                "remote_port": local,
+                "server_bind_port": bind,
+                "description": desc
+            }
+            for name, local, bind, desc in services
+        ], f)
+    
+    report = haruka.import_port_configs(inventory)
+    print(f"   ✓ Imported {report['inserted']} new, {report['updated']} updated, {report['invalid']} invalid")
+    
+    # Update in place
+    haruka.update_port_config("service3", description="Production service (primary)")
     
     # List all
     print("\n2️⃣  Listing all configurations...")
@@ -176,6 +186,10 @@ def example_batch_operations():
         desc = config['description'][:20]
         print(f"   {name} | {local} | {bind} | {desc}")
     
+    # Export
+    export_path = os.path.join(os.path.dirname(inventory), "port_configs.csv")
+    haruka.export_port_configs(export_path)
+    
     # Cleanup
     print("\n3️⃣  Deleting all created configurations...")
     for config in configs:
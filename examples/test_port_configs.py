@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Test script for the port configuration database.
+
+Each test works on a fresh port_forwarding.db in a temporary directory, so it
+never touches the real configuration:
+1. Freeing a server bind port and claiming it again
+2. Reopening an existing database (the schema migration path)
+3. Upgrading an old database whose configurations share a bind port
+4. Keeping a configuration's ID through renames and bind port changes
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+# Add parent directory to path to import Haruka
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from __init__ import Haruka
+
+
+@contextmanager
+def temporary_database(setup=None):
+    """
+    Run the body in an empty temporary directory and yield a Haruka using the database there.
+
+    Args:
+        setup: Optional callable that creates port_forwarding.db before Haruka opens it
+    """
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix='haruka-db-')
+    os.chdir(workdir)
+    if setup:
+        setup()
+    haruka = Haruka()
+    try:
+        assert haruka.init_port_forwarding_db()
+        yield haruka
+    finally:
+        haruka.close_db()
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def bind_ports(haruka):
+    """Map configuration name -> server bind port."""
+    return {config['name']: config['server_bind_port'] for config in haruka.list_port_configs()}
+
+
+def test_reuse_freed_bind_port():
+    """A bind port freed by a delete or an update can be claimed again."""
+    print("\n" + "="*60)
+    print("BIND PORT REUSE TEST")
+    print("="*60)
+
+    with temporary_database() as haruka:
+        assert haruka.add_port_config('a', 8000, 'localhost', 80, server_bind_port=9000)
+        assert haruka.add_port_config('b', 8001, 'localhost', 80, server_bind_port=9001)
+
+        # Freed by a delete
+        assert haruka.delete_port_config('b')
+        assert haruka.update_port_config('a', server_bind_port=9001)
+
+        # Freed by moving the owner to another port
+        assert haruka.add_port_config('c', 8002, 'localhost', 80, server_bind_port=9002)
+        assert haruka.update_port_config('a', server_bind_port=9003)
+        assert haruka.update_port_config('c', server_bind_port=9001)
+        assert haruka.add_port_config('d', 8003, 'localhost', 80, server_bind_port=9002)
+
+        # The unique index still refuses a port that is really taken
+        assert not haruka.update_port_config('d', server_bind_port=9001)
+        assert bind_ports(haruka) == {'a': 9003, 'c': 9001, 'd': 9002}
+    print("\n✓ Freed bind ports were claimed again")
+
+
+def test_reuse_after_reopen():
+    """Bind ports can be reused after the database is reopened and migrated."""
+    print("\n" + "="*60)
+    print("BIND PORT REUSE AFTER REOPEN TEST")
+    print("="*60)
+
+    with temporary_database() as haruka:
+        assert haruka.add_port_config('a', 8000, 'localhost', 80, server_bind_port=9000)
+        assert haruka.add_port_config('b', 8001, 'localhost', 80, server_bind_port=9001)
+        haruka.close_db()
+
+        # A second process opening the existing file runs the migrations
+        other = Haruka()
+        try:
+            assert other.delete_port_config('b')
+            assert other.update_port_config('a', server_bind_port=9001)
+            assert bind_ports(other) == {'a': 9001}
+        finally:
+            other.close_db()
+    print("\n✓ Freed bind port was claimed again after reopening")
+
+
+def create_unindexed_database():
+    """Write a database from before the unique bind port index, with two configs on port 9000."""
+    import duckdb
+
+    con = duckdb.connect('port_forwarding.db')
+    con.execute("""
+        CREATE TABLE port_configs (
+            name VARCHAR NOT NULL UNIQUE,
+            local_port INTEGER NOT NULL,
+            remote_host VARCHAR NOT NULL,
+            remote_port INTEGER NOT NULL,
+            server_bind_port INTEGER,
+            description VARCHAR,
+            active BOOLEAN DEFAULT FALSE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    con.execute("""
+        INSERT INTO port_configs (name, local_port, remote_host, remote_port, server_bind_port) VALUES
+            ('first', 8000, 'localhost', 80, 9000),
+            ('second', 8001, 'localhost', 80, 9000),
+            ('other', 8002, 'localhost', 80, 9001)
+    """)
+    con.close()
+
+
+def bind_index_exists():
+    """True if the unique bind port index is in port_forwarding.db."""
+    import duckdb
+
+    con = duckdb.connect('port_forwarding.db')
+    try:
+        return con.execute(
+            "SELECT COUNT(*) FROM duckdb_indexes() WHERE index_name = 'port_configs_bind_port'"
+        ).fetchone()[0] == 1
+    finally:
+        con.close()
+
+
+def test_duplicate_bind_ports_left_alone():
+    """Opening an old database with duplicate bind ports changes no data and skips the index."""
+    print("\n" + "="*60)
+    print("DUPLICATE BIND PORT MIGRATION TEST")
+    print("="*60)
+
+    with temporary_database(setup=create_unindexed_database) as haruka:
+        assert bind_ports(haruka) == {'first': 9000, 'second': 9000, 'other': 9001}
+        assert haruka.get_port_config('second')['compression'] == 'off'
+        haruka.close_db()
+        assert not bind_index_exists()
+
+        # Resolving the conflict lets the next open create the index
+        assert haruka.update_port_config('second', server_bind_port=9002)
+        haruka.close_db()
+        other = Haruka()
+        try:
+            assert bind_ports(other) == {'first': 9000, 'second': 9002, 'other': 9001}
+            other.close_db()
+            assert bind_index_exists()
+        finally:
+            other.close_db()
+    print("\n✓ Duplicate bind ports were reported, not rewritten")
+
+
+def test_id_survives_update():
+    """update_port_config() keeps the configuration's ID when name or bind port change."""
+    print("\n" + "="*60)
+    print("STABLE CONFIGURATION ID TEST")
+    print("="*60)
+
+    with temporary_database() as haruka:
+        assert haruka.add_port_config('web', 8000, 'localhost', 80, server_bind_port=9000)
+        assert haruka.add_port_config('api', 8001, 'localhost', 81, server_bind_port=9001)
+        config_id = haruka.get_port_config('web')['id']
+        created_at = haruka.get_port_config('web')['created_at']
+
+        assert haruka.update_port_config(config_id, name='site', server_bind_port=9002)
+        assert haruka.update_port_config(config_id, description='renamed', local_port=8080)
+        config = haruka.get_port_config(config_id)
+        assert config['name'] == 'site'
+        assert config['server_bind_port'] == 9002
+        assert config['local_port'] == 8080
+        assert config['created_at'] == created_at
+
+        # IDs are never reused, and the other configuration is untouched
+        api_id = haruka.get_port_config('api')['id']
+        assert api_id != config_id
+        assert haruka.delete_port_config(config_id)
+        assert haruka.get_port_config(config_id) is None
+        assert haruka.add_port_config('web', 8000, 'localhost', 80, server_bind_port=9000)
+        assert haruka.get_port_config('web')['id'] not in (config_id, api_id)
+        assert haruka.get_port_config(api_id)['name'] == 'api'
+    print("\n✓ Configuration ID stayed the same across updates")
+
+
+def test_ids_added_to_old_database():
+    """The migration gives configurations in an old database distinct IDs that stay fixed."""
+    print("\n" + "="*60)
+    print("CONFIGURATION ID MIGRATION TEST")
+    print("="*60)
+
+    with temporary_database(setup=create_unindexed_database) as haruka:
+        ids = {config['name']: config['id'] for config in haruka.list_port_configs()}
+        assert None not in ids.values()
+        assert len(set(ids.values())) == 3
+
+        assert haruka.update_port_config(ids['second'], name='renamed', server_bind_port=9002)
+        haruka.close_db()
+        other = Haruka()
+        try:
+            assert {config['name']: config['id'] for config in other.list_port_configs()} == {
+                'first': ids['first'], 'renamed': ids['second'], 'other': ids['other']
+            }
+            assert other.add_port_config('new', 8003, 'localhost', 80)
+            assert other.get_port_config('new')['id'] not in ids.values()
+        finally:
+            other.close_db()
+    print("\n✓ Existing configurations were numbered by the migration")
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        test_reuse_freed_bind_port, test_reuse_after_reopen, test_duplicate_bind_ports_left_alone,
+        test_id_survives_update, test_ids_added_to_old_database
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError:
+            print(f"\n✗ {test.__name__} failed")
+            failed += 1
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared SSH connection pool.
+
+Runs against the in-process loopback server (examples/loopback_server.py), so
+no real SSH host is needed:
+1. New connections are opened without holding the pool lock
+2. Concurrent borrows open no more connections than SSH_TRANSPORTS_PER_HOST
+3. The hash policy fills its pool with overlapping handshakes
+"""
+
+import sys
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Add parent directory to path to import Haruka
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from __init__ import Haruka
+from loopback_server import LoopbackSSHServer
+
+
+@contextmanager
+def loopback_haruka(**env):
+    """
+    Yield a Haruka connected to a fresh loopback server, with extra environment settings.
+
+    Every handshake is slowed down by half a second, so tests can look at the
+    pool while a connection is being opened; the opens are counted in
+    haruka.opened.
+    """
+    saved = dict(os.environ)
+    server = LoopbackSSHServer().start()
+    server.apply_env()
+    os.environ.update(env)
+    haruka = Haruka()
+    haruka.opened = []
+    haruka.connecting = threading.Event()
+    open_ssh_client = haruka._open_ssh_client
+
+    def slow_open(settings, compress=False):
+        haruka.opened.append(threading.current_thread().name)
+        haruka.connecting.set()
+        time.sleep(0.5)
+        return open_ssh_client(settings, compress)
+
+    haruka._open_ssh_client = slow_open
+    try:
+        yield haruka
+    finally:
+        haruka.close_ssh_connections()
+        server.stop()
+        os.environ.clear()
+        os.environ.update(saved)
+
+
+def borrow_concurrently(haruka, count, **kwargs):
+    """Borrow from count threads at once and return the clients in thread order."""
+    clients = [None] * count
+
+    def borrow(index):
+        clients[index] = haruka._borrow_ssh_client(**kwargs)
+
+    threads = [threading.Thread(target=borrow, args=(i,), name=f"borrow-{i}") for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    return clients
+
+
+def pooled_clients(haruka):
+    """All clients currently in the pool."""
+    return [client for clients in haruka._ssh_pool.values() for client in clients]
+
+
+def test_connect_outside_pool_lock():
+    """The pool lock stays free while a new SSH connection is being opened."""
+    print("\n" + "="*60)
+    print("CONNECT OUTSIDE POOL LOCK TEST")
+    print("="*60)
+
+    with loopback_haruka() as haruka:
+        borrowed = []
+        thread = threading.Thread(target=lambda: borrowed.append(haruka._borrow_ssh_client()))
+        thread.start()
+        assert haruka.connecting.wait(5)
+
+        # Transport threads (_track_channel, _sample_rtt, ...) need this lock
+        assert haruka._ssh_pool_lock.acquire(timeout=0.2), "pool lock held during the SSH handshake"
+        haruka._ssh_pool_lock.release()
+
+        thread.join(timeout=30)
+        assert borrowed and borrowed[0].get_transport().is_active()
+        assert pooled_clients(haruka) == borrowed
+    print("\n✓ Pool lock was free during the handshake")
+
+
+def test_concurrent_borrows_share_connections():
+    """Threads borrowing at once wait for the connections being opened instead of opening their own."""
+    print("\n" + "="*60)
+    print("CONCURRENT BORROW TEST")
+    print("="*60)
+
+    with loopback_haruka(SSH_TRANSPORTS_PER_HOST='2', SSH_SHARD_POLICY='round_robin') as haruka:
+        clients = borrow_concurrently(haruka, 8)
+        pool = pooled_clients(haruka)
+        assert len(haruka.opened) == 2, f"opened {len(haruka.opened)} connections for a pool of 2"
+        assert len(pool) == 2
+        assert all(client in pool for client in clients)
+        assert haruka._ssh_pool_opening == {key: 0 for key in haruka._ssh_pool}
+    print("\n✓ 8 concurrent borrows opened 2 connections")
+
+
+def test_hash_pool_fill():
+    """The hash policy opens all its connections at once and keeps shard keys on the same slot."""
+    print("\n" + "="*60)
+    print("HASH POOL FILL TEST")
+    print("="*60)
+
+    with loopback_haruka(SSH_TRANSPORTS_PER_HOST='3', SSH_SHARD_POLICY='hash') as haruka:
+        start = time.monotonic()
+        clients = borrow_concurrently(haruka, 6, shard_key=9000)
+        elapsed = time.monotonic() - start
+        assert len(haruka.opened) == 3, f"opened {len(haruka.opened)} connections for a pool of 3"
+        # Three slowed-down handshakes in a row would take 1.5s
+        assert elapsed < 1.4, f"pool fill took {elapsed:.2f}s"
+        assert len(set(clients)) == 1
+        assert haruka._borrow_ssh_client(shard_key=9000) is clients[0]
+        assert len({haruka._borrow_ssh_client(shard_key=port) for port in range(9000, 9030)}) == 3
+    print(f"\n✓ Hash pool of 3 filled in {elapsed:.2f}s")
+
+
+def main():
+    """Run all tests."""
+    tests = [test_connect_outside_pool_lock, test_concurrent_borrows_share_connections, test_hash_pool_fill]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            print(f"\n✗ {test.__name__} failed: {e}")
+            failed += 1
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
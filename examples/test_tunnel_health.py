@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Test script for tunnel health classification.
+
+Runs against the in-process loopback server (examples/loopback_server.py).
+A second Haruka instance plays the pytunnel daemon holding the ports, and
+the checker is told those ports belong to another SSH session, as the /proc
+probe would report on a real server:
+1. A tunnel that answers is foreign
+2. A live tunnel whose local service is down is service_down, not a zombie
+3. A session that accepts the connection and stays silent is a zombie
+4. The zombie reaper kills a stale sshd session but keeps one that still
+   serves other live ports, unless forced
+"""
+
+import sys
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+from contextlib import contextmanager
+
+# Add parent directory to path to import Haruka
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from __init__ import Haruka
+from loopback_server import LoopbackSSHServer
+
+
+@contextmanager
+def loopback_server():
+    """Run a loopback SSH server with the SSH_* environment pointing at it."""
+    saved = dict(os.environ)
+    server = LoopbackSSHServer().start()
+    server.apply_env()
+    try:
+        yield server
+    finally:
+        server.stop()
+        os.environ.clear()
+        os.environ.update(saved)
+
+
+def free_port():
+    """A local port nothing listens on."""
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def start_service(greeting=None):
+    """
+    Start a local TCP service and return its port.
+
+    With greeting the service speaks first; without it, it echoes what the
+    client sends (a client-speaks-first service).
+    """
+    listener = socket.socket()
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(16)
+
+    def serve(conn):
+        with conn:
+            if greeting:
+                conn.sendall(greeting)
+            while True:
+                data = conn.recv(65536)
+                if not data:
+                    return
+                conn.sendall(data)
+
+    def accept():
+        while True:
+            conn, _ = listener.accept()
+            threading.Thread(target=serve, args=(conn,), daemon=True).start()
+
+    threading.Thread(target=accept, daemon=True).start()
+    return listener.getsockname()[1]
+
+
+def held_by_other_session(haruka):
+    """Make haruka's /proc probe report every bound port as held by another sshd."""
+    haruka._probe_ports_proc = lambda client, ports: {port: ('bound_other', (4242,)) for port in ports}
+
+
+def test_probe_classification():
+    """Only a response clears a port held by another SSH session."""
+    print("\n" + "="*60)
+    print("TUNNEL PROBE CLASSIFICATION TEST")
+    print("="*60)
+
+    with loopback_server():
+        daemon = Haruka()
+        frozen = Haruka()
+        # A frozen session: the server still hands it connections, nobody relays them
+        stuck = []
+        frozen._route_forwarded_channel = lambda chan, origin, server: stuck.append(chan)
+        checker = Haruka()
+        held_by_other_session(checker)
+        try:
+            answering, refused, silent, stalled = free_port(), free_port(), free_port(), free_port()
+            assert daemon.reverse_forward_tunnel(start_service(b"220 ready\r\n"), answering, background=True)
+            assert daemon.reverse_forward_tunnel(free_port(), refused, background=True)
+            assert daemon.reverse_forward_tunnel(start_service(), silent, background=True)
+            assert frozen.reverse_forward_tunnel(start_service(b"220 ready\r\n"), stalled, background=True)
+
+            ports = [answering, refused, silent, stalled]
+            health = checker.check_ports_health_ssh_server(ports, max_age=0)
+            statuses = {port: health[port]['status'] for port in ports}
+            print(f"\nStatuses: {statuses}")
+
+            assert statuses[answering] == 'foreign'
+            assert health[answering]['healthy'] and health[answering]['tunnel_working']
+            assert health[answering]['probe']['response'] == 'data'
+
+            # Client alive, local service refused: never a zombie, never offered for a kill
+            assert statuses[refused] == 'service_down'
+            assert not health[refused]['healthy']
+            assert health[refused]['probe']['response'] == 'closed'
+
+            # Silence proves nothing, whether the service waits for the client or nobody relays
+            assert statuses[stalled] == 'zombie'
+            assert health[stalled]['probe']['response'] == 'silent'
+            assert stuck, "the frozen session never received the probe connection"
+            assert statuses[silent] == 'zombie'
+
+            # A client-speaks-first service answers once the probe sends a request
+            probe = checker.probe_tunnel(silent, send=b"PING\r\n", timeout=5)
+            assert probe['ok'] and probe['response'] == 'data'
+        finally:
+            for haruka in (daemon, frozen, checker):
+                haruka.close_ssh_connections()
+    print("\n✓ foreign, service_down and zombie told apart by the probe response")
+
+
+# A stand-in for a server-side sshd session: listens on one port per argument
+# ("answer" greets every connection, "silent" accepts and says nothing) and
+# prints the ports once they are bound
+FAKE_SESSION = r'''
+import socket, sys, threading
+listeners = []
+for mode in sys.argv[1:]:
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(16)
+    listeners.append((sock, mode))
+def serve(sock, mode):
+    held = []
+    while True:
+        conn, _ = sock.accept()
+        held.append(conn)
+        if mode == "answer":
+            conn.sendall(b"SSH-2.0-fake\r\n")
+for sock, mode in listeners:
+    threading.Thread(target=serve, args=(sock, mode), daemon=True).start()
+print(" ".join(str(sock.getsockname()[1]) for sock, _ in listeners), flush=True)
+threading.Event().wait()
+'''
+
+
+@contextmanager
+def fake_sshd_sessions():
+    """
+    Yield a function that starts a fake sshd session and returns (process, ports).
+
+    The processes run Python through a symlink named sshd, so /proc/<pid>/comm
+    reads "sshd" and the reaper treats them like real sessions. The loopback
+    server runs the reaper's commands on this host, where it finds them.
+    """
+    workdir = tempfile.mkdtemp(prefix='haruka-sshd-')
+    sshd = os.path.join(workdir, 'sshd')
+    os.symlink(os.path.realpath(sys.executable), sshd)
+    processes = []
+
+    def start(*modes):
+        process = subprocess.Popen([sshd, '-c', FAKE_SESSION] + list(modes), stdout=subprocess.PIPE, text=True)
+        processes.append(process)
+        return process, [int(port) for port in process.stdout.readline().split()]
+
+    try:
+        yield start
+    finally:
+        for process in processes:
+            process.kill()
+            process.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def test_reaper_keeps_shared_sessions():
+    """Only sshd sessions with no other live port are killed; force kills a shared one too."""
+    print("\n" + "="*60)
+    print("ZOMBIE REAPER PID CHOICE TEST")
+    print("="*60)
+
+    with loopback_server(), fake_sshd_sessions() as start_session:
+        haruka = Haruka()
+        try:
+            # Stale: its other port is silent too
+            stale, (stale_port, stale_other) = start_session('silent', 'silent')
+            # Shared: the same session still serves a live port
+            shared, (shared_port, live_port) = start_session('silent', 'answer')
+
+            outcomes = haruka.kill_zombie_ports_ssh_server([stale_port, shared_port], timeout=5)
+            print(f"\nOutcomes: { {port: outcome['status'] for port, outcome in outcomes.items()} }")
+            assert outcomes[stale_port]['status'] == 'freed'
+            assert outcomes[stale_port]['pids'] == [stale.pid]
+            assert stale.wait(timeout=5) is not None
+
+            assert outcomes[shared_port]['status'] == 'shared_session'
+            assert outcomes[shared_port]['pids'] == [shared.pid]
+            assert str(live_port) in outcomes[shared_port]['error']
+            assert shared.poll() is None, "shared session was killed"
+
+            # The caller can still insist
+            forced = haruka.kill_zombie_ports_ssh_server([shared_port], timeout=5, force=True)[shared_port]
+            assert forced['status'] == 'freed'
+            assert shared.wait(timeout=5) is not None
+        finally:
+            haruka.close_ssh_connections()
+    print("\n✓ Stale session killed, shared session kept until forced")
+
+
+def test_reaper_keeps_sessions_with_own_routes():
+    """A session holding a port this instance routes (e.g. an OpenSSH master's) is never reaped."""
+    print("\n" + "="*60)
+    print("ZOMBIE REAPER LIVE ROUTE TEST")
+    print("="*60)
+
+    with loopback_server(), fake_sshd_sessions() as start_session:
+        haruka = Haruka()
+        try:
+            session, (stale_port, routed_port) = start_session('silent', 'silent')
+            has_live_route = haruka._has_live_route
+            haruka._has_live_route = lambda port: port == routed_port or has_live_route(port)
+
+            outcome = haruka.kill_zombie_ports_ssh_server([stale_port], timeout=5)[stale_port]
+            assert outcome['status'] == 'shared_session'
+            assert session.poll() is None
+        finally:
+            haruka.close_ssh_connections()
+    print("\n✓ Session carrying a live route of this instance was kept")
+
+
+def test_own_tunnel_probe():
+    """This instance's own tunnels stay healthy when silent and report broken when the service is down."""
+    print("\n" + "="*60)
+    print("OWN TUNNEL PROBE TEST")
+    print("="*60)
+
+    with loopback_server():
+        haruka = Haruka()
+        # Listeners on the loopback server belong to this connection's session
+        haruka._probe_ports_proc = lambda client, ports: {port: ('healthy', ()) for port in ports}
+        try:
+            silent, refused = free_port(), free_port()
+            assert haruka.reverse_forward_tunnel(start_service(), silent, background=True)
+            assert haruka.reverse_forward_tunnel(free_port(), refused, background=True)
+
+            health = haruka.check_ports_health_ssh_server([silent, refused], end_to_end=True, max_age=0)
+            assert health[silent]['status'] == 'healthy'
+            assert health[silent]['probe']['response'] == 'silent'
+            assert health[refused]['status'] == 'broken'
+        finally:
+            haruka.close_ssh_connections()
+    print("\n✓ Own tunnels: silent is healthy, refused is broken")
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        test_probe_classification, test_own_tunnel_probe, test_reaper_keeps_shared_sessions,
+        test_reaper_keeps_sessions_with_own_routes
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            print(f"\n✗ {test.__name__} failed: {e}")
+            failed += 1
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
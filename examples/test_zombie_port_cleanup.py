@@ -122,9 +122,11 @@ def test_multiple_ports():
     print(f"\nChecking health of {len(test_ports)} ports:")
     print(f"Ports to check: {test_ports}\n")
     
+    # One remote command for all ports
+    health_by_port = haruka.check_ports_health_ssh_server(test_ports)
     results = []
     for port in test_ports:
-        health = haruka.check_port_health_ssh_server(port)
+        health = health_by_port[port]
         results.append(health)
         
         status_icon = "✓" if health['healthy'] else "✗"
@@ -170,12 +172,18 @@ def main():
   
   haruka = Haruka()
   
+  # Check many ports in one round trip
+  results = haruka.check_ports_health_ssh_server([5000, 5001, 8000])
+  
   # Check if a port has a zombie binding
   health = haruka.check_port_health_ssh_server(5000)
   if health['status'] == 'zombie':
       print("Found zombie binding - cleaning up...")
       haruka.kill_zombie_port_ssh_server(5000)
   
+  # Clean up many zombie ports at once
+  outcomes = haruka.kill_zombie_ports_ssh_server([5000, 5001, 8000])
+  
   # Or cleanup before starting new tunnel
   haruka.kill_zombie_port_ssh_server(5000)  # Safe to call even if port is free
   haruka.reverse_forward_tunnel(3000, 5000, background=True)
@@ -226,8 +226,21 @@ class PyManage:
             
             # Check port health first
             print(f"\n🔍 Checking port health before starting...")
-            health = self.haruka.check_port_health_ssh_server(config['server_bind_port'])
+            health = self.haruka.check_ports_health_ssh_server(
+                [config['server_bind_port']], end_to_end=True
+            )[config['server_bind_port']]
             
+            if health['status'] == 'foreign':
+                print(f"✓ Port {config['server_bind_port']} is already served by another SSH session (e.g. the pytunnel daemon)")
+                print("  Nothing to start; stop that tunnel first to run it from here")
+                return
+            
+            if health['status'] == 'service_down':
+                print(f"⚠️  Port {config['server_bind_port']} is held by another SSH session whose local service is down")
+                print("  That tunnel is still connected; start its local service or stop that tunnel first")
+                return
+            
+            # Only a binding that gave no sign of a live client is stale enough to kill
             if health['status'] == 'zombie':
                 print(f"⚠️  Found zombie binding on port {config['server_bind_port']}")
                 cleanup = input("Clean up zombie port before starting? (yes/no): ").strip().lower()
@@ -251,7 +264,9 @@ class PyManage:
             success = self.haruka.reverse_forward_tunnel(
                 local_port=config['local_port'],
                 bind_port=config['server_bind_port'],
-                background=background_mode
+                background=background_mode,
+                chunk_size=config.get('chunk_size'),
+                compression=config.get('compression')
             )
             
             if success:
@@ -305,6 +320,7 @@ class PyManage:
             print(f"  [3] Bind Port: {config['server_bind_port']}")
             print(f"  [4] Public IP: {config['remote_host']}")
             print(f"  [5] Description: {config['description'] or 'N/A'}")
+            print(f"  [6] Compression: {config.get('compression') or 'off'}")
             print(f"  [0] Save and finish")
             
             # Dictionary to store updates
@@ -313,12 +329,13 @@ class PyManage:
                 'local_port': config['local_port'],
                 'server_bind_port': config['server_bind_port'],
                 'remote_host': config['remote_host'],
-                'description': config['description'] or ''
+                'description': config['description'] or '',
+                'compression': config.get('compression') or 'off'
             }
             
             # Field update loop
             while True:
-                field_choice = input("\nSelect field to update (0-5): ").strip()
+                field_choice = input("\nSelect field to update (0-6): ").strip()
                 
                 if field_choice == '0':
                     break
@@ -354,6 +371,13 @@ class PyManage:
                     else:
                         updates['description'] = ''
                         print("✓ Description cleared")
+                elif field_choice == '6':
+                    new_mode = input(f"New compression (off/on/auto) [{updates['compression']}]: ").strip().lower()
+                    if new_mode in ('off', 'on', 'auto'):
+                        updates['compression'] = new_mode
+                        print(f"✓ Compression updated to: {new_mode}")
+                    elif new_mode:
+                        print("✗ Compression must be off, on or auto")
                 else:
                     print("✗ Invalid option")
             
@@ -375,6 +399,9 @@ class PyManage:
             if updates['description'] != (config['description'] or ''):
                 print(f"  Description: {config['description'] or 'N/A'} → {updates['description']}")
                 changed = True
+            if updates['compression'] != (config.get('compression') or 'off'):
+                print(f"  Compression: {config.get('compression') or 'off'} → {updates['compression']}")
+                changed = True
             
             if not changed:
                 print("  No changes made")
@@ -383,18 +410,18 @@ class PyManage:
             confirm = input("\nConfirm changes? (yes/no): ").strip().lower()
             
             if confirm == 'yes' or confirm == 'y':
-                # Delete old and create new
+                # Update in place; only changed columns are written
                 print("\n🔄 Saving changes...")
-                self.haruka.delete_port_config(config['id'])
+                # Empty description and compression are stored as NULL on older rows
+                defaults = {'description': '', 'compression': 'off'}
+                changes = {
+                    key: value for key, value in updates.items()
+                    if value != (config.get(key) or defaults[key] if key in defaults else config[key])
+                }
+                if 'local_port' in changes:
+                    changes['remote_port'] = changes['local_port']
                 
-                success = self.haruka.add_port_config(
-                    name=updates['name'],
-                    local_port=updates['local_port'],
-                    remote_host=updates['remote_host'],
-                    remote_port=updates['local_port'],
-                    server_bind_port=updates['server_bind_port'],
-                    description=updates['description']
-                )
+                success = self.haruka.update_port_config(config['id'], **changes)
                 
                 if success:
                     print("\n✓ Configuration updated successfully!")
@@ -467,19 +494,41 @@ class PyManage:
         try:
             bind_port = int(input("\nEnter bind port to check: "))
             
+            owner = self.haruka.get_port_config_by_bind_port(bind_port)
+            if owner:
+                print(f"\n📌 Port {bind_port} belongs to configuration '{owner['name']}'")
+            
             print(f"\n🔍 Checking port {bind_port}...")
-            health = self.haruka.check_port_health_ssh_server(bind_port)
+            health = self.haruka.check_ports_health_ssh_server([bind_port], end_to_end=True)[bind_port]
             
             print(f"\n📊 Port Health Report:")
             print(f"  Port: {health['port']}")
             print(f"  Status: {health['status'].upper()}")
             print(f"  Healthy: {'✓ Yes' if health['healthy'] else '✗ No'}")
+            probe = health.get('probe')
+            if probe and probe['ok']:
+                first_byte = f"{probe['first_byte_ms']} ms" if probe['first_byte_ms'] is not None else "n/a (silent: the service waits for the client, or nothing relays)"
+                print(f"  Tunnel connect: {probe['connect_ms']} ms, first byte: {first_byte}")
             
             if health['status'] == 'healthy':
                 print("\n✓ Port is actively listening and working properly")
+            elif health['status'] == 'foreign':
+                print("\n✓ Port is served by another SSH session (e.g. the pytunnel daemon) and working")
+                if health['pids']:
+                    print(f"  PIDs: {', '.join(str(pid) for pid in health['pids'])}")
+            elif health['status'] == 'broken':
+                print("\n⚠️  Port is bound but the probe connection did not reach the local service")
+                print(f"  Error: {probe['error']}")
+                print("  Suggest: Check that the local service is running")
+            elif health['status'] == 'service_down':
+                print("\n⚠️  Port is served by another SSH session, but its local service is down")
+                print("  The tunnel closed the probe connection at once: its client is alive and refused it")
+                if health['pids']:
+                    print(f"  PIDs: {', '.join(str(pid) for pid in health['pids'])}")
+                print("  Suggest: Start the local service on the machine running that tunnel (do not kill it)")
             elif health['status'] == 'zombie':
                 print("\n⚠️  ZOMBIE BINDING DETECTED!")
-                print("  The port is still occupied but not accepting connections")
+                print("  The port is still occupied but nothing answered the probe connection")
                 print("  Suggest: Kill this zombie port and restart tunnel")
                 
                 kill = input("\nKill this zombie port now? (yes/no): ").strip().lower()
@@ -489,6 +538,10 @@ class PyManage:
                         print("✓ Zombie port killed successfully!")
                     else:
                         print("✗ Failed to kill zombie port")
+            elif health['status'] == 'in_use':
+                print("\n⚠️  Port is held by a non-SSH process on the server")
+                print(f"  PIDs: {', '.join(str(pid) for pid in health['pids'])}")
+                print("  Suggest: Free the port on the server or choose another bind port")
             else:
                 print("\n❓ Port status unclear - check manually on SSH server")
         
@@ -506,15 +559,29 @@ class PyManage:
         try:
             bind_port = int(input("\nEnter bind port to kill: "))
             
+            owner = self.haruka.get_port_config_by_bind_port(bind_port)
+            if owner:
+                print(f"\n📌 Port {bind_port} belongs to configuration '{owner['name']}'")
+            
             print(f"\n⚡ Attempting to kill port {bind_port}...")
-            success = self.haruka.kill_zombie_port_ssh_server(bind_port)
+            outcome = self.haruka.kill_zombie_ports_ssh_server([bind_port])[bind_port]
             
-            if success:
+            if outcome['status'] == 'shared_session':
+                # One sshd session carries every tunnel of its connection
+                print(f"⚠️  {outcome['error'].split(';')[0]}")
+                force = input("Kill that whole SSH session anyway? Its live tunnels go down too (yes/no): ").strip().lower()
+                if force == 'yes' or force == 'y':
+                    outcome = self.haruka.kill_zombie_ports_ssh_server([bind_port], force=True)[bind_port]
+            
+            if outcome['status'] == 'freed':
                 print(f"✓ Port {bind_port} killed successfully!")
                 print("  Port is now available for reuse")
             else:
-                print(f"✗ Failed to kill port {bind_port}")
-                print("  Port may already be free or require elevated privileges")
+                print(f"✗ Failed to kill port {bind_port} ({outcome['status']})")
+                if outcome['error']:
+                    print(f"  {outcome['error']}")
+                else:
+                    print("  Port may already be free or require elevated privileges")
         
         except ValueError:
             print("✗ Invalid port number")
@@ -6,6 +6,7 @@ import os
 from __init__ import Haruka
 import time
 import signal
+import multiprocessing
 # Load the environment variables from the .env file
 from dotenv import load_dotenv
 load_dotenv()
@@ -16,6 +17,232 @@ def signal_handler(signum, frame):
     sys.exit(0)
 
 
+def startup_mode():
+    """Startup mode from the command line (--parallel/--sequential) or TUNNEL_STARTUP_MODE, default parallel."""
+    if '--sequential' in sys.argv[1:]:
+        return 'sequential'
+    if '--parallel' in sys.argv[1:]:
+        return 'parallel'
+    mode = os.getenv('TUNNEL_STARTUP_MODE', 'parallel').lower()
+    return mode if mode in ('parallel', 'sequential') else 'parallel'
+
+
+# Multi-process mode: seconds between worker status reports, and worker restart backoff bounds
+WORKER_STATUS_INTERVAL = 5
+WORKER_RESTART_BASE = 1
+WORKER_RESTART_MAX = 60
+
+
+def worker_count(config_count):
+    """Worker processes from --workers N or TUNNEL_WORKERS ('auto' = CPU count), capped at the config count."""
+    workers = os.getenv('TUNNEL_WORKERS', '1')
+    args = sys.argv[1:]
+    if '--workers' in args and args.index('--workers') + 1 < len(args):
+        workers = args[args.index('--workers') + 1]
+    if workers.strip().lower() == 'auto':
+        workers = os.cpu_count() or 1
+    try:
+        workers = int(workers)
+    except ValueError:
+        print(f"⚠️  Invalid worker count '{workers}', using 1")
+        workers = 1
+    return max(1, min(workers, config_count))
+
+
+def partition_configs(configs, workers):
+    """Deal configs out to workers in bind port order so every worker gets a similar share."""
+    partitions = [[] for _ in range(workers)]
+    for idx, config in enumerate(sorted(configs, key=lambda config: config['server_bind_port'] or 0)):
+        partitions[idx % workers].append(config)
+    return partitions
+
+
+def run_worker(index, configs, status_queue):
+    """
+    Worker process: its own Haruka and SSH transports for one partition of the configs.
+    Reports its status to the parent every WORKER_STATUS_INTERVAL seconds.
+    """
+    # The parent owns Ctrl+C and stops workers with SIGTERM
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    haruka = Haruka()
+    try:
+        results = haruka.start_reverse_tunnels(configs)
+        started = sum(1 for result in results if result['success'])
+        for result in results:
+            if not result['success']:
+                print(f"  ✗ [worker {index}] {result['name']}: {result['error']}")
+        print(f"  ✓ [worker {index}] {started}/{len(configs)} tunnel(s) ready (pid {os.getpid()})")
+
+        haruka.start_tunnel_supervisor()
+
+        while True:
+            supervisor = haruka.get_supervisor_stats()
+            status_queue.put({
+                'worker': index,
+                'pid': os.getpid(),
+                'tunnels': len(configs),
+                'up': started - supervisor.get('pending_tunnels', 0),
+                'connections': haruka.get_connection_stats()['active'],
+                'reconnects': supervisor['reconnects'],
+            })
+            time.sleep(WORKER_STATUS_INTERVAL)
+    finally:
+        haruka.close_ssh_connections()
+
+
+def run_multiprocess(configs, workers):
+    """
+    Run the tunnels in worker processes, each with its own SSH transports and GIL.
+
+    The parent restarts workers that exit (with exponential backoff) and prints
+    an aggregated status line whenever the totals change.
+    """
+    # Spawned workers start from a clean interpreter instead of a fork of this one
+    context = multiprocessing.get_context('spawn')
+    status_queue = context.Queue()
+    partitions = partition_configs(configs, workers)
+
+    # Stop the workers on systemd's SIGTERM as well as on Ctrl+C
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    print(f"🚀 Starting {len(configs)} tunnel(s) in {workers} worker processes...\n")
+    slots = [{'process': None, 'restart_at': 0, 'delay': WORKER_RESTART_BASE, 'started_at': 0} for _ in range(workers)]
+    statuses = {}
+    last_summary = None
+
+    try:
+        while True:
+            now = time.monotonic()
+            for index, slot in enumerate(slots):
+                process = slot['process']
+                if process is not None and process.is_alive():
+                    # A worker that stayed up for a while starts over with a short backoff
+                    if now - slot['started_at'] > WORKER_RESTART_MAX:
+                        slot['delay'] = WORKER_RESTART_BASE
+                    continue
+                if process is not None:
+                    print(f"⚠️  Worker {index} exited with code {process.exitcode}, "
+                          f"restarting in {slot['delay']}s")
+                    statuses.pop(index, None)
+                    slot['process'] = None
+                    slot['restart_at'] = now + slot['delay']
+                    slot['delay'] = min(WORKER_RESTART_MAX, slot['delay'] * 2)
+                    continue
+                if now >= slot['restart_at']:
+                    slot['process'] = context.Process(
+                        target=run_worker, args=(index, partitions[index], status_queue),
+                        name=f"pytunnel-worker-{index}", daemon=True
+                    )
+                    slot['process'].start()
+                    slot['started_at'] = now
+
+            # Collect status reports for up to a second
+            deadline = time.monotonic() + 1
+            while True:
+                try:
+                    status = status_queue.get(timeout=max(0, deadline - time.monotonic()))
+                except Exception:
+                    break
+                statuses[status['worker']] = status
+
+            alive = sum(1 for slot in slots if slot['process'] is not None and slot['process'].is_alive())
+            summary = (
+                alive,
+                sum(status['up'] for status in statuses.values()),
+                sum(status['connections'] for status in statuses.values()),
+                sum(status['reconnects'] for status in statuses.values()),
+            )
+            if summary != last_summary:
+                print(f"📊 Workers {alive}/{workers} alive, tunnels {summary[1]}/{len(configs)} up, "
+                      f"{summary[2]} active connection(s), {summary[3]} reconnect(s)")
+                last_summary = summary
+
+    except (KeyboardInterrupt, SystemExit):
+        print("\n\nShutting down workers...")
+        return 0
+    finally:
+        for slot in slots:
+            if slot['process'] is not None and slot['process'].is_alive():
+                slot['process'].terminate()
+        for slot in slots:
+            if slot['process'] is not None:
+                slot['process'].join(5)
+
+
+def start_tunnels_parallel(haruka, configs):
+    """Request every tunnel concurrently and report when each one became ready."""
+    print("🚀 Starting tunnels in parallel...\n")
+    
+    started = time.perf_counter()
+    results = haruka.start_reverse_tunnels(configs)
+    total = time.perf_counter() - started
+    
+    all_tunnels_started = len(results) == len(configs)
+    print()
+    for result in results:
+        if result['success']:
+            retries = f", {result['attempts']} attempts" if result['attempts'] > 1 else ""
+            print(f"  ✓ {result['name']}: localhost:{result['local_port']} → SSH_server:{result['bind_port']} "
+                  f"ready in {result['ready_time'] * 1000:.0f} ms{retries}")
+        else:
+            print(f"  ✗ {result['name']}: failed after {result['attempts']} attempts: {result['error']}")
+            all_tunnels_started = False
+    
+    ready = sum(1 for result in results if result['success'])
+    print(f"\n  {ready}/{len(configs)} tunnel(s) ready in {total * 1000:.0f} ms")
+    return all_tunnels_started
+
+
+def start_tunnels_sequential(haruka, configs):
+    """Start tunnels one at a time (original behaviour)."""
+    print("🚀 Starting tunnels...\n")
+    
+    all_tunnels_started = True
+    max_retries = 3
+    
+    for idx, config in enumerate(configs):
+        local_port = config['local_port']
+        bind_port = config['server_bind_port']
+        config_name = config['name']
+        
+        print(f"  Starting tunnel for {config_name}:")
+        print(f"    localhost:{local_port} → SSH_server:{bind_port}")
+        
+        # Retry logic for SSH connection issues
+        success = False
+        for attempt in range(1, max_retries + 1):
+            try:
+                success = haruka.reverse_forward_tunnel(
+                    local_port, bind_port, background=True, chunk_size=config.get('chunk_size'),
+                    compression=config.get('compression')
+                )
+                if success:
+                    print(f"    ✓ Tunnel started")
+                    break
+                elif attempt < max_retries:
+                    print(f"    ⚠ Attempt {attempt} failed, retrying... ({attempt}/{max_retries})")
+                    time.sleep(2)
+            except Exception as e:
+                if attempt < max_retries:
+                    print(f"    ⚠ Error: {e}, retrying... ({attempt}/{max_retries})")
+                    time.sleep(2)
+                else:
+                    print(f"    ✗ Error after {max_retries} attempts: {e}")
+        
+        if not success:
+            print(f"    ✗ Failed to start tunnel for {config_name}")
+            all_tunnels_started = False
+        
+        # Add delay between tunnel connections to avoid SSH connection issues
+        if idx < len(configs) - 1:
+            print(f"    ⏳ Waiting before next tunnel...\n")
+            time.sleep(1)
+    
+    return all_tunnels_started
+
+
 def main():
     """Main entry point - exit with proper codes for systemd."""
     try:
@@ -41,6 +268,13 @@ def main():
             public_ip = config.get('remote_host') or ssh_host_env
             print(f"  • {config['name']}: {config['local_port']} → {public_ip}:{config['server_bind_port']}")
         
+        # Multi-process mode: workers own the SSH connections, this process only supervises them
+        workers = worker_count(len(configs))
+        if workers > 1:
+            haruka.close_db()
+            print()
+            return run_multiprocess(configs, workers)
+        
         # Build port mappings for all configs (reuse single SSH connection)
         port_mappings = []
         config_names = {}  # Map (local_port, bind_port) to config name
@@ -58,46 +292,10 @@ def main():
         
         print()
         
-        # Start tunnels individually (like PyManage does) for better reliability
-        print("🚀 Starting tunnels...\n")
-        
-        all_tunnels_started = True
-        max_retries = 3
-        
-        for idx, config in enumerate(configs):
-            local_port = config['local_port']
-            bind_port = config['server_bind_port']
-            config_name = config['name']
-            
-            print(f"  Starting tunnel for {config_name}:")
-            print(f"    localhost:{local_port} → SSH_server:{bind_port}")
-            
-            # Retry logic for SSH connection issues
-            success = False
-            for attempt in range(1, max_retries + 1):
-                try:
-                    success = haruka.reverse_forward_tunnel(local_port, bind_port, background=True)
-                    if success:
-                        print(f"    ✓ Tunnel started")
-                        break
-                    elif attempt < max_retries:
-                        print(f"    ⚠ Attempt {attempt} failed, retrying... ({attempt}/{max_retries})")
-                        time.sleep(2)
-                except Exception as e:
-                    if attempt < max_retries:
-                        print(f"    ⚠ Error: {e}, retrying... ({attempt}/{max_retries})")
-                        time.sleep(2)
-                    else:
-                        print(f"    ✗ Error after {max_retries} attempts: {e}")
-            
-            if not success:
-                print(f"    ✗ Failed to start tunnel for {config_name}")
-                all_tunnels_started = False
-            
-            # Add delay between tunnel connections to avoid SSH connection issues
-            if idx < len(configs) - 1:
-                print(f"    ⏳ Waiting before next tunnel...\n")
-                time.sleep(1)
+        if startup_mode() == 'parallel':
+            all_tunnels_started = start_tunnels_parallel(haruka, configs)
+        else:
+            all_tunnels_started = start_tunnels_sequential(haruka, configs)
         
         print()
         
@@ -116,6 +314,9 @@ def main():
         
         print(f"\n✓ Your private services are now publicly accessible")
         
+        # Restore tunnels automatically if the SSH connection drops
+        haruka.start_tunnel_supervisor()
+        
         # Keep running until interrupted
         try:
             while True: